@@ -13,9 +13,25 @@ import os
 import re
 import sys
 import math
+import heapq
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
 from pathlib import Path
-from collections import defaultdict
-from typing import Dict, List, Tuple, Any
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+
+# Shared JSON/CSV/NDJSON writers of the project onboarding tools
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'commons' / 'project-onboarding'))
+import treesitter_backend  # noqa: E402
+from path_matcher import PathMatcher  # noqa: E402
+from structured_output import (FORMAT_SUFFIXES, OUTPUT_FORMATS, RecordWriter,  # noqa: E402
+                               open_record_writer)
+
+# Columns of the structured output, one record per file
+RECORD_FIELDS = ['file', 'language', 'vocabulary', 'length', 'volume',
+                 'difficulty', 'effort', 'time', 'bugs']
 
 def show_banner():
     """Display ASCII art banner"""
@@ -43,119 +59,245 @@ def get_project_root(path: str) -> str:
     
     return path  # Return original path if .git not found
 
-def get_language_patterns() -> Dict[str, Dict[str, List[str]]]:
-    """Define language-specific patterns for operators and operands"""
+def get_language_patterns() -> Dict[str, Dict[str, Any]]:
+    """Define language-specific token patterns for operators and operands
+    
+    Symbolic operators are literal strings; keyword operators are words that
+    count as operators instead of operands. Identifiers, numbers and string
+    literals are operands, comments are skipped.
+    """
+    c_family_comments = [r'//[^\n]*', r'/\*[\s\S]*?\*/']
+    quoted_strings = [r'"(?:\\.|[^"\\\n])*"', r"'(?:\\.|[^'\\\n])*'"]
+    
     return {
         "cs": {
             "operators": [
-                r'\+', r'-', r'\*', r'/', r'%',           # Arithmetic operators
-                r'==', r'!=', r'>', r'<', r'>=', r'<=',    # Comparison operators
-                r'&&', r'\|\|', r'!',                     # Logical operators
-                r'\+=', r'-=', r'\*=', r'/=', r'%=',      # Assignment operators
-                r'=', r'\+\+', r'--',                     # Other assignment/increment
-                r'\?', r':', r'\|\|', r'&&',              # Ternary and logical
-                r'&', r'\|', r'\^', r'~', r'<<', r'>>',   # Bitwise operators
-                r'is', r'as', r'new', r'typeof'           # C# specific keywords
+                '+', '-', '*', '/', '%',                  # Arithmetic operators
+                '==', '!=', '>', '<', '>=', '<=',         # Comparison operators
+                '&&', '||', '!',                          # Logical operators
+                '+=', '-=', '*=', '/=', '%=',             # Assignment operators
+                '=', '++', '--',                          # Other assignment/increment
+                '?', ':',                                 # Ternary
+                '&', '|', '^', '~', '<<', '>>'            # Bitwise operators
             ],
-            "operands": [
-                r'\b[a-zA-Z_][a-zA-Z0-9_]*\b',           # Identifiers
-                r'\b\d+\.?\d*[fFdDmM]?\b',               # Numeric literals
-                r'"[^"]*"', r"'[^']*'",                  # String literals
-                r'\btrue\b', r'\bfalse\b', r'\bnull\b'   # Boolean and null literals
-            ]
+            "keyword_operators": ['is', 'as', 'new', 'typeof'],   # C# specific keywords
+            "identifier": r'[a-zA-Z_][a-zA-Z0-9_]*',
+            "number": r'\d+\.?\d*[fFdDmM]?',
+            "strings": quoted_strings,
+            "comments": c_family_comments
         },
         "java": {
             "operators": [
-                r'\+', r'-', r'\*', r'/', r'%',
-                r'==', r'!=', r'>', r'<', r'>=', r'<=',
-                r'&&', r'\|\|', r'!',
-                r'\+=', r'-=', r'\*=', r'/=', r'%=',
-                r'=', r'\+\+', r'--',
-                r'\?', r':',
-                r'&', r'\|', r'\^', r'~', r'<<', r'>>',
-                r'instanceof', r'new'
+                '+', '-', '*', '/', '%',
+                '==', '!=', '>', '<', '>=', '<=',
+                '&&', '||', '!',
+                '+=', '-=', '*=', '/=', '%=',
+                '=', '++', '--',
+                '?', ':',
+                '&', '|', '^', '~', '<<', '>>'
             ],
-            "operands": [
-                r'\b[a-zA-Z_][a-zA-Z0-9_]*\b',
-                r'\b\d+\.?\d*[lLfFdD]?\b',
-                r'"[^"]*"', r"'[^']*'",
-                r'\btrue\b', r'\bfalse\b', r'\bnull\b'
-            ]
+            "keyword_operators": ['instanceof', 'new'],
+            "identifier": r'[a-zA-Z_][a-zA-Z0-9_]*',
+            "number": r'\d+\.?\d*[lLfFdD]?',
+            "strings": quoted_strings,
+            "comments": c_family_comments
         },
         "js": {
             "operators": [
-                r'\+', r'-', r'\*', r'/', r'%',
-                r'===', r'!==', r'==', r'!=', r'>', r'<', r'>=', r'<=',
-                r'&&', r'\|\|', r'!',
-                r'\+=', r'-=', r'\*=', r'/=', r'%=',
-                r'=', r'\+\+', r'--',
-                r'\?', r':',
-                r'&', r'\|', r'\^', r'~', r'<<', r'>>',
-                r'typeof', r'instanceof', r'new', r'delete'
+                '+', '-', '*', '/', '%',
+                '===', '!==', '==', '!=', '>', '<', '>=', '<=',
+                '&&', '||', '!',
+                '+=', '-=', '*=', '/=', '%=',
+                '=', '++', '--',
+                '?', ':',
+                '&', '|', '^', '~', '<<', '>>'
             ],
-            "operands": [
-                r'\b[a-zA-Z_$][a-zA-Z0-9_$]*\b',
-                r'\b\d+\.?\d*\b',
-                r'"[^"]*"', r"'[^']*'", r'`[^`]*`',
-                r'\btrue\b', r'\bfalse\b', r'\bnull\b', r'\bundefined\b'
-            ]
+            "keyword_operators": ['typeof', 'instanceof', 'new', 'delete'],
+            "identifier": r'[a-zA-Z_$][a-zA-Z0-9_$]*',
+            "number": r'\d+\.?\d*',
+            "strings": quoted_strings + [r'`(?:\\.|[^`\\])*`'],
+            "comments": c_family_comments
         },
         "ts": {
             "operators": [
-                r'\+', r'-', r'\*', r'/', r'%',
-                r'===', r'!==', r'==', r'!=', r'>', r'<', r'>=', r'<=',
-                r'&&', r'\|\|', r'!',
-                r'\+=', r'-=', r'\*=', r'/=', r'%=',
-                r'=', r'\+\+', r'--',
-                r'\?', r':',
-                r'&', r'\|', r'\^', r'~', r'<<', r'>>',
-                r'typeof', r'instanceof', r'new', r'delete', r'as'
+                '+', '-', '*', '/', '%',
+                '===', '!==', '==', '!=', '>', '<', '>=', '<=',
+                '&&', '||', '!',
+                '+=', '-=', '*=', '/=', '%=',
+                '=', '++', '--',
+                '?', ':',
+                '&', '|', '^', '~', '<<', '>>'
             ],
-            "operands": [
-                r'\b[a-zA-Z_$][a-zA-Z0-9_$]*\b',
-                r'\b\d+\.?\d*\b',
-                r'"[^"]*"', r"'[^']*'", r'`[^`]*`',
-                r'\btrue\b', r'\bfalse\b', r'\bnull\b', r'\bundefined\b'
-            ]
+            "keyword_operators": ['typeof', 'instanceof', 'new', 'delete', 'as'],
+            "identifier": r'[a-zA-Z_$][a-zA-Z0-9_$]*',
+            "number": r'\d+\.?\d*',
+            "strings": quoted_strings + [r'`(?:\\.|[^`\\])*`'],
+            "comments": c_family_comments
         },
         "py": {
             "operators": [
-                r'\+', r'-', r'\*', r'/', r'//', r'%', r'\*\*',
-                r'==', r'!=', r'>', r'<', r'>=', r'<=',
-                r'and', r'or', r'not',
-                r'\+=', r'-=', r'\*=', r'/=', r'//=', r'%=', r'\*\*=',
-                r'=',
-                r'&', r'\|', r'\^', r'~', r'<<', r'>>',
-                r'is', r'in', r'lambda'
+                '+', '-', '*', '/', '//', '%', '**',
+                '==', '!=', '>', '<', '>=', '<=',
+                '+=', '-=', '*=', '/=', '//=', '%=', '**=',
+                '=',
+                '&', '|', '^', '~', '<<', '>>'
             ],
-            "operands": [
-                r'\b[a-zA-Z_][a-zA-Z0-9_]*\b',
-                r'\b\d+\.?\d*\b',
-                r'"[^"]*"', r"'[^']*'", r'"""[^"]*"""', r"'''[^']*'''",
-                r'\bTrue\b', r'\bFalse\b', r'\bNone\b'
-            ]
+            "keyword_operators": ['and', 'or', 'not', 'is', 'in', 'lambda'],
+            "identifier": r'[a-zA-Z_][a-zA-Z0-9_]*',
+            "number": r'\d+\.?\d*',
+            "strings": [r'"""[\s\S]*?"""', r"'''[\s\S]*?'''"] + quoted_strings,
+            "comments": [r'#[^\n]*']
         },
         "rb": {
             "operators": [
-                r'\+', r'-', r'\*', r'/', r'%', r'\*\*',
-                r'==', r'!=', r'>', r'<', r'>=', r'<=', r'<=>',
-                r'&&', r'\|\|', r'!', r'and', r'or', r'not',
-                r'\+=', r'-=', r'\*=', r'/=', r'%=', r'\*\*=',
-                r'=', r'=>',
-                r'&', r'\|', r'\^', r'~', r'<<', r'>>',
-                r'=~', r'!~'
+                '+', '-', '*', '/', '%', '**',
+                '==', '!=', '>', '<', '>=', '<=', '<=>',
+                '&&', '||', '!',
+                '+=', '-=', '*=', '/=', '%=', '**=',
+                '=', '=>',
+                '&', '|', '^', '~', '<<', '>>',
+                '=~', '!~'
+            ],
+            "keyword_operators": ['and', 'or', 'not'],
+            "identifier": r'[a-zA-Z_][a-zA-Z0-9_]*',
+            "number": r'\d+\.?\d*',
+            "strings": quoted_strings,
+            "comments": [r'#[^\n]*']
+        },
+        "php": {
+            "operators": [
+                '+', '-', '*', '/', '%', '**', '.',
+                '===', '!==', '==', '!=', '<>', '>', '<', '>=', '<=', '<=>',
+                '&&', '||', '!', '??',
+                '+=', '-=', '*=', '/=', '%=', '**=', '.=', '??=',
+                '=', '++', '--',
+                '?', ':', '->', '=>', '::',
+                '&', '|', '^', '~', '<<', '>>'
+            ],
+            "keyword_operators": ['new', 'clone', 'instanceof', 'and', 'or', 'xor'],
+            "identifier": r'\$?[a-zA-Z_][a-zA-Z0-9_]*',  # $variables are distinct operands
+            "number": r'0[xX][0-9a-fA-F]+|\d+\.?\d*',
+            "strings": quoted_strings,
+            "comments": c_family_comments + [r'#[^\n]*']
+        },
+        "go": {
+            "operators": [
+                '+', '-', '*', '/', '%',
+                '==', '!=', '>', '<', '>=', '<=',
+                '&&', '||', '!',
+                '+=', '-=', '*=', '/=', '%=', '&=', '|=', '^=', '<<=', '>>=', '&^=',
+                '=', ':=', '++', '--', '<-', '...',
+                ':',
+                '&', '|', '^', '<<', '>>', '&^'
+            ],
+            "keyword_operators": ['go', 'defer', 'range'],
+            "identifier": r'[a-zA-Z_][a-zA-Z0-9_]*',
+            "number": r'0[xX][0-9a-fA-F]+|\d+\.?\d*i?',
+            "strings": quoted_strings + [r'`[^`]*`'],
+            "comments": c_family_comments
+        },
+        "c": {
+            "operators": [
+                '+', '-', '*', '/', '%',
+                '==', '!=', '>', '<', '>=', '<=',
+                '&&', '||', '!',
+                '+=', '-=', '*=', '/=', '%=', '&=', '|=', '^=', '<<=', '>>=',
+                '=', '++', '--',
+                '?', ':', '->',
+                '&', '|', '^', '~', '<<', '>>'
+            ],
+            "keyword_operators": ['sizeof'],
+            "identifier": r'[a-zA-Z_][a-zA-Z0-9_]*',
+            "number": r'0[xX][0-9a-fA-F]+[uUlL]*|\d+\.?\d*[uUlLfF]*',
+            "strings": quoted_strings,
+            "comments": c_family_comments
+        },
+        "cpp": {
+            "operators": [
+                '+', '-', '*', '/', '%',
+                '==', '!=', '>', '<', '>=', '<=', '<=>',
+                '&&', '||', '!',
+                '+=', '-=', '*=', '/=', '%=', '&=', '|=', '^=', '<<=', '>>=',
+                '=', '++', '--',
+                '?', ':', '->', '::', '->*', '.*',
+                '&', '|', '^', '~', '<<', '>>'
             ],
-            "operands": [
-                r'\b[a-zA-Z_][a-zA-Z0-9_]*\b',
-                r'\b\d+\.?\d*\b',
-                r'"[^"]*"', r"'[^']*'",
-                r'\btrue\b', r'\bfalse\b', r'\bnil\b'
-            ]
+            "keyword_operators": ['sizeof', 'new', 'delete', 'typeid', 'alignof', 'noexcept',
+                                  'static_cast', 'dynamic_cast', 'const_cast', 'reinterpret_cast'],
+            "identifier": r'[a-zA-Z_][a-zA-Z0-9_]*',
+            "number": r'0[xX][0-9a-fA-F]+[uUlL]*|\d+\.?\d*[uUlLfF]*',
+            "strings": quoted_strings,
+            "comments": c_family_comments
         }
     }
 
-def get_halstead_metrics(file_path: str, language: str) -> Dict[str, float]:
-    """Calculate Halstead metrics for a file"""
+@lru_cache(maxsize=None)
+def get_tokenizer(language: str) -> Optional['HalsteadTokenizer']:
+    """Return the compiled tokenizer for a language, built once per process
+    
+    Returns None for languages without a pattern table.
+    """
+    lang_patterns = get_language_patterns().get(language)
+    return HalsteadTokenizer(lang_patterns) if lang_patterns else None
+
+class HalsteadTokenizer:
+    """Single-pass operator/operand classifier compiled from a language pattern table
+    
+    One master regex tries, at each position, a comment, a literal, a word and
+    then the longest matching operator, so every token is counted exactly once.
+    """
+    
+    def __init__(self, lang_patterns: Dict[str, Any]):
+        # Longest operators first so '==' is never split into two '='
+        operators = sorted(set(lang_patterns.get('operators', [])), key=len, reverse=True)
+        literals = list(lang_patterns.get('strings', []))
+        if lang_patterns.get('number'):
+            literals.append(lang_patterns['number'])
+        
+        groups = [
+            ('skip', lang_patterns.get('comments', [])),
+            ('literal', literals),
+            ('word', [lang_patterns['identifier']] if lang_patterns.get('identifier') else []),
+            ('operator', [re.escape(op) for op in operators])
+        ]
+        self.kinds = [kind for kind, alternatives in groups if alternatives]
+        
+        # Whitespace and bracket/separator punctuation never start a token; rejecting
+        # them up front spares trying every alternative at those positions
+        separators = ''.join(sorted(set('()[]{};,.') - {op[0] for op in operators}))
+        self.regex = re.compile(f"(?=[^\\s{re.escape(separators)}])(?:" + '|'.join(
+            f"({'|'.join(alternatives)})" for _, alternatives in groups if alternatives
+        ) + ")")
+        self.keyword_operators = frozenset(lang_patterns.get('keyword_operators', []))
+    
+    def count(self, content: str) -> Tuple[Counter, Counter]:
+        """Return (operator counts, operand counts) for the content"""
+        operators = Counter()
+        operands = Counter()
+        
+        # findall + Counter tally the tokens in C; only distinct tokens reach this loop
+        matches = self.regex.findall(content)
+        if len(self.kinds) == 1:
+            matches = [(match,) for match in matches]
+        
+        for groups, occurrences in Counter(matches).items():
+            for kind, token in zip(self.kinds, groups):
+                if not token:
+                    continue
+                if kind == 'operator' or (kind == 'word' and token in self.keyword_operators):
+                    operators[token] += occurrences
+                elif kind != 'skip':
+                    operands[token] += occurrences
+                break
+        
+        return operators, operands
+
+def get_halstead_metrics(file_path: str, language: str, tree_sitter: bool = False) -> Dict[str, float]:
+    """Calculate Halstead metrics for a file
+    
+    With tree_sitter, operators and operands are taken from the file's syntax
+    tree when a grammar for the language is installed.
+    """
     try:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
@@ -173,40 +315,28 @@ def get_halstead_metrics(file_path: str, language: str) -> Dict[str, float]:
             'difficulty': 0, 'effort': 0, 'time': 0, 'bugs': 0
         }
     
-    # Get language patterns
-    patterns = get_language_patterns()
-    lang_patterns = patterns.get(language, patterns.get('py', {}))  # Default to Python
-    
-    unique_operators = defaultdict(int)
-    unique_operands = defaultdict(int)
-    total_operators = 0
-    total_operands = 0
+    backend = treesitter_backend.get_backend(language) if tree_sitter else None
+    if backend is not None:
+        metrics = backend.analyze(content.encode('utf-8'), functions=False)
+        return calculate_halstead_metrics(metrics.operators, metrics.operands)
     
-    # Count operators
-    for pattern in lang_patterns.get('operators', []):
-        try:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                unique_operators[match] += 1
-                total_operators += 1
-        except Exception as e:
-            print(f"Warning: Error matching operator pattern '{pattern}': {e}")
-    
-    # Count operands
-    for pattern in lang_patterns.get('operands', []):
-        try:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                unique_operands[match] += 1
-                total_operands += 1
-        except Exception as e:
-            print(f"Warning: Error matching operand pattern '{pattern}': {e}")
+    tokenizer = get_tokenizer(language)
+    if tokenizer is None:
+        print(f"Warning: No Halstead patterns for language '{language}': {file_path}")
+        return {
+            'vocabulary': 0, 'length': 0, 'volume': 0,
+            'difficulty': 0, 'effort': 0, 'time': 0, 'bugs': 0
+        }
     
-    # Calculate Halstead metrics
-    n1 = len(unique_operators)    # Number of unique operators
-    n2 = len(unique_operands)     # Number of unique operands
-    N1 = total_operators          # Total number of operators
-    N2 = total_operands           # Total number of operands
+    operators, operands = tokenizer.count(content)
+    return calculate_halstead_metrics(operators, operands)
+
+def calculate_halstead_metrics(operators: Counter, operands: Counter) -> Dict[str, float]:
+    """Derive the Halstead metrics from operator and operand counts"""
+    n1 = len(operators)               # Number of unique operators
+    n2 = len(operands)                # Number of unique operands
+    N1 = sum(operators.values())      # Total number of operators
+    N2 = sum(operands.values())       # Total number of operands
     
     # Avoid division by zero
     if n1 == 0 or n2 == 0:
@@ -252,6 +382,29 @@ def get_language_from_extension(file_path: str) -> str:
     }
     return language_map.get(ext, 'unknown')
 
+def iter_source_files(repo_path: str, file_extensions: List[str],
+                      exclude_patterns: List[str]) -> Iterator[Path]:
+    """Lazily yield files with one of the extensions in a single directory walk
+    
+    Exclude patterns are names, globs or .gitignore-style patterns matched
+    against whole path components (see path_matcher.py): an excluded
+    directory is pruned before the walk descends into it. Directories and
+    files are visited in sorted order so runs are reproducible.
+    """
+    extensions = {f".{ext.lower().lstrip('.')}" for ext in file_extensions}
+    matcher = PathMatcher(exclude_patterns)
+    
+    for dirpath, dirnames, filenames in os.walk(repo_path):
+        relative_dir = os.path.relpath(dirpath, repo_path)
+        relative_dir = '' if relative_dir == os.curdir else relative_dir
+        dirnames[:] = sorted(d for d in dirnames
+                             if not matcher.matches_directory(os.path.join(relative_dir, d)))
+        for filename in sorted(filenames):
+            if matcher.matches_file(os.path.join(relative_dir, filename)):
+                continue
+            if os.path.splitext(filename)[1].lower() in extensions:
+                yield Path(dirpath) / filename
+
 def find_files_to_analyze(repo_path: str, file_extensions: List[str], 
                          exclude_patterns: List[str], max_files: int,
                          files_to_analyze_file: str = None) -> List[Path]:
@@ -295,50 +448,159 @@ def find_files_to_analyze(repo_path: str, file_extensions: List[str],
         # Default behavior: scan repository for files matching extensions
         print(f"\033[93mNo files list provided. Scanning repository for files matching extensions...\033[0m")
         
-        repo_path_obj = Path(repo_path)
-        for ext in file_extensions:
-            for file_path in repo_path_obj.rglob(f"*.{ext}"):
-                # Check exclusion patterns
-                should_exclude = any(pattern in str(file_path) for pattern in exclude_patterns)
-                
-                if not should_exclude:
-                    files_to_analyze.append(file_path)
-                
-                # Limit the number of files if MaxFiles is set
-                if max_files > 0 and len(files_to_analyze) >= max_files:
-                    print(f"\033[93mReached maximum file limit ({max_files}). Use --max-files parameter to adjust.\033[0m")
-                    break
-            
-            if max_files > 0 and len(files_to_analyze) >= max_files:
-                break
+        files_to_analyze = list(islice(iter_source_files(repo_path, file_extensions, exclude_patterns),
+                                       max_files if max_files > 0 else None))
+        
+        if max_files > 0 and len(files_to_analyze) >= max_files:
+            print(f"\033[93mReached maximum file limit ({max_files}). Use --max-files parameter to adjust.\033[0m")
     
     return files_to_analyze
 
-def generate_report(results: List[Dict[str, Any]], output_file: str, repo_path: str):
-    """Generate markdown report"""
-    if not results:
-        print("No files were analyzed. Cannot generate report.")
+def analyze_file(file_path: Path, project_root: str, tree_sitter: bool = False) -> Dict[str, Any]:
+    """Analyze one file and return its report row"""
+    language = get_language_from_extension(str(file_path))
+    metrics = get_halstead_metrics(str(file_path), language, tree_sitter)
+    
+    return {
+        'file': str(file_path.relative_to(project_root)),
+        'language': language,
+        **metrics
+    }
+
+def analyze_chunk(file_paths: List[Path], project_root: str, tree_sitter: bool = False) -> List[Dict[str, Any]]:
+    """Analyze a chunk of files (unit of work sent to a worker process)"""
+    return [analyze_file(file_path, project_root, tree_sitter) for file_path in file_paths]
+
+def chunked(items: List[Path], size: int) -> Iterator[List[Path]]:
+    """Split items into consecutive lists of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def analyze_files(files: List[Path], project_root: str, workers: int = 1,
+                  tree_sitter: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Yield report rows in input order, analyzing files on a process pool
+    
+    Files are sent to workers in chunks so the per-task overhead stays small
+    next to the tokenizing work; workers=1 analyzes in this process.
+    """
+    if workers <= 1 or len(files) < 2:
+        for file_path in files:
+            yield analyze_file(file_path, project_root, tree_sitter)
         return
     
-    # Sort results by effort (descending)
-    sorted_results = sorted(results, key=lambda x: x['effort'], reverse=True)
+    chunk_size = max(1, min(64, len(files) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = executor.map(partial(analyze_chunk, project_root=project_root, tree_sitter=tree_sitter),
+                              chunked(files, chunk_size))
+        for chunk in chunks:
+            yield from chunk
+
+class ProgressBar:
+    """Single-line progress indicator redrawn at most every interval seconds"""
+    
+    def __init__(self, total: int, interval: float = 0.1, width: int = 30, stream=sys.stdout):
+        self.total = total
+        self.interval = interval
+        self.width = width
+        self.stream = stream
+        self.is_tty = stream.isatty()
+        self.count = 0
+        self._started = time.perf_counter()
+        self._last_draw = 0.0
+        if not self.is_tty:
+            self.interval = max(interval, 5.0)  # Plain lines in logs/pipes: keep them sparse
+    
+    def update(self, step: int = 1) -> None:
+        self.count += step
+        now = time.perf_counter()
+        if now - self._last_draw >= self.interval or self.count == self.total:
+            self._last_draw = now
+            self._draw(now)
+    
+    def _draw(self, now: float) -> None:
+        fraction = self.count / self.total if self.total else 1.0
+        elapsed = now - self._started
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        if self.is_tty:
+            filled = int(self.width * fraction)
+            bar = '#' * filled + '-' * (self.width - filled)
+            self.stream.write(f"\rAnalyzing [{bar}] {self.count}/{self.total} ({rate:.0f} files/s)")
+        else:
+            self.stream.write(f"Analyzed {self.count}/{self.total} files ({fraction:.0%}, {rate:.0f} files/s)\n")
+        self.stream.flush()
+    
+    def close(self) -> None:
+        if self.is_tty:
+            self.stream.write("\n")
+            self.stream.flush()
+
+class HalsteadReport:
+    """Streaming accumulator for the markdown report
     
-    # Calculate summary statistics
-    total_files = len(results)
-    avg_volume = sum(r['volume'] for r in results) / total_files
-    avg_difficulty = sum(r['difficulty'] for r in results) / total_files
-    avg_effort = sum(r['effort'] for r in results) / total_files
-    total_effort = sum(r['effort'] for r in results)
-    total_bugs = sum(r['bugs'] for r in results)
+    Results are added as they are produced. Only running totals, per-language
+    totals, the top files by effort and the high-complexity files are kept,
+    so the report never needs every per-file result in memory.
+    """
     
-    # High complexity files (effort > 100000)
-    high_complexity_files = [r for r in sorted_results if r['effort'] > 100000]
+    TOP_FILES = 20
+    HIGH_EFFORT_THRESHOLD = 100000
     
-    report = f"""# Halstead Complexity Metrics Analysis
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self.total_files = 0
+        self.total_volume = 0
+        self.total_difficulty = 0
+        self.total_effort = 0
+        self.total_bugs = 0
+        self.language_totals: Dict[str, List[float]] = {}  # language -> [files, volume, difficulty, effort]
+        self._top_files: List[Tuple[float, int, Dict[str, Any]]] = []  # min-heap of (effort, -index, result)
+        self._high_complexity: List[Tuple[int, Dict[str, Any]]] = []
+    
+    def add(self, result: Dict[str, Any]) -> None:
+        """Account for one file's metrics"""
+        index = self.total_files
+        self.total_files += 1
+        self.total_volume += result['volume']
+        self.total_difficulty += result['difficulty']
+        self.total_effort += result['effort']
+        self.total_bugs += result['bugs']
+        
+        totals = self.language_totals.setdefault(result['language'], [0, 0, 0, 0])
+        totals[0] += 1
+        totals[1] += result['volume']
+        totals[2] += result['difficulty']
+        totals[3] += result['effort']
+        
+        # Ties keep the earlier file, as a stable sort by effort would
+        entry = (result['effort'], -index, result)
+        if len(self._top_files) < self.TOP_FILES:
+            heapq.heappush(self._top_files, entry)
+        elif entry[:2] > self._top_files[0][:2]:
+            heapq.heapreplace(self._top_files, entry)
+        
+        if result['effort'] > self.HIGH_EFFORT_THRESHOLD:
+            self._high_complexity.append((index, result))
+    
+    def render(self) -> str:
+        """Build the markdown report from the accumulated results"""
+        total_files = self.total_files
+        avg_volume = self.total_volume / total_files
+        avg_difficulty = self.total_difficulty / total_files
+        avg_effort = self.total_effort / total_files
+        total_effort = self.total_effort
+        total_bugs = self.total_bugs
+        
+        # High complexity files (effort > 100000) and top files, by effort (descending)
+        high_complexity_files = [result for _, result in
+                                 sorted(self._high_complexity, key=lambda x: (-x[1]['effort'], x[0]))]
+        top_files = [result for _, _, result in sorted(self._top_files, key=lambda x: x[:2], reverse=True)]
+        
+        report = f"""# Halstead Complexity Metrics Analysis
 
 ## Summary
 
-- **Repository**: {repo_path}
+- **Repository**: {self.repo_path}
 - **Files Analyzed**: {total_files}
 - **Average Volume**: {avg_volume:.2f}
 - **Average Difficulty**: {avg_difficulty:.2f}
@@ -351,20 +613,20 @@ def generate_report(results: List[Dict[str, Any]], output_file: str, repo_path:
 Files with **Effort > 100,000** should be prioritized for refactoring:
 
 """
-    
-    if high_complexity_files:
-        report += "| File | Volume | Difficulty | Effort | Est. Time (min) | Est. Bugs |\n"
-        report += "|------|--------|------------|--------|-----------------|----------|\n"
         
-        for item in high_complexity_files:
-            time_in_minutes = round(item['time'] / 60, 1)
-            report += f"| {item['file']} | {item['volume']} | {item['difficulty']} | {item['effort']} | {time_in_minutes} | {item['bugs']} |\n"
+        if high_complexity_files:
+            report += "| File | Volume | Difficulty | Effort | Est. Time (min) | Est. Bugs |\n"
+            report += "|------|--------|------------|--------|-----------------|----------|\n"
+            
+            for item in high_complexity_files:
+                time_in_minutes = round(item['time'] / 60, 1)
+                report += f"| {item['file']} | {item['volume']} | {item['difficulty']} | {item['effort']} | {time_in_minutes} | {item['bugs']} |\n"
+            
+            report += "\n\n**These files should be prioritized for refactoring, simplification, and documentation.**\n"
+        else:
+            report += "\n\n_No files exceeded high-complexity thresholds for refactoring._\n"
         
-        report += "\n\n**These files should be prioritized for refactoring, simplification, and documentation.**\n"
-    else:
-        report += "\n\n_No files exceeded high-complexity thresholds for refactoring._\n"
-    
-    report += """
+        report += """
 
 ## Files Ranked by Effort
 
@@ -373,33 +635,28 @@ The following files require the most effort to understand and maintain:
 | File | Volume | Difficulty | Effort | Est. Time (min) | Est. Bugs |
 |------|--------|------------|--------|----------------|-----------|
 """
-    
-    for item in sorted_results[:20]:  # Top 20 files
-        time_in_minutes = round(item['time'] / 60, 1)
-        report += f"| {item['file']} | {item['volume']} | {item['difficulty']} | {item['effort']} | {time_in_minutes} | {item['bugs']} |\n"
-    
-    report += "\n\n## Files Grouped by Language\n"
-    
-    # Group by language
-    language_groups = defaultdict(list)
-    for result in results:
-        language_groups[result['language']].append(result)
-    
-    for language, group in language_groups.items():
-        lang_avg_volume = sum(r['volume'] for r in group) / len(group)
-        lang_avg_difficulty = sum(r['difficulty'] for r in group) / len(group)
-        lang_avg_effort = sum(r['effort'] for r in group) / len(group)
         
-        report += f"""
-### {language} Files ({len(group)} files)
+        for item in top_files:  # Top 20 files
+            time_in_minutes = round(item['time'] / 60, 1)
+            report += f"| {item['file']} | {item['volume']} | {item['difficulty']} | {item['effort']} | {time_in_minutes} | {item['bugs']} |\n"
+        
+        report += "\n\n## Files Grouped by Language\n"
+        
+        for language, (count, volume, difficulty, effort) in self.language_totals.items():
+            lang_avg_volume = volume / count
+            lang_avg_difficulty = difficulty / count
+            lang_avg_effort = effort / count
+            
+            report += f"""
+### {language} Files ({count} files)
 
 - **Average Volume**: {lang_avg_volume:.2f}
 - **Average Difficulty**: {lang_avg_difficulty:.2f}
 - **Average Effort**: {lang_avg_effort:.2f}
 
 """
-    
-    report += """
+        
+        report += """
 
 ## Recommendations
 
@@ -429,15 +686,55 @@ Based on the Halstead metrics analysis:
 This analysis provides approximate Halstead metrics. For more accurate results, consider using language-specific static analysis tools.
 
 """
+        
+        return report
     
-    # Write report to file
-    output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(report)
+    def summary(self) -> Dict[str, Any]:
+        """Totals, averages and per-language averages of the structured output"""
+        total_files = self.total_files or 1
+        return {
+            'repository': str(self.repo_path),
+            'files_analyzed': self.total_files,
+            'average_volume': round(self.total_volume / total_files, 2),
+            'average_difficulty': round(self.total_difficulty / total_files, 2),
+            'average_effort': round(self.total_effort / total_files, 2),
+            'total_effort': round(self.total_effort, 2),
+            'total_bugs': round(self.total_bugs, 3),
+            'high_complexity_files': len(self._high_complexity),
+            'languages': {
+                language: {
+                    'files': count,
+                    'average_volume': round(volume / count, 2),
+                    'average_difficulty': round(difficulty / count, 2),
+                    'average_effort': round(effort / count, 2)
+                }
+                for language, (count, volume, difficulty, effort) in self.language_totals.items()
+            }
+        }
     
-    print(f"\033[92mAnalysis complete. Report saved to {output_file}\033[0m")
+    def write(self, output_file: str) -> None:
+        """Render the report and write it to output_file"""
+        if not self.total_files:
+            print("No files were analyzed. Cannot generate report.")
+            return
+        
+        report = self.render()
+        
+        # Write report to file
+        output_path = Path(output_file)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(report)
+        
+        print(f"\033[92mAnalysis complete. Report saved to {output_file}\033[0m")
+
+def generate_report(results: List[Dict[str, Any]], output_file: str, repo_path: str):
+    """Generate markdown report"""
+    report = HalsteadReport(repo_path)
+    for result in results:
+        report.add(result)
+    report.write(output_file)
 
 def main():
     parser = argparse.ArgumentParser(description='Analyze Halstead complexity metrics for source code files')
@@ -448,9 +745,16 @@ def main():
                        help='File extensions to analyze (without the dot)')
     parser.add_argument('--exclude-patterns', nargs='+',
                        default=['node_modules', 'dist', 'bin', 'obj', 'build', 'target', 'vendor', 'packages'],
-                       help='Patterns to exclude from analysis')
-    parser.add_argument('--max-files', type=int, default=500,
-                       help='Maximum number of files to analyze (0 for unlimited)')
+                       help='Directory or file names, globs or .gitignore-style patterns to exclude from analysis')
+    parser.add_argument('--max-files', type=int, default=0,
+                       help='Maximum number of files to analyze (0 for unlimited, the default)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of worker processes (0 for one per CPU, default: 1)')
+    parser.add_argument('--format', dest='output_format', choices=OUTPUT_FORMATS, default='markdown',
+                       help='Report format: Markdown, or JSON/CSV/NDJSON records for other tools (default: markdown)')
+    parser.add_argument('--tree-sitter', action='store_true',
+                       help='Count operators and operands on tree-sitter syntax trees for languages with an '
+                            'installed grammar (regex tokenizer otherwise)')
     parser.add_argument('--files-to-analyze-file',
                        help='Path to a text file containing a list of files to analyze')
     
@@ -470,7 +774,7 @@ def main():
         if not args.output_file:
             findings_dir = Path(project_root) / "olaf-data" / "findings"
             findings_dir.mkdir(parents=True, exist_ok=True)
-            args.output_file = str(findings_dir / "halstead-metrics.md")
+            args.output_file = str(findings_dir / f"halstead-metrics{FORMAT_SUFFIXES[args.output_format]}")
             print(f"Created findings directory: {findings_dir}")
         
         # Get all files to analyze
@@ -485,27 +789,36 @@ def main():
             print("No files found to analyze.")
             sys.exit(1)
         
-        print(f"Found {len(files_to_analyze)} files to analyze.")
+        if args.tree_sitter and not treesitter_backend.available():
+            print("\033[93mWarning: tree-sitter is not installed (pip install tree-sitter), "
+                  "using the regex tokenizer\033[0m")
+            args.tree_sitter = False
         
-        # Analyze files
-        results = []
-        for i, file_path in enumerate(files_to_analyze, 1):
-            print(f"Analyzing {i}/{len(files_to_analyze)}: {file_path.name}")
-            
-            language = get_language_from_extension(str(file_path))
-            metrics = get_halstead_metrics(str(file_path), language)
-            
-            relative_path = file_path.relative_to(project_root)
-            
-            result = {
-                'file': str(relative_path),
-                'language': language,
-                **metrics
-            }
-            results.append(result)
+        workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+        print(f"Found {len(files_to_analyze)} files to analyze ({workers} worker{'s' if workers > 1 else ''}).")
+        
+        # Analyze files, streaming each result into the report (and the record writer)
+        report = HalsteadReport(project_root)
+        writer: Optional[RecordWriter] = None
+        if args.output_format != 'markdown':
+            writer = open_record_writer(args.output_format, args.output_file, RECORD_FIELDS)
+        progress = ProgressBar(len(files_to_analyze))
+        try:
+            for result in analyze_files(files_to_analyze, project_root, workers, args.tree_sitter):
+                report.add(result)
+                if writer:
+                    writer.write(result)
+                progress.update()
+        finally:
+            progress.close()
+            if writer:
+                writer.close(report.summary())
         
         # Generate report
-        generate_report(results, args.output_file, project_root)
+        if writer:
+            print(f"\033[92mAnalysis complete. {writer.records_written} records saved to {args.output_file}\033[0m")
+        else:
+            report.write(args.output_file)
         
     except Exception as e:
         print(f"Error during analysis: {e}")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Persistent Per-File Result Cache for Project Onboarding
+
+Stores per-file analysis results (line counts, binary flags, complexity
+results, ...) in a SQLite database under `.olaf-cache/` so that reruns of the
+onboarding analyzers only re-read files that changed since the last run.
+
+Entries are keyed by analyzer namespace and relative path, and validated
+against the file's mtime and size (optionally also a BLAKE2 content hash).
+The cache is bounded by entry count; least recently used entries are evicted.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_NAME = '.olaf-cache'
+CACHE_FILE_NAME = 'analysis-cache.sqlite'
+DEFAULT_MAX_ENTRIES = 500_000
+
+# Bump when the stored layout changes; older databases are discarded
+SCHEMA_VERSION = 1
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_digest(file_path: Path) -> str:
+    """Return the BLAKE2b content hash of a file."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """SQLite-backed cache of per-file analysis results."""
+
+    def __init__(self, cache_dir: Path, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 verify_hash: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / CACHE_FILE_NAME
+        self.max_entries = max_entries
+        self.verify_hash = verify_hash
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+
+        self.connection = sqlite3.connect(str(self.db_path))
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self._ensure_schema()
+
+    @classmethod
+    def for_repository(cls, repo_path: Path, **kwargs) -> 'AnalysisCache':
+        """Open the cache stored in the repository's .olaf-cache directory."""
+        return cls(Path(repo_path) / CACHE_DIR_NAME, **kwargs)
+
+    def _ensure_schema(self) -> None:
+        """Create tables, discarding databases written by another schema version."""
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.connection.execute('DROP TABLE IF EXISTS results')
+            self.connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                namespace TEXT NOT NULL,
+                path TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                digest TEXT,
+                payload TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (namespace, path)
+            )
+        ''')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+        self.connection.commit()
+
+    def _signature(self, file_path: Path, stat_result: Optional[os.stat_result]):
+        """Return (mtime_ns, size) for the file, or None if it cannot be stat'ed."""
+        try:
+            stat_result = stat_result or file_path.stat()
+        except OSError:
+            return None
+        return stat_result.st_mtime_ns, stat_result.st_size
+
+    def get(self, namespace: str, rel_path: str, file_path: Path,
+            stat_result: Optional[os.stat_result] = None) -> Optional[Any]:
+        """Return the cached result if the file is unchanged, otherwise None."""
+        signature = self._signature(file_path, stat_result)
+        row = self.connection.execute(
+            'SELECT mtime_ns, size, digest, payload FROM results WHERE namespace = ? AND path = ?',
+            (namespace, rel_path)
+        ).fetchone()
+
+        if row is None or signature is None or signature != (row[0], row[1]):
+            self.misses += 1
+            return None
+
+        if self.verify_hash:
+            try:
+                if row[2] != file_digest(file_path):
+                    self.misses += 1
+                    return None
+            except OSError:
+                self.misses += 1
+                return None
+
+        self.hits += 1
+        self.connection.execute(
+            'UPDATE results SET last_used = ? WHERE namespace = ? AND path = ?',
+            (time.time(), namespace, rel_path)
+        )
+        self._count_write()
+        return json.loads(row[3])
+
+    def put(self, namespace: str, rel_path: str, file_path: Path, result: Any,
+            stat_result: Optional[os.stat_result] = None) -> None:
+        """Store a JSON-serializable result for the file's current state."""
+        signature = self._signature(file_path, stat_result)
+        if signature is None:
+            return
+
+        digest = None
+        if self.verify_hash:
+            try:
+                digest = file_digest(file_path)
+            except OSError:
+                return
+
+        self.connection.execute(
+            'INSERT OR REPLACE INTO results (namespace, path, mtime_ns, size, digest, payload, last_used) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (namespace, rel_path, signature[0], signature[1], digest,
+             json.dumps(result, separators=(',', ':')), time.time())
+        )
+        self._count_write()
+
+    def _count_write(self) -> None:
+        """Commit periodically so long runs do not hold one huge transaction."""
+        self._pending_writes += 1
+        if self._pending_writes >= 1000:
+            self.connection.commit()
+            self._pending_writes = 0
+
+    def evict(self) -> int:
+        """Drop least recently used entries beyond max_entries; return count removed."""
+        total = self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        excess = total - self.max_entries
+        if excess <= 0:
+            return 0
+
+        self.connection.execute(
+            'DELETE FROM results WHERE rowid IN '
+            '(SELECT rowid FROM results ORDER BY last_used ASC LIMIT ?)',
+            (excess,)
+        )
+        self.connection.commit()
+        return excess
+
+    def close(self) -> None:
+        """Evict over-limit entries, commit and close the database."""
+        evicted = self.evict()
+        self.connection.commit()
+        self.connection.close()
+        logger.info(f"Analysis cache: {self.hits} hits, {self.misses} misses"
+                    + (f", {evicted} entries evicted" if evicted else ""))
+
+
+def add_cache_arguments(parser) -> None:
+    """Register the shared result-cache command line options on a parser."""
+    parser.add_argument('--cache', action='store_true',
+                        help=f'Reuse per-file results from {CACHE_DIR_NAME}/ for unchanged files')
+    parser.add_argument('--cache-dir', default=None,
+                        help=f'Cache directory (implies --cache, default: <repo>/{CACHE_DIR_NAME})')
+    parser.add_argument('--cache-verify-hash', action='store_true',
+                        help='Also compare BLAKE2 content hashes, not only mtime and size')
+    parser.add_argument('--cache-max-entries', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help=f'Maximum cached entries before LRU eviction (default: {DEFAULT_MAX_ENTRIES})')
+
+
+def open_cache_from_args(args, repo_path) -> Optional[AnalysisCache]:
+    """Open the cache requested on the command line, or return None."""
+    if not (args.cache or args.cache_dir):
+        return None
+    cache_dir = Path(args.cache_dir) if args.cache_dir else Path(repo_path).resolve() / CACHE_DIR_NAME
+    return AnalysisCache(cache_dir, max_entries=args.cache_max_entries,
+                         verify_hash=args.cache_verify_hash)
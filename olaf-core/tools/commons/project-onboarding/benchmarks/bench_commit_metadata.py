@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one-pass commit metadata scan vs. per-question git log traversals
+
+Compares ContributorAnalyzer.scan_commit_history, which reads author, email
+and date for every commit from a single streamed git log, with the previous
+approach: `git log --oneline` twice, `%an`, `%an|%ae`, and one
+`git log --author=` per top-10 contributor.
+
+Usage:
+    python benchmarks/bench_commit_metadata.py [repo_path] [--months 12] [--repeat 3]
+"""
+
+import argparse
+import logging
+import subprocess
+import sys
+import timeit
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from contributor_analyzer import ContributorAnalyzer  # noqa: E402
+
+
+def git(repo_path, *args):
+    return subprocess.run(['git', *args], cwd=repo_path, capture_output=True, text=True,
+                          encoding='utf-8', errors='replace').stdout.strip()
+
+
+def legacy_scan(repo_path, since_date):
+    """Traversals performed before the one-pass scan; returns (commits, invocations)."""
+    invocations = 0
+
+    oneline = git(repo_path, 'log', '--oneline', f'--since={since_date}')
+    total_commits = len(git(repo_path, 'log', '--oneline', f'--since={since_date}').split('\n')) if oneline else 0
+    invocations += 2
+
+    contributors = Counter(git(repo_path, 'log', '--pretty=format:%an', f'--since={since_date}').split('\n'))
+    git(repo_path, 'log', '--pretty=format:%an|%ae', f'--since={since_date}')
+    invocations += 2
+
+    for contributor, _ in contributors.most_common(10):
+        git(repo_path, 'log', '--author=' + contributor, '--pretty=format:%ad', '--date=short',
+            f'--since={since_date}')
+        invocations += 1
+
+    return total_commits, invocations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark contributor commit metadata extraction')
+    parser.add_argument('repo_path', nargs='?', default='.', help='Git repository (default: current directory)')
+    parser.add_argument('--months', type=int, default=12, help='Analysis period in months')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    repo_path = git(args.repo_path, 'rev-parse', '--show-toplevel') or args.repo_path
+    analyzer = ContributorAnalyzer(repo_path, args.months)
+
+    legacy_commits, legacy_invocations = legacy_scan(repo_path, analyzer.since_date)
+    _, one_pass_commits, _ = analyzer.scan_commit_history()
+
+    legacy_time = min(timeit.repeat(lambda: legacy_scan(repo_path, analyzer.since_date),
+                                    number=1, repeat=args.repeat))
+    one_pass_time = min(timeit.repeat(analyzer.scan_commit_history, number=1, repeat=args.repeat))
+
+    print(f"Repository: {repo_path} ({one_pass_commits:,} commits since {analyzer.since_date})")
+    print(f"Per-question traversals: {legacy_time * 1000:9.1f} ms  ({legacy_invocations} git log runs)")
+    print(f"One-pass scan:           {one_pass_time * 1000:9.1f} ms  (1 git log run)")
+    print(f"Speedup:                 {legacy_time / one_pass_time:9.1f}x")
+    if legacy_commits != one_pass_commits:
+        print(f"Warning: commit counts differ ({legacy_commits} vs {one_pass_commits})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: combined-alternation ConditionalScanner vs. per-line regex loop
+
+Compares the single-pass scanner used by HotspotAnalyzer.analyze_file_complexity
+with the previous implementation, which ran 14 separate re.findall calls on
+every line. Runs on a synthetic C++ buffer by default, or on files given on the
+command line.
+
+Usage:
+    python benchmarks/bench_conditional_scanner.py [--lines 50000] [--repeat 5] [files...]
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hotspot_analyzer import CONDITIONAL_SCANNER  # noqa: E402
+
+# Patterns and loop as they were before the combined scanner was introduced
+LEGACY_PATTERNS = [
+    r'if\s*\(',
+    r'else\s*{',
+    r'else\s+if',
+    r'switch\s*\(',
+    r'case\s+[^:]*:',
+    r'for\s*\(',
+    r'while\s*\(',
+    r'do\s*{',
+    r'\?\s*.*\s*:',
+    r'&&',
+    r'\|\|',
+    r'catch\s*\(',
+    r'except\s*:',
+    r'finally\s*:',
+]
+
+CPP_SNIPPET = """\
+int process(const std::vector<int>& values, int limit) {
+    int total = 0;
+    for (size_t i = 0; i < values.size(); ++i) {
+        if (values[i] > limit && values[i] % 2 == 0) {
+            total += values[i];
+        } else if (values[i] < 0 || values[i] == limit) {
+            total -= 1;
+        } else {
+            total = total > 100 ? total / 2 : total;
+        }
+        switch (values[i]) {
+            case 1: total++; break;
+            case 2: total--; break;
+        }
+    }
+    while (total > limit) {
+        total -= limit;
+    }
+    try {
+        validate(total);
+    } catch (const std::exception& e) {
+        return -1;
+    }
+    return total;
+}
+"""
+
+
+def legacy_count(lines):
+    """Per-line loop over 14 separate patterns (previous implementation)."""
+    conditional_count = 0
+    for line in lines:
+        for pattern in LEGACY_PATTERNS:
+            conditional_count += len(re.findall(pattern, line, re.IGNORECASE))
+    return conditional_count
+
+
+def scanner_count(text):
+    """Single combined-alternation pass over the whole buffer."""
+    return sum(CONDITIONAL_SCANNER.scan(text).values())
+
+
+def load_corpus(files, line_target):
+    """Return the benchmark buffer from files or the synthetic snippet."""
+    if files:
+        return ''.join(Path(f).read_text(encoding='utf-8', errors='ignore') for f in files)
+    snippet_lines = CPP_SNIPPET.count('\n')
+    return CPP_SNIPPET * max(1, line_target // snippet_lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hotspot conditional counting')
+    parser.add_argument('files', nargs='*', help='Source files to benchmark (default: synthetic C++)')
+    parser.add_argument('--lines', type=int, default=50000, help='Synthetic corpus size in lines')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    text = load_corpus(args.files, args.lines)
+    lines = text.splitlines(keepends=True)
+
+    legacy_total = legacy_count(lines)
+    scanner_total = scanner_count(text)
+
+    legacy_time = min(timeit.repeat(lambda: legacy_count(lines), number=1, repeat=args.repeat))
+    scanner_time = min(timeit.repeat(lambda: scanner_count(text), number=1, repeat=args.repeat))
+
+    print(f"Corpus: {len(lines):,} lines, {len(text):,} characters")
+    print(f"Per-line loop:     {legacy_time * 1000:9.1f} ms  ({legacy_total:,} indicators)")
+    print(f"Combined scanner:  {scanner_time * 1000:9.1f} ms  ({scanner_total:,} indicators)")
+    print(f"Speedup:           {legacy_time / scanner_time:9.1f}x")
+    if legacy_total != scanner_total:
+        print("Note: counts differ because the scanner counts every ternary '?' on a line,"
+              " where the greedy legacy pattern counted at most one per line.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled path-component exclusion vs. substring exclusion
+
+Enumerates a synthetic tree of 1M entries (files and directories, held in
+memory so no disk I/O is timed) the way the analyzers do: excluded
+directories are pruned while walking, then every remaining file is checked.
+The previous rules searched each exclude pattern as a substring of the
+directory name and of the full file path; PathMatcher compares whole path
+components against a set and caches directory decisions. Also reports the
+files the substring rules dropped by mistake (outbox/ for 'out', ...).
+
+Given a project path, times FileInventory.scan and the per-file check on
+that tree instead.
+
+Usage:
+    python benchmarks/bench_path_matcher.py [--entries 1000000] [--repeat 3] [project_path]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import timeit
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from file_inventory import FileInventory  # noqa: E402
+from language_distribution_analyzer import LanguageDistributionAnalyzer  # noqa: E402
+from path_matcher import PathMatcher  # noqa: E402
+
+# Directory names: mostly ordinary, some excluded, some merely containing an exclude pattern
+DIRECTORY_NAMES = ['src', 'lib', 'core', 'api', 'utils', 'models', 'views', 'tests', 'docs', 'internal',
+                   'services', 'components', 'handlers', 'config', 'scripts', 'assets']
+EXCLUDED_NAMES = ['node_modules', 'build', 'dist', 'out', 'tmp', '.git', '__pycache__', 'coverage']
+LOOKALIKE_NAMES = ['outbox', 'layout', 'checkout', 'binary', 'objects', 'targets', 'distributed']
+# Share of directories named from EXCLUDED_NAMES and LOOKALIKE_NAMES
+EXCLUDED_SHARE = 0.03
+LOOKALIKE_SHARE = 0.03
+FILE_NAMES = ['index', 'main', 'config', 'handler', 'service', 'model', 'view', 'helpers', 'types',
+              'client', 'server', 'router', 'schema', 'layout', 'timeout']
+EXTENSIONS = ['.py', '.js', '.ts', '.go', '.java', '.md', '.json', '.css', '.c', '.h']
+
+
+def legacy_pruner(patterns):
+    """Directory-name predicate of the substring rules (previous file_inventory.substring_pruner)."""
+    patterns = tuple(patterns)
+    return lambda name: any(pattern in name for pattern in patterns)
+
+
+def legacy_excludes(patterns):
+    """Per-file check of the substring rules (previous should_exclude_path)."""
+    patterns = tuple(patterns)
+    return lambda path: any(pattern in str(path) for pattern in patterns)
+
+
+def build_tree(entries: int, seed: int = 0) -> dict:
+    """Nested dict tree: directory name -> subtree, file name -> None."""
+    rng = random.Random(seed)
+    root: dict = {}
+    pending = deque([root])
+    count = 0
+    while count < entries:
+        # Breadth first: every directory gets at least one subdirectory, so the queue never runs dry
+        directory = pending.popleft()
+        for _ in range(rng.randint(4, 12)):
+            name = rng.choice(FILE_NAMES) + f"_{count}" + rng.choice(EXTENSIONS)
+            directory[name] = None
+            count += 1
+        for _ in range(rng.randint(1, 4)):
+            subdirectory: dict = {}
+            draw = rng.random()
+            if draw < EXCLUDED_SHARE:
+                name = rng.choice(EXCLUDED_NAMES)
+            elif draw < EXCLUDED_SHARE + LOOKALIKE_SHARE:
+                name = rng.choice(LOOKALIKE_NAMES)
+            else:
+                name = rng.choice(DIRECTORY_NAMES) + f"_{count}"
+            directory[name] = subdirectory
+            pending.append(subdirectory)
+            count += 1
+    return root
+
+
+def walk(tree: dict, root: str, prune, join_relative: bool):
+    """Yield file paths below root, pruning directories; prune gets a name or a relative path."""
+    stack = [('', tree)]
+    while stack:
+        relative_dir, directory = stack.pop()
+        for name, subtree in directory.items():
+            relative_path = f"{relative_dir}/{name}" if relative_dir else name
+            if subtree is None:
+                yield f"{root}/{relative_path}"
+            elif not prune(relative_path if join_relative else name):
+                stack.append((relative_path, subtree))
+
+
+def count_entries(tree: dict) -> int:
+    return sum(1 + (count_entries(subtree) if subtree is not None else 0) for subtree in tree.values())
+
+
+def bench_synthetic(entries: int, repeat: int, patterns) -> None:
+    root = '/home/user/project'
+    tree = build_tree(entries)
+    matcher = PathMatcher(patterns, root=root)
+    prune, excludes = legacy_pruner(patterns), legacy_excludes(patterns)
+
+    def legacy():
+        return [path for path in walk(tree, root, prune, False) if not excludes(path)]
+
+    def compiled():
+        fresh = PathMatcher(patterns, root=root)  # no directory decisions cached from an earlier run
+        return [path for path in walk(tree, root, fresh.matches_directory, True) if not fresh.matches_file(path)]
+
+    legacy_files, compiled_files = set(legacy()), set(compiled())
+    legacy_time = min(timeit.repeat(legacy, number=1, repeat=repeat))
+    compiled_time = min(timeit.repeat(compiled, number=1, repeat=repeat))
+    dropped = compiled_files - legacy_files
+    assert not legacy_files - compiled_files, "component matching kept less than substring matching"
+    assert not any(matcher.matches_file(path) for path in compiled_files)
+
+    print(f"Synthetic tree: {count_entries(tree):,} entries, {len(compiled_files):,} files kept")
+    print(f"Substring rules:  {legacy_time * 1000:9.1f} ms")
+    print(f"PathMatcher:      {compiled_time * 1000:9.1f} ms  ({legacy_time / compiled_time:.1f}x)")
+    print(f"Files the substring rules dropped by mistake: {len(dropped):,}")
+
+
+def bench_project(project_path: str, repeat: int, patterns) -> None:
+    root = Path(project_path).resolve()
+    prune, excludes = legacy_pruner(patterns), legacy_excludes(patterns)
+
+    def legacy():
+        inventory = FileInventory.scan(root, prune=prune)
+        return [path for path in inventory.paths() if not excludes(path)]
+
+    def compiled():
+        matcher = PathMatcher(patterns, root=root)
+        inventory = FileInventory.scan(root, prune=matcher.matches_directory)
+        return [path for path in inventory.paths() if not matcher.matches_file(path)]
+
+    legacy_files, compiled_files = legacy(), compiled()
+    legacy_time = min(timeit.repeat(legacy, number=1, repeat=repeat))
+    compiled_time = min(timeit.repeat(compiled, number=1, repeat=repeat))
+    print(f"Project: {root}")
+    print(f"Substring rules:  {legacy_time * 1000:9.1f} ms  ({len(legacy_files):,} files)")
+    print(f"PathMatcher:      {compiled_time * 1000:9.1f} ms  ({len(compiled_files):,} files)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark path-component exclusion matching')
+    parser.add_argument('project_path', nargs='?', help='Project directory to walk instead of the synthetic tree')
+    parser.add_argument('--entries', type=int, default=1_000_000, help='Entries in the synthetic tree')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    # The language distribution analyzer has the longest default exclude list
+    patterns = LanguageDistributionAnalyzer(os.curdir).exclude_patterns
+    if args.project_path:
+        bench_project(args.project_path, args.repeat, patterns)
+    else:
+        bench_synthetic(args.entries, args.repeat, patterns)
+
+
+if __name__ == '__main__':
+    main()
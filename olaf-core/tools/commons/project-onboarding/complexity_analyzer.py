@@ -8,16 +8,27 @@ providing detailed function-level and file-level complexity metrics.
 Based on PowerShell analyze-cyclomatic-complexity.ps1 from OLAF toolkit.
 """
 
+import ast
+import bisect
+import heapq
 import os
 import re
 import json
 import argparse
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, NamedTuple
 import logging
 
+from analysis_cache import AnalysisCache, add_cache_arguments, open_cache_from_args
+from file_inventory import FileInventory, add_enumeration_arguments
+from path_matcher import PathMatcher, add_exclude_arguments, exclude_patterns_from_args
+from structured_output import (FORMAT_SUFFIXES, RecordWriter, add_format_arguments,
+                               open_record_writer)
+import treesitter_backend
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -33,6 +44,277 @@ class FunctionComplexity(NamedTuple):
     complexity_density: float
 
 
+class PythonComplexityVisitor(ast.NodeVisitor):
+    """
+    McCabe complexity of every Python function and method in one tree visit.
+    
+    Each function starts at 1 and gains one per if/elif, conditional
+    expression, loop, except handler, match case, comprehension 'for' and
+    'if' clause, and extra boolean operand. Lambdas and comprehensions count
+    towards their enclosing function; nested functions and methods are
+    separate entries with qualified names (Class.method, outer.inner).
+    """
+    
+    def __init__(self):
+        self.functions: List[FunctionComplexity] = []
+        self._scopes: List[str] = []
+        self._complexity: List[int] = []  # per enclosing function, innermost last
+    
+    def _function(self, node) -> None:
+        self._scopes.append(node.name)
+        self._complexity.append(1)
+        self.generic_visit(node)
+        complexity = self._complexity.pop()
+        
+        line_count = node.end_lineno - node.lineno + 1
+        self.functions.append(FunctionComplexity(
+            name='.'.join(self._scopes),
+            start_line=node.lineno,
+            end_line=node.end_lineno,
+            line_count=line_count,
+            complexity=complexity,
+            complexity_density=round(complexity / line_count, 3)
+        ))
+        self._scopes.pop()
+    
+    visit_FunctionDef = visit_AsyncFunctionDef = _function
+    
+    def visit_ClassDef(self, node) -> None:
+        self._scopes.append(node.name)
+        self.generic_visit(node)
+        self._scopes.pop()
+    
+    def _decision(self, node, paths: int = 1) -> None:
+        if self._complexity:
+            self._complexity[-1] += paths
+        self.generic_visit(node)
+    
+    def visit_If(self, node) -> None:  # elif is a nested If
+        self._decision(node)
+    
+    visit_IfExp = visit_For = visit_AsyncFor = visit_While = visit_ExceptHandler = visit_If
+    visit_match_case = visit_If
+    
+    def visit_BoolOp(self, node) -> None:
+        self._decision(node, len(node.values) - 1)
+    
+    def visit_comprehension(self, node) -> None:
+        self._decision(node, 1 + len(node.ifs))
+    
+    @classmethod
+    def analyze(cls, source: str) -> List[FunctionComplexity]:
+        """Parse source and return its functions in source order."""
+        visitor = cls()
+        visitor.visit(ast.parse(source))
+        return sorted(visitor.functions, key=lambda func: func.start_line)
+
+
+class BraceLanguageScanner:
+    """
+    Function boundaries and decision points of a C-family source in linear passes.
+    
+    One regex pass blanks comments and string/char literals (keeping newlines,
+    so line numbers stay valid); a state machine then walks the remaining
+    braces and semicolons. The text since the last brace or semicolon is the
+    header of the next '{' and is matched against the language's function
+    pattern only there, outside any function. A function ends at the brace
+    that returns to its opening depth, so braces in strings or comments and
+    nested blocks cannot cut it short. Decision points are counted once over
+    the function body with a single combined regex.
+    """
+    
+    COMMENT_PATTERNS = [r'//[^\n]*', r'/\*[\s\S]*?\*/']
+    # Escape or single character only, so Rust lifetimes ('a) are not literals
+    CHAR_LITERAL = r"'(?:\\[^'\n]*|[^'\\\n])'"
+    DOUBLE_QUOTED = r'"(?:\\.|[^"\\\n])*"'
+    SINGLE_QUOTED = r"'(?:\\.|[^'\\\n])*'"
+    BACKTICK_QUOTED = r'`(?:\\.|[^`\\])*`'
+    
+    LITERAL_PATTERNS = {
+        'js': [DOUBLE_QUOTED, SINGLE_QUOTED, BACKTICK_QUOTED],
+        'ts': [DOUBLE_QUOTED, SINGLE_QUOTED, BACKTICK_QUOTED],
+        'php': [DOUBLE_QUOTED, SINGLE_QUOTED],
+        'go': [DOUBLE_QUOTED, CHAR_LITERAL, BACKTICK_QUOTED],
+        'cs': [r'@"(?:""|[^"])*"', DOUBLE_QUOTED, CHAR_LITERAL],
+        'default': [DOUBLE_QUOTED, CHAR_LITERAL]
+    }
+    
+    # if/else if, loops, case labels, catch clauses, short-circuit operators and ?:
+    DECISION_PATTERN = r'\b(?:if|for|foreach|while|case|catch)\b|&&|\|\||\?(?![.?])'
+    
+    # Control-flow headers the function patterns would otherwise take for functions
+    NOT_FUNCTION_NAMES = frozenset(['if', 'for', 'foreach', 'while', 'switch', 'catch', 'return',
+                                    'else', 'do', 'try', 'using', 'lock', 'synchronized', 'fixed',
+                                    'new', 'function', 'async', 'await', 'typeof', 'sizeof'])
+    MODIFIERS = frozenset(['public', 'private', 'protected', 'internal', 'static', 'final',
+                           'function', 'def', 'async', 'export'])
+    
+    # Longest header text a function pattern is matched against
+    MAX_HEADER = 500
+    
+    def __init__(self, language: str, function_pattern: str):
+        literals = self.LITERAL_PATTERNS.get(language, self.LITERAL_PATTERNS['default'])
+        comments = self.COMMENT_PATTERNS + ([r'#[^\n]*'] if language == 'php' else [])
+        self.strip_regex = re.compile('|'.join(f'(?:{p})' for p in comments + literals))
+        self.structure_regex = re.compile(r'[{};]')
+        self.function_regex = re.compile(f'(?:{function_pattern})\\s*\\Z')
+        self.decision_regex = re.compile(self.DECISION_PATTERN)
+    
+    @staticmethod
+    def _blank(match) -> str:
+        text = match.group()
+        # Keep a literal as an empty one and a comment as whitespace, both with their newlines
+        placeholder = '' if text[0] in '/#' else '""'
+        blanked = placeholder + '\n' * text.count('\n')
+        return blanked or ' '
+    
+    def strip(self, source: str) -> str:
+        """Replace comments and literals, preserving line breaks."""
+        return self.strip_regex.sub(self._blank, source)
+    
+    def _function_name(self, match) -> Tuple[Optional[str], int]:
+        """Return (name, offset in the match) of a function header; '' if anonymous, None if not a function."""
+        for index, group in enumerate(match.groups(), 1):
+            name = group.strip() if group else ''
+            if name and name not in self.MODIFIERS:
+                if name in self.NOT_FUNCTION_NAMES:
+                    return None, 0
+                return name, match.start(index)
+        return '', match.start() + len(match.group()) - len(match.group().lstrip())
+    
+    def analyze(self, source: str) -> List[FunctionComplexity]:
+        """Return the top-level functions (and methods) of source."""
+        code = self.strip(source)
+        newlines = [m.start() for m in re.finditer('\n', code)]
+        functions = []
+        
+        depth = 0
+        header_start = 0
+        current = None  # (name, start line, body start offset, depth outside the body)
+        
+        for match in self.structure_regex.finditer(code):
+            char, position = match.group(), match.start()
+            
+            if char == '{':
+                if current is None:
+                    header_offset = max(header_start, position - self.MAX_HEADER)
+                    func_match = self.function_regex.search(code[header_offset:position + 1])
+                    if func_match:
+                        name, name_offset = self._function_name(func_match)
+                        if name is not None:
+                            start_line = bisect.bisect_left(newlines, header_offset + name_offset) + 1
+                            current = (name or f"Anonymous_Function_Line_{start_line}",
+                                       start_line, position, depth)
+                depth += 1
+            elif char == '}':
+                depth = max(0, depth - 1)
+                if current is not None and depth == current[3]:
+                    name, start_line, body_start, _ = current
+                    end_line = bisect.bisect_left(newlines, position) + 1
+                    line_count = end_line - start_line + 1
+                    complexity = 1 + len(self.decision_regex.findall(code, body_start, position))
+                    functions.append(FunctionComplexity(
+                        name=name,
+                        start_line=start_line,
+                        end_line=end_line,
+                        line_count=line_count,
+                        complexity=complexity,
+                        complexity_density=round(complexity / line_count, 3)
+                    ))
+                    current = None
+            header_start = position + 1
+        
+        return functions
+
+
+# Complexity distribution buckets of the report, as (name, min, max)
+COMPLEXITY_RANGES = [
+    ('Low (1-5)', 1, 5),
+    ('Moderate (6-10)', 6, 10),
+    ('High (11-20)', 11, 20),
+    ('Very High (21-50)', 21, 50),
+    ('Extremely High (50+)', 51, float('inf'))
+]
+
+
+class ComplexityStats:
+    """
+    Running statistics of function results, in constant memory per function.
+    
+    Keeps count, sum, maximum and distribution counters plus bounded heaps for
+    the report tables: the top_k most complex functions and the functions over
+    the threshold (all of them unless max_exceeding is set). Ties keep input
+    order, as a stable sort of the full result list would.
+    """
+    
+    def __init__(self, threshold: int, top_k: int = 20, max_exceeding: Optional[int] = None):
+        self.threshold = threshold
+        self.top_k = top_k
+        self.max_exceeding = max_exceeding
+        self.count = 0
+        self.total_complexity = 0
+        self.max_complexity = 0
+        self.exceeding_count = 0
+        self.range_counts = [0] * len(COMPLEXITY_RANGES)
+        self._top: List[Tuple] = []        # min-heap of (complexity, -index, result)
+        self._exceeding: List[Tuple] = []  # same, bounded only by max_exceeding
+    
+    @staticmethod
+    def _push(heap: List[Tuple], entry: Tuple, limit: Optional[int]) -> None:
+        if limit is None or len(heap) < limit:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    
+    def add(self, result: Dict) -> None:
+        """Account for one function result."""
+        complexity = result['complexity']
+        entry = (complexity, -self.count, result)
+        self.count += 1
+        self.total_complexity += complexity
+        self.max_complexity = max(self.max_complexity, complexity)
+        
+        for i, (_, low, high) in enumerate(COMPLEXITY_RANGES):
+            if low <= complexity <= high:
+                self.range_counts[i] += 1
+                break
+        
+        self._push(self._top, entry, self.top_k)
+        if complexity > self.threshold:
+            self.exceeding_count += 1
+            self._push(self._exceeding, entry, self.max_exceeding)
+    
+    @staticmethod
+    def _ordered(heap: List[Tuple]) -> List[Dict]:
+        return [result for _, _, result in sorted(heap, key=lambda x: x[:2], reverse=True)]
+    
+    def top_functions(self) -> List[Dict]:
+        """The most complex functions, most complex first."""
+        return self._ordered(self._top)
+    
+    def exceeding_functions(self) -> List[Dict]:
+        """Functions over the threshold (possibly capped), most complex first."""
+        return self._ordered(self._exceeding)
+
+
+# Per-process analyzer used by the parallel file stage
+_worker_analyzer = None
+
+
+def _init_worker(repo_path: str, options: Dict) -> None:
+    """Create the analyzer instance reused by a worker process."""
+    global _worker_analyzer
+    _worker_analyzer = ComplexityAnalyzer(repo_path, **options)
+
+
+def _analyze_chunk(file_paths: List[str]) -> List[List[Tuple]]:
+    """Analyze a chunk of files in a worker, returning plain tuples per file."""
+    return [
+        [tuple(func) for func in _worker_analyzer.analyze_file(Path(file_path))]
+        for file_path in file_paths
+    ]
+
+
 class ComplexityAnalyzer:
     """Analyzes cyclomatic complexity for source code files."""
     
@@ -92,51 +374,151 @@ class ComplexityAnalyzer:
         '.hpp': 'cpp'
     }
     
-    def __init__(self, repo_path: str, output_file: str = None, complexity_threshold: int = 10):
+    # Files handed to a worker process per task in parallel mode
+    MAX_CHUNK_SIZE = 64
+    
+    # Result cache namespace; bump when the analysis logic changes
+    CACHE_NAMESPACE = 'complexity/v1'
+    
+    # Python engines: line regexes with indentation heuristics, or the ast module
+    PYTHON_ENGINES = ('regex', 'ast')
+    
+    # Brace-language engines: per-line regexes, or BraceLanguageScanner
+    BRACE_ENGINES = ('regex', 'tokens')
+    
+    # Columns of the structured (JSON/CSV/NDJSON) output, one record per function
+    RECORD_FIELDS = ['file', 'function', 'start_line', 'end_line', 'line_count',
+                     'complexity', 'complexity_density']
+    
+    def __init__(self, repo_path: str, output_file: str = None, complexity_threshold: int = 10,
+                 jobs: int = 1, cache: Optional[AnalysisCache] = None,
+                 inventory: Optional[FileInventory] = None, output_format: str = 'markdown',
+                 streaming: bool = False, max_listed: int = 500, python_engine: str = 'regex',
+                 brace_engine: str = 'regex', tree_sitter: bool = False, enumeration: str = 'walk',
+                 extra_excludes: Optional[List[str]] = None):
         self.repo_path = Path(repo_path).resolve()
-        self.output_file = output_file or self.repo_path / "cyclomatic-complexity.md"
+        self.output_format = output_format
+        self.output_file = output_file or self.repo_path / f"cyclomatic-complexity{FORMAT_SUFFIXES[output_format]}"
         self.complexity_threshold = complexity_threshold
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.cache = cache
+        self.inventory = inventory
+        self.enumeration = enumeration
+        # Streaming mode keeps no per-function results, only ComplexityStats
+        # with at most max_listed functions in the threshold table
+        self.streaming = streaming
+        self.max_listed = max_listed
+        self.python_engine = python_engine
+        self.brace_engine = brace_engine
+        self._scanners: Dict[str, BraceLanguageScanner] = {}
+        # Languages without an installed grammar keep the engines above
+        if tree_sitter and not treesitter_backend.available():
+            logger.warning("tree-sitter is not installed (pip install tree-sitter), using the regex engines")
+            tree_sitter = False
+        self.tree_sitter = tree_sitter
+        # Engines produce different results for the same file
+        if python_engine != 'regex':
+            self.CACHE_NAMESPACE = f"{self.CACHE_NAMESPACE}/python-{python_engine}"
+        if brace_engine != 'regex':
+            self.CACHE_NAMESPACE = f"{self.CACHE_NAMESPACE}/brace-{brace_engine}"
+        if tree_sitter:
+            self.CACHE_NAMESPACE = f"{self.CACHE_NAMESPACE}/tree-sitter"
         self.exclude_patterns = [
             'node_modules', 'dist', 'bin', 'obj', 'build', 'target', 
-            'vendor', 'packages', '.git', '__pycache__', '.pytest_cache'
+            'vendor', 'packages', '.git', '__pycache__', '.pytest_cache',
+            '.olaf-cache'
         ]
+        self.exclude_patterns.extend(extra_excludes or [])
+        self.path_matcher = PathMatcher(self.exclude_patterns, root=self.repo_path)
         
+    def _engine_options(self) -> Dict:
+        """Constructor options a worker process needs to analyze files like this analyzer."""
+        return {'complexity_threshold': self.complexity_threshold, 'python_engine': self.python_engine,
+                'brace_engine': self.brace_engine, 'tree_sitter': self.tree_sitter}
+    
     def should_exclude_file(self, file_path: Path) -> bool:
         """Check if file should be excluded from analysis."""
-        path_str = str(file_path)
-        return any(pattern in path_str for pattern in self.exclude_patterns)
+        return self.path_matcher.matches_file(file_path)
     
     def get_source_files(self) -> List[Path]:
         """Get all source files to analyze."""
-        source_files = []
+        inventory = self.inventory or FileInventory.build(
+            self.repo_path, prune=self.path_matcher.matches_directory, enumeration=self.enumeration)
         
-        for ext in self.LANGUAGE_MAP.keys():
-            pattern = f"**/*{ext}"
-            files = self.repo_path.glob(pattern)
-            for file_path in files:
-                if not self.should_exclude_file(file_path):
-                    source_files.append(file_path)
-        
-        return sorted(source_files)
+        return sorted(
+            file_path for file_path in inventory.paths(self.LANGUAGE_MAP.keys())
+            if not self.should_exclude_file(file_path)
+        )
     
-    def analyze_file_complexity(self, file_path: Path) -> List[FunctionComplexity]:
-        """Analyze cyclomatic complexity for a single file."""
+    def _read_lines(self, file_path: Path) -> Optional[List[str]]:
+        """Read a source file as lines, or None if it cannot be read."""
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.readlines()
+                return f.readlines()
         except (IOError, UnicodeDecodeError) as e:
             logger.warning(f"Could not read {file_path}: {e}")
+            return None
+    
+    def analyze_content(self, content: List[str], language: str) -> List[FunctionComplexity]:
+        """Analyze cyclomatic complexity for already-read source lines."""
+        if not content:
             return []
         
+        backend = treesitter_backend.get_backend(language) if self.tree_sitter else None
+        if backend is not None:
+            return [
+                FunctionComplexity(name, start_line, end_line, end_line - start_line + 1, complexity,
+                                   round(complexity / (end_line - start_line + 1), 3))
+                for name, start_line, end_line, complexity
+                in backend.analyze(''.join(content).encode('utf-8'), halstead=False).functions
+            ]
+        elif language == 'py':
+            if self.python_engine == 'ast':
+                try:
+                    return PythonComplexityVisitor.analyze(''.join(content))
+                except (SyntaxError, ValueError, RecursionError) as e:
+                    logger.debug(f"Python parse failed ({e}), using the regex engine")
+            return self._analyze_python_complexity(content)
+        elif self.brace_engine == 'tokens' and language != 'rb':
+            return self._scanner(language).analyze(''.join(content))
+        else:
+            return self._analyze_brace_language_complexity(content, language)
+    
+    def _scanner(self, language: str) -> BraceLanguageScanner:
+        """Compiled BraceLanguageScanner for a language, built on first use."""
+        scanner = self._scanners.get(language)
+        if scanner is None:
+            scanner = self._scanners[language] = BraceLanguageScanner(
+                language, self.FUNCTION_PATTERNS.get(language, self.FUNCTION_PATTERNS['default']))
+        return scanner
+    
+    def analyze_file_complexity(self, file_path: Path) -> List[FunctionComplexity]:
+        """Analyze cyclomatic complexity for a single file."""
+        content = self._read_lines(file_path)
         if not content:
             return []
         
         language = self.LANGUAGE_MAP.get(file_path.suffix.lower(), 'default')
+        return self.analyze_content(content, language)
+    
+    def analyze_file(self, file_path: Path) -> List[FunctionComplexity]:
+        """
+        Analyze a file, reading it exactly once.
         
-        if language == 'py':
-            return self._analyze_python_complexity(content)
-        else:
-            return self._analyze_brace_language_complexity(content, language)
+        Falls back to a single file-level entry when no functions are found.
+        """
+        return self.analyze_lines(self._read_lines(file_path), file_path)
+    
+    def analyze_lines(self, content: Optional[List[str]], file_path: Path) -> List[FunctionComplexity]:
+        """Analyze already-read lines of file_path, with the file-level fallback."""
+        language = self.LANGUAGE_MAP.get(file_path.suffix.lower(), 'default')
+        functions = self.analyze_content(content, language) if content else []
+        
+        if not functions:
+            # No functions found, use file-level complexity
+            functions = [self.file_level_complexity(content)]
+        
+        return functions
     
     def _analyze_python_complexity(self, content: List[str]) -> List[FunctionComplexity]:
         """Analyze Python files using indentation-based parsing."""
@@ -163,7 +545,6 @@ class ComplexityAnalyzer:
                     'name': function_name,
                     'start_line': i + 1,
                     'end_line': 0,
-                    'lines': [],
                     'complexity': 1,  # Base complexity
                     'indent_level': indent
                 }
@@ -173,7 +554,6 @@ class ComplexityAnalyzer:
             # Process lines within functions
             if indent_stack:
                 current_function = indent_stack[-1]
-                current_function['lines'].append(line)
                 
                 # Count complexity-increasing constructs
                 if re.search(r'^\s*(?:if|elif|else|for|while|except|finally)\b', line):
@@ -252,7 +632,6 @@ class ComplexityAnalyzer:
                         'name': function_name,
                         'start_line': i + 1,
                         'end_line': 0,
-                        'lines': [],
                         'complexity': 1  # Base complexity
                     }
                     
@@ -260,8 +639,6 @@ class ComplexityAnalyzer:
                     brace_count = 0
             
             if in_function:
-                current_function['lines'].append(line)
-                
                 # Count braces
                 open_braces = line.count('{')
                 close_braces = line.count('}')
@@ -294,12 +671,10 @@ class ComplexityAnalyzer:
     
     def calculate_file_level_complexity(self, file_path: Path) -> FunctionComplexity:
         """Calculate file-level complexity if no functions found."""
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.readlines()
-        except (IOError, UnicodeDecodeError):
-            return FunctionComplexity("File_Level", 1, 1, 0, 0, 0.0)
-        
+        return self.file_level_complexity(self._read_lines(file_path))
+    
+    def file_level_complexity(self, content: Optional[List[str]]) -> FunctionComplexity:
+        """Calculate file-level complexity from already-read source lines."""
         if not content:
             return FunctionComplexity("File_Level", 1, 1, 0, 0, 0.0)
         
@@ -322,31 +697,32 @@ class ComplexityAnalyzer:
             complexity_density=complexity_density
         )
     
-    def analyze_repository(self) -> Dict:
-        """Analyze entire repository for complexity."""
+    def analyze_repository(self, writer: Optional[RecordWriter] = None) -> Dict:
+        """Analyze entire repository for complexity, streaming function records to writer."""
         logger.info(f"Analyzing repository: {self.repo_path}")
         
         source_files = self.get_source_files()
         logger.info(f"Found {len(source_files)} source files")
         
+        return self.collect_results(source_files, self._iter_file_functions(source_files), writer)
+    
+    def collect_results(self, source_files: List[Path], file_functions,
+                        writer: Optional[RecordWriter] = None) -> Dict:
+        """
+        Flatten per-file function lists (in source_files order) into analysis data.
+        
+        In streaming mode only the running statistics are kept ('results' is
+        empty); records still reach writer as they are produced.
+        """
         all_results = []
-        files_analyzed = 0
+        stats = ComplexityStats(self.complexity_threshold,
+                                max_exceeding=self.max_listed if self.streaming else None)
         
-        for file_path in source_files:
-            files_analyzed += 1
-            if files_analyzed % 50 == 0:
-                logger.info(f"Analyzed {files_analyzed}/{len(source_files)} files")
-            
+        for file_path, functions in zip(source_files, file_functions):
             relative_path = file_path.relative_to(self.repo_path)
-            functions = self.analyze_file_complexity(file_path)
-            
-            if not functions:
-                # No functions found, use file-level complexity
-                file_complexity = self.calculate_file_level_complexity(file_path)
-                functions = [file_complexity]
             
             for func in functions:
-                all_results.append({
+                result = {
                     'file': str(relative_path),
                     'function': func.name,
                     'start_line': func.start_line,
@@ -354,44 +730,113 @@ class ComplexityAnalyzer:
                     'line_count': func.line_count,
                     'complexity': func.complexity,
                     'complexity_density': func.complexity_density
-                })
+                }
+                stats.add(result)
+                if not self.streaming:
+                    all_results.append(result)
+                if writer:
+                    writer.write(result)
         
         return {
             'results': all_results,
+            'stats': stats,
             'files_analyzed': len(source_files),
-            'total_functions': len(all_results)
+            'total_functions': stats.count
         }
     
-    def generate_report(self, analysis_data: Dict) -> str:
-        """Generate comprehensive complexity analysis report."""
-        results = analysis_data['results']
-        files_analyzed = analysis_data['files_analyzed']
-        total_functions = analysis_data['total_functions']
+    def _iter_file_functions(self, source_files: List[Path]):
+        """Yield the functions of each source file, in input order."""
+        if not self.cache:
+            yield from self._analyze_files(source_files)
+            return
+        
+        cached = [
+            self.cache.get(self.CACHE_NAMESPACE, str(path.relative_to(self.repo_path)), path)
+            for path in source_files
+        ]
+        changed_files = [path for path, entry in zip(source_files, cached) if entry is None]
+        logger.info(f"Cache: {len(source_files) - len(changed_files)} unchanged, "
+                    f"{len(changed_files)} files to analyze")
+        
+        fresh_results = self._analyze_files(changed_files)
+        for file_path, entry in zip(source_files, cached):
+            if entry is not None:
+                yield [FunctionComplexity(*func) for func in entry]
+                continue
+            
+            functions = next(fresh_results)
+            self.cache.put(self.CACHE_NAMESPACE, str(file_path.relative_to(self.repo_path)),
+                           file_path, [list(func) for func in functions])
+            yield functions
+    
+    def _analyze_files(self, source_files: List[Path]):
+        """Analyze source files serially or in worker processes, in input order."""
+        if self.jobs <= 1 or len(source_files) < 2:
+            for files_analyzed, file_path in enumerate(source_files, 1):
+                if files_analyzed % 50 == 0:
+                    logger.info(f"Analyzed {files_analyzed}/{len(source_files)} files")
+                yield self.analyze_file(file_path)
+            return
+        
+        chunk_size = max(1, min(self.MAX_CHUNK_SIZE, len(source_files) // (self.jobs * 4)))
+        chunks = [
+            [str(path) for path in source_files[i:i + chunk_size]]
+            for i in range(0, len(source_files), chunk_size)
+        ]
+        logger.info(f"Analyzing with {self.jobs} worker processes ({len(chunks)} chunks)")
         
-        # Sort by complexity (highest first)
-        sorted_results = sorted(results, key=lambda x: x['complexity'], reverse=True)
+        files_analyzed = 0
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                 initargs=(str(self.repo_path), self._engine_options())) as executor:
+            # map() yields chunk results in submission order, so the merged
+            # output is identical to the serial run
+            for chunk_results in executor.map(_analyze_chunk, chunks):
+                for functions in chunk_results:
+                    yield [FunctionComplexity(*func) for func in functions]
+                files_analyzed += len(chunk_results)
+                logger.info(f"Analyzed {files_analyzed}/{len(source_files)} files")
+    
+    def summarize(self, analysis_data: Dict) -> Dict:
+        """Compute the summary statistics and complexity distribution."""
+        stats = analysis_data['stats']
+        total_functions = analysis_data['total_functions']
         
         # Calculate statistics
-        complexities = [r['complexity'] for r in results]
-        avg_complexity = sum(complexities) / len(complexities) if complexities else 0
-        max_complexity = max(complexities) if complexities else 0
-        complex_functions = len([r for r in results if r['complexity'] > self.complexity_threshold])
+        avg_complexity = stats.total_complexity / stats.count if stats.count else 0
+        max_complexity = stats.max_complexity
+        complex_functions = stats.exceeding_count
         percent_complex = round((complex_functions / total_functions) * 100, 1) if total_functions > 0 else 0
         
         # Complexity distribution
-        ranges = [
-            {'name': 'Low (1-5)', 'min': 1, 'max': 5},
-            {'name': 'Moderate (6-10)', 'min': 6, 'max': 10},
-            {'name': 'High (11-20)', 'min': 11, 'max': 20},
-            {'name': 'Very High (21-50)', 'min': 21, 'max': 50},
-            {'name': 'Extremely High (50+)', 'min': 51, 'max': float('inf')}
-        ]
-        
         distribution = []
-        for range_info in ranges:
-            count = len([r for r in results if range_info['min'] <= r['complexity'] <= range_info['max']])
+        for (name, _, _), count in zip(COMPLEXITY_RANGES, stats.range_counts):
             percent = round((count / total_functions) * 100, 1) if total_functions > 0 else 0
-            distribution.append({'range': range_info['name'], 'count': count, 'percent': percent})
+            distribution.append({'range': name, 'count': count, 'percent': percent})
+        
+        return {
+            'repository': str(self.repo_path),
+            'files_analyzed': analysis_data['files_analyzed'],
+            'total_functions': total_functions,
+            'average_complexity': round(avg_complexity, 2),
+            'max_complexity': max_complexity,
+            'threshold': self.complexity_threshold,
+            'complex_functions': complex_functions,
+            'percent_complex': percent_complex,
+            'distribution': distribution
+        }
+    
+    def generate_report(self, analysis_data: Dict) -> str:
+        """Generate comprehensive complexity analysis report."""
+        stats = analysis_data['stats']
+        files_analyzed = analysis_data['files_analyzed']
+        total_functions = analysis_data['total_functions']
+        
+        summary = self.summarize(analysis_data)
+        avg_complexity = summary['average_complexity']
+        max_complexity = summary['max_complexity']
+        complex_functions = summary['complex_functions']
+        percent_complex = summary['percent_complex']
+        distribution = summary['distribution']
         
         # Generate report
         timestamp = datetime.now().strftime("%Y%m%d %H:%M:%S")
@@ -432,7 +877,8 @@ The following functions have the highest cyclomatic complexity (ordered from mos
 |------|----------|------|-----------|------------|---------|
 """
         
-        for item in sorted_results[:20]:
+        # Highest complexity first
+        for item in stats.top_functions():
             report += f"| {item['file']} | {item['function']} | {item['start_line']} | {item['line_count']} | {item['complexity']} | {item['complexity_density']} |\n"
         
         report += f"""
@@ -444,10 +890,13 @@ The following functions exceed the complexity threshold and should be prioritize
 |------|----------|------|-----------|------------|---------|
 """
         
-        high_complexity = [r for r in sorted_results if r['complexity'] > self.complexity_threshold]
+        high_complexity = stats.exceeding_functions()
         for item in high_complexity:
             report += f"| {item['file']} | {item['function']} | {item['start_line']} | {item['line_count']} | {item['complexity']} | {item['complexity_density']} |\n"
         
+        if len(high_complexity) < complex_functions:
+            report += f"\n_Showing the {len(high_complexity)} most complex of {complex_functions} functions above the threshold (streaming mode)._\n"
+        
         report += """
 ## Recommendations
 
@@ -486,9 +935,29 @@ This analysis provides approximate cyclomatic complexity. For more accurate resu
         
         return report
     
+    def write_structured_report(self, analysis_data: Dict) -> None:
+        """Write already collected analysis data in the structured output format."""
+        with open_record_writer(self.output_format, self.output_file, self.RECORD_FIELDS) as writer:
+            for result in analysis_data['results']:
+                writer.write(result)
+            writer.close(self.summarize(analysis_data))
+    
+    def write_structured(self) -> None:
+        """Run the analysis, writing one record per function as files are analyzed."""
+        with open_record_writer(self.output_format, self.output_file, self.RECORD_FIELDS) as writer:
+            analysis_data = self.analyze_repository(writer)
+            writer.close(self.summarize(analysis_data))
+    
     def run_analysis(self) -> None:
         """Run complete complexity analysis."""
-        analysis_data = self.analyze_repository()
+        try:
+            if self.output_format != 'markdown':
+                self.write_structured()
+                return
+            analysis_data = self.analyze_repository()
+        finally:
+            if self.cache:
+                self.cache.close()
         report = self.generate_report(analysis_data)
         
         # Save report
@@ -507,6 +976,26 @@ def main():
     parser.add_argument('repo_path', help='Path to repository')
     parser.add_argument('-o', '--output', help='Output file path', default=None)
     parser.add_argument('-t', '--threshold', type=int, default=10, help='Complexity threshold')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes for file analysis (0 = one per CPU, default: 1)')
+    add_cache_arguments(parser)
+    add_format_arguments(parser)
+    add_enumeration_arguments(parser)
+    add_exclude_arguments(parser)
+    parser.add_argument('--python-engine', choices=ComplexityAnalyzer.PYTHON_ENGINES, default='regex',
+                        help='Python analysis: line regexes, or McCabe complexity from the ast module '
+                             '(falls back to regex for files that do not parse; default: regex)')
+    parser.add_argument('--brace-engine', choices=ComplexityAnalyzer.BRACE_ENGINES, default='regex',
+                        help='C-family analysis: per-line regexes, or a tokenizer that skips comments '
+                             'and strings and tracks function braces (default: regex)')
+    parser.add_argument('--tree-sitter', action='store_true',
+                        help='Parse files with tree-sitter grammars when installed, for every language '
+                             'with a grammar (overrides --python-engine/--brace-engine there)')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Keep only running statistics and bounded top-K tables instead of '
+                             'every function result (for very large codebases)')
+    parser.add_argument('--max-listed', type=int, default=500,
+                        help='Functions listed above the threshold in streaming mode (default: 500)')
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
     
     args = parser.parse_args()
@@ -518,7 +1007,12 @@ def main():
         logger.error(f"Repository path does not exist: {args.repo_path}")
         sys.exit(1)
     
-    analyzer = ComplexityAnalyzer(args.repo_path, args.output, args.threshold)
+    analyzer = ComplexityAnalyzer(args.repo_path, args.output, args.threshold, args.jobs,
+                                  open_cache_from_args(args, args.repo_path),
+                                  output_format=args.output_format, streaming=args.streaming,
+                                  max_listed=args.max_listed, python_engine=args.python_engine,
+                                  brace_engine=args.brace_engine, tree_sitter=args.tree_sitter,
+                                  enumeration=args.enumeration, extra_excludes=exclude_patterns_from_args(args))
     analyzer.run_analysis()
 
 
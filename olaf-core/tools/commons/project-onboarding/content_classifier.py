@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Content-Based File Classification for Project Onboarding
+
+Refines the extension-based language of a file from the first few KB of its
+content, in the spirit of GitHub Linguist:
+
+- an Emacs or Vim modeline (-*- mode: ruby -*-, vim: set ft=sh:) or a
+  shebang line (#!/usr/bin/env python3) names the language of files
+  without a known extension
+- generated files (minified bundles, lock files, protobuf output, headers
+  such as "Code generated ... DO NOT EDIT" or "@generated") and vendored
+  files (vendor/, third_party/, ...) are flagged so their lines can be kept
+  out of the LOC totals
+
+Content rules only run where they can change the answer: a file with a
+known extension keeps its language, and only source files (MARKER_LANGUAGES)
+are searched for generated-code markers. Everything else is classified by
+its path alone. Only CLASSIFY_BYTES of a file are ever looked at. Language
+names are those of LanguageDistributionAnalyzer.LANGUAGE_MAP.
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Read budget per file: the head searched for shebangs, modelines and markers
+CLASSIFY_BYTES = 4096
+
+# Leading lines searched for modelines and generated-code markers (Vim's default 'modelines')
+HEADER_LINES = 5
+
+# Average line length above which a .js/.css head is taken as minified
+MINIFIED_LINE_LENGTH = 110
+
+GENERATED = 'generated'
+VENDORED = 'vendored'
+
+# Shebang interpreter (version digits stripped) -> language
+INTERPRETERS = {
+    'python': 'Python', 'pypy': 'Python',
+    'node': 'JavaScript/TypeScript', 'nodejs': 'JavaScript/TypeScript',
+    'deno': 'JavaScript/TypeScript', 'ts-node': 'JavaScript/TypeScript', 'bun': 'JavaScript/TypeScript',
+    'sh': 'Shell', 'bash': 'Shell', 'zsh': 'Shell', 'ksh': 'Shell', 'dash': 'Shell',
+    'ash': 'Shell', 'fish': 'Shell', 'pwsh': 'Shell', 'powershell': 'Shell',
+    'ruby': 'Ruby', 'jruby': 'Ruby', 'rake': 'Ruby',
+    'php': 'PHP',
+    'go': 'Go', 'gorun': 'Go',
+    'rust-script': 'Rust',
+}
+
+# Emacs mode / Vim filetype -> language
+MODELINE_LANGUAGES = {
+    'python': 'Python', 'py': 'Python',
+    'javascript': 'JavaScript/TypeScript', 'js': 'JavaScript/TypeScript',
+    'typescript': 'JavaScript/TypeScript', 'ts': 'JavaScript/TypeScript',
+    'java': 'Java',
+    'csharp': 'C#', 'cs': 'C#',
+    'c': 'C/C++', 'cpp': 'C/C++', 'c++': 'C/C++',
+    'go': 'Go',
+    'rust': 'Rust',
+    'php': 'PHP',
+    'ruby': 'Ruby',
+    'html': 'HTML/CSS', 'css': 'HTML/CSS', 'scss': 'HTML/CSS',
+    'sh': 'Shell', 'bash': 'Shell', 'zsh': 'Shell', 'shell-script': 'Shell', 'fish': 'Shell',
+    'sql': 'SQL',
+    'xml': 'XML/Config', 'yaml': 'XML/Config', 'json': 'XML/Config', 'toml': 'XML/Config',
+    'conf': 'XML/Config', 'dosini': 'XML/Config',
+    'markdown': 'Markdown', 'rst': 'Markdown',
+}
+
+# Directories whose contents are third-party code (compared case-insensitively)
+VENDORED_DIRECTORIES = frozenset({
+    'vendor', 'vendors', 'node_modules', 'bower_components', 'jspm_packages',
+    'third_party', 'third-party', 'thirdparty', '3rdparty', 'godeps', 'extern', 'external',
+})
+
+# File names that are always generated
+GENERATED_NAMES = frozenset({
+    'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml', 'composer.lock',
+    'gemfile.lock', 'cargo.lock', 'poetry.lock', 'pipfile.lock', 'go.sum',
+})
+
+# File name endings of generated code
+GENERATED_SUFFIXES = (
+    '.min.js', '.min.css', '-min.js', '.js.map', '.css.map',
+    '_pb2.py', '_pb2_grpc.py', '.pb.go', '.pb.cc', '.pb.h', '_pb.js', '_pb.d.ts',
+    '.designer.cs', '.g.cs', '.generated.cs',
+)
+
+# GENERATED_SUFFIXES by the last three characters of the generated names and suffixes: a name with
+# another ending is not lowercased or compared at all, the others only with the suffixes they can end in
+_GENERATED_ENDINGS = {tail[-3:]: tuple(suffix for suffix in GENERATED_SUFFIXES if suffix.endswith(tail[-3:]))
+                      for tail in (*GENERATED_NAMES, *GENERATED_SUFFIXES)}
+
+# Languages of the source files that code generators write marker headers into
+MARKER_LANGUAGES = frozenset({
+    'JavaScript/TypeScript', 'Python', 'Java', 'C#', 'C/C++', 'Go', 'Rust', 'PHP', 'Ruby', 'HTML/CSS',
+})
+
+# Extensions whose files are checked for minified content
+MINIFIABLE_SUFFIXES = ('.js', '.mjs', '.cjs', '.css')
+
+# Languages of extensions that say nothing about the content
+UNKNOWN_LANGUAGES = frozenset({None, 'Other'})
+
+# Extension languages of the files whose head can change their classification
+CONTENT_LANGUAGES = UNKNOWN_LANGUAGES | MARKER_LANGUAGES
+
+# The first HEADER_LINES lines of a head, without the line break after the last
+_HEADER = re.compile(rb'(?:[^\n]*\n){0,%d}[^\n]*' % (HEADER_LINES - 1))
+_SHEBANG = re.compile(rb'^#![ \t]*(\S+)(?:[ \t]+(\S+))?')
+_EMACS_MODELINE = re.compile(rb'-\*-([^\n]*?)-\*-')
+_EMACS_MODE = re.compile(rb'(?:^|;)\s*mode:\s*([\w+#-]+)', re.IGNORECASE)
+_VIM_MODELINE = re.compile(rb'(?:^|\s)(?:vi|vim|ex)(?:[<=>]?\d+)?:[^\n]*?\b(?:ft|filetype|syntax)=([\w+#-]+)',
+                           re.MULTILINE)
+_GENERATED_MARKER = re.compile(
+    rb'code generated\b.*\bdo not edit'
+    rb'|@generated\b'
+    rb'|<auto-?generated'
+    rb'|generated by the protocol buffer compiler'
+    rb'|th(?:is|e) (?:file|code) (?:is|was) (?:auto(?:matically|-)? ?generated|generated (?:automatically|by))'
+    rb'|\bauto-?generated (?:file|code)\b',
+    re.IGNORECASE)
+
+
+class ContentClass(NamedTuple):
+    """Language of a file and why its lines are left out of LOC, if they are."""
+    language: Optional[str]
+    exclusion: Optional[str]  # GENERATED, VENDORED or None
+
+
+@lru_cache(maxsize=4096)
+def is_vendored_directory(directory: str) -> bool:
+    """Whether a relative directory path (os.sep-separated) is within vendored code."""
+    return any(part in VENDORED_DIRECTORIES for part in directory.lower().split(os.sep))
+
+
+def path_exclusion(relative_path: str) -> Optional[str]:
+    """Classify a file as vendored or generated from its path alone, without reading it."""
+    directory, _, name = relative_path.rpartition(os.sep)
+    return name_exclusion(directory, name)
+
+
+def name_exclusion(directory: str, name: str) -> Optional[str]:
+    """path_exclusion of a relative path already split into its directory and file name."""
+    # The directory decision is cached: the files of a directory only have their name checked
+    if directory and is_vendored_directory(directory):
+        return VENDORED
+    endings = _GENERATED_ENDINGS.get(name[-3:].lower())
+    if endings is None:
+        return None
+    name = name.lower()
+    if name in GENERATED_NAMES or name.endswith(endings):
+        return GENERATED
+    return None
+
+
+def shebang_language(head: bytes) -> Optional[str]:
+    """Language of the interpreter named on a #! line."""
+    match = _SHEBANG.match(head)
+    if not match:
+        return None
+    interpreter = match.group(1).rsplit(b'/', 1)[-1]
+    if interpreter == b'env' and match.group(2):
+        interpreter = match.group(2)
+    # python3.11 -> python
+    name = interpreter.decode('latin-1').lower().rstrip('0123456789.')
+    return INTERPRETERS.get(name)
+
+
+def header_lines(head: bytes) -> bytes:
+    """The first HEADER_LINES lines of a file head, within the CLASSIFY_BYTES budget."""
+    return _HEADER.match(head, 0, CLASSIFY_BYTES).group()
+
+
+def modeline_language(header: bytes) -> Optional[str]:
+    """Language named by an Emacs or Vim modeline in the header."""
+    # Substring checks first: most files have no modeline
+    if b'-*-' in header:
+        for emacs in _EMACS_MODELINE.finditer(header):
+            body = emacs.group(1).strip()
+            mode = _EMACS_MODE.search(body)
+            # -*- python -*- names the mode; -*- coding: utf-8 -*- does not
+            name = mode.group(1) if mode else (body if b':' not in body else None)
+            if name:
+                return MODELINE_LANGUAGES.get(name.decode('latin-1').lower())
+    # Every Vim modeline sets ft=, filetype= or syntax=
+    if b'=' in header and (b'ft=' in header or b'filetype=' in header or b'syntax=' in header):
+        vim = _VIM_MODELINE.search(header)
+        if vim:
+            return MODELINE_LANGUAGES.get(vim.group(1).decode('latin-1').lower())
+    return None
+
+
+def content_language(head: bytes) -> Optional[str]:
+    """Language named by a modeline or, failing that, a shebang in a file head."""
+    nul = head.find(b'\0', 0, CLASSIFY_BYTES)
+    if nul >= 0 and head.count(b'\n', 0, nul) < HEADER_LINES:
+        # Binary content (a NUL within the header lines): nothing to read a language from
+        return None
+    header = header_lines(head)
+    language = modeline_language(header)
+    if language is None and header.startswith(b'#!'):
+        language = shebang_language(header)
+    return language
+
+
+def is_generated_head(head: bytes, relative_path: str) -> bool:
+    """Check a source file head for generated-code markers and minified .js/.css content."""
+    end = _HEADER.match(head, 0, CLASSIFY_BYTES).end()
+    if head.find(b'\0', 0, end) >= 0:
+        # Binary content: nothing to read a marker from
+        return False
+    # Every marker says "generated": look for it in the header lines before running the regex
+    if ((head.find(b'enerated', 0, end) >= 0 or head.find(b'ENERATED', 0, end) >= 0)
+            and _GENERATED_MARKER.search(head, 0, end)):
+        return True
+    if relative_path.lower().endswith(MINIFIABLE_SUFFIXES):
+        size = min(len(head), CLASSIFY_BYTES)
+        return size / (head.count(b'\n', 0, size) + 1) > MINIFIED_LINE_LENGTH
+    return False
+
+
+def classify(relative_path: str, suffix_language: Optional[str], head: Optional[bytes]) -> ContentClass:
+    """
+    Classify a file from its path, its extension's language and its head.
+
+    head is the start of the file, of which at most CLASSIFY_BYTES are
+    looked at, or None when it was not read: the path and extension are
+    then all there is to go on. A modeline or shebang only names the
+    language of files whose extension does not; only source files
+    (MARKER_LANGUAGES) not already excluded by their path are searched for
+    generated-code markers.
+    """
+    exclusion = path_exclusion(relative_path)
+    if head is None:
+        return ContentClass(suffix_language, exclusion)
+
+    if suffix_language in UNKNOWN_LANGUAGES:
+        return ContentClass(content_language(head) or suffix_language, exclusion)
+    if exclusion is None and suffix_language in MARKER_LANGUAGES and is_generated_head(head, relative_path):
+        exclusion = GENERATED
+    return ContentClass(suffix_language, exclusion)
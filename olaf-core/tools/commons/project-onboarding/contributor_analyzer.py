@@ -10,20 +10,54 @@ import json
 import logging
 import os
 import sys
+import time
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 from pathlib import Path
 import re
 
+from blame_ownership import (BlameOwnershipEngine, DEFAULT_TIME_BUDGET, SAMPLING_STRATEGIES,
+                             sample_files)
+from git_history import GitHistoryEngine, iter_commit_metadata
+from history_checkpoint import ContributorCheckpoint, add_checkpoint_arguments
+from structured_output import add_format_arguments, open_record_writer
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+def rank_contributors(commits):
+    """
+    Return (contributor, commits) pairs, most commits first.
+
+    Ties are broken by name, so the ranking does not depend on the order the
+    counts were collected in: a single git log pass and a history checkpoint
+    list authors in different orders.
+    """
+    return sorted(commits.items(), key=lambda x: (-x[1], x[0]))
+
+
 class ContributorAnalyzer:
-    def __init__(self, repo_path, analysis_period_months=12, output_file=None):
+    OWNERSHIP_PATHSPECS = ['*.py', '*.js', '*.ts', '*.tsx', '*.java', '*.cpp', '*.c', '*.h']
+    
+    def __init__(self, repo_path, analysis_period_months=12, output_file=None,
+                 blame_workers=0, ownership_sample='all', ownership_max_files=0,
+                 ownership_budget=DEFAULT_TIME_BUDGET, incremental=False, checkpoint_dir=None,
+                 output_format='markdown'):
         self.repo_path = Path(repo_path).resolve()
         self.analysis_period_months = analysis_period_months
         self.output_file = output_file
+        self.output_format = output_format
+        self.blame_workers = blame_workers
+        self.ownership_sample = ownership_sample
+        self.ownership_max_files = ownership_max_files
+        self.ownership_budget = ownership_budget
+        self.incremental = incremental or checkpoint_dir is not None
+        self.checkpoint_dir = checkpoint_dir
+        self.ownership_coverage = (0, 0)  # (files blamed, tracked source files)
+        self.author_dates = {}  # author -> commit dates (newest first), filled by scan_commit_history
+        self.git_invocations = 0
         self.since_date = (datetime.now() - timedelta(days=30 * analysis_period_months)).strftime('%Y-%m-%d')
         
         # Verify repository exists and is a git repo
@@ -36,6 +70,7 @@ class ContributorAnalyzer:
     
     def run_git_command(self, cmd):
         """Execute git command and return output"""
+        self.git_invocations += 1
         try:
             result = subprocess.run(
                 cmd, 
@@ -52,32 +87,58 @@ class ContributorAnalyzer:
             logger.error(f"Error: {e.stderr}")
             return ""
     
-    def get_contributor_stats(self):
-        """Get basic contributor statistics"""
-        logger.info("Analyzing contributor statistics...")
+    def scan_commit_history(self):
+        """Stream commit metadata once, feeding commit counts, emails and per-author dates"""
+        if self.incremental:
+            return self._checkpointed_commit_history()
         
-        # Get all commits since analysis period
-        total_commits_cmd = ['git', 'log', '--oneline', f'--since={self.since_date}']
-        total_commits = len(self.run_git_command(total_commits_cmd).split('\n')) if self.run_git_command(total_commits_cmd) else 0
+        total_commits = 0
+        contributor_commits = Counter()
+        contributor_emails = {}
+        author_dates = defaultdict(list)
         
-        # Get contributor commit counts
-        contributors_cmd = ['git', 'log', '--pretty=format:%an', f'--since={self.since_date}']
-        contributors_output = self.run_git_command(contributors_cmd)
+        self.git_invocations += 1
+        try:
+            for _, name, email, date, _ in iter_commit_metadata(self.repo_path, since=self.since_date):
+                total_commits += 1
+                contributor_commits[name] += 1
+                contributor_emails[name] = email  # oldest commit's email wins, as before
+                author_dates[name].append(date)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Git command failed: {' '.join(e.cmd)}")
+            logger.error(f"Error: {e.stderr}")
+            return Counter(), 0, {}
+        except FileNotFoundError:
+            logger.error("Git not found in PATH")
+            return Counter(), 0, {}
         
-        if not contributors_output:
-            return {}, 0, {}
+        self.author_dates = dict(author_dates)
+        return contributor_commits, total_commits, contributor_emails
+    
+    def _checkpointed_commit_history(self):
+        """Commit metadata from the day-bucketed checkpoint, scanning only new commits"""
+        checkpoint = ContributorCheckpoint(self.repo_path, checkpoint_dir=self.checkpoint_dir)
+        self.git_invocations += 1
+        try:
+            total_commits, commits, emails, self.author_dates = checkpoint.contributor_history(self.since_date)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Git command failed: {' '.join(e.cmd)}")
+            logger.error(f"Error: {e.stderr}")
+            return Counter(), 0, {}
         
-        contributor_commits = Counter(contributors_output.split('\n'))
+        return Counter(commits), total_commits, emails
+    
+    def get_contributor_stats(self):
+        """Get basic contributor statistics"""
+        logger.info("Analyzing contributor statistics...")
         
-        # Get contributor emails for identification
-        contributors_with_email_cmd = ['git', 'log', '--pretty=format:%an|%ae', f'--since={self.since_date}']
-        contributors_with_email = self.run_git_command(contributors_with_email_cmd)
+        started = time.perf_counter()
+        contributor_commits, total_commits, contributor_emails = self.scan_commit_history()
+        logger.info(f"Read {total_commits} commits by {len(contributor_commits)} contributors "
+                    f"in one git log pass ({time.perf_counter() - started:.2f}s)")
         
-        contributor_emails = {}
-        for line in contributors_with_email.split('\n'):
-            if '|' in line:
-                name, email = line.split('|', 1)
-                contributor_emails[name] = email
+        if not contributor_commits:
+            return {}, 0, {}
         
         return contributor_commits, total_commits, contributor_emails
     
@@ -114,7 +175,7 @@ class ContributorAnalyzer:
         if not human_commits:
             return 0, []
         
-        sorted_contributors = sorted(human_commits.items(), key=lambda x: x[1], reverse=True)
+        sorted_contributors = rank_contributors(human_commits)
         cumulative_commits = 0
         bus_factor = 0
         critical_contributors = []
@@ -130,46 +191,36 @@ class ContributorAnalyzer:
         return bus_factor, critical_contributors
     
     def analyze_file_ownership(self):
-        """Analyze file ownership patterns using git blame"""
+        """Analyze file ownership patterns using concurrent git blame"""
         logger.info("Analyzing file ownership patterns...")
         
-        # Get list of files in repository
-        files_cmd = ['git', 'ls-files', '--', '*.py', '*.js', '*.ts', '*.tsx', '*.java', '*.cpp', '*.c', '*.h']
-        files_output = self.run_git_command(files_cmd)
-        
-        if not files_output:
+        engine = BlameOwnershipEngine(self.repo_path, self.blame_workers, self.ownership_budget)
+        try:
+            files = engine.list_files(self.OWNERSHIP_PATHSPECS)
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            self.git_invocations += engine.git_invocations
+            logger.error(f"Could not list repository files: {e}")
             return {}
         
-        files = [f for f in files_output.split('\n') if f.strip()]
-        file_ownership = {}
-        
-        # Analyze ownership for a sample of files (limit to avoid performance issues)
-        sample_files = files[:50] if len(files) > 50 else files
+        if not files:
+            return {}
         
-        for file_path in sample_files:
+        churn = None
+        if self.ownership_sample == 'churn':
+            history = GitHistoryEngine(self.repo_path)
+            self.git_invocations += 1
             try:
-                blame_cmd = ['git', 'blame', '--line-porcelain', file_path]
-                blame_output = self.run_git_command(blame_cmd)
-                
-                if blame_output:
-                    authors = []
-                    for line in blame_output.split('\n'):
-                        if line.startswith('author '):
-                            author = line[7:]  # Remove 'author ' prefix
-                            authors.append(author)
-                    
-                    if authors:
-                        author_counts = Counter(authors)
-                        total_lines = len(authors)
-                        file_ownership[file_path] = {
-                            'total_lines': total_lines,
-                            'authors': dict(author_counts),
-                            'primary_author': author_counts.most_common(1)[0] if author_counts else None
-                        }
-            except Exception as e:
-                logger.warning(f"Could not analyze ownership for {file_path}: {e}")
-                continue
+                churn = {path: stats.churn for path, stats in history.scan(since=self.since_date).items()}
+            except subprocess.CalledProcessError as e:
+                logger.warning(f"Could not read churn history, keeping listing order: {e}")
+        
+        sample = sample_files(files, self.ownership_sample, self.ownership_max_files, churn)
+        logger.info(f"Blaming {len(sample)} of {len(files)} files "
+                    f"({self.ownership_sample} sampling, {engine.workers} workers)")
         
+        file_ownership = engine.analyze(sample)
+        self.git_invocations += engine.git_invocations
+        self.ownership_coverage = (len(file_ownership), len(files))
         return file_ownership
     
     def analyze_commit_patterns(self, human_commits):
@@ -177,15 +228,14 @@ class ContributorAnalyzer:
         logger.info("Analyzing commit patterns...")
         
         # Get commit dates for top contributors
-        top_contributors = sorted(human_commits.items(), key=lambda x: x[1], reverse=True)[:10]
+        top_contributors = rank_contributors(human_commits)[:10]
         
+        # Date series were collected by the commit metadata pass
         commit_patterns = {}
         for contributor, _ in top_contributors:
-            dates_cmd = ['git', 'log', '--author=' + contributor, '--pretty=format:%ad', '--date=short', f'--since={self.since_date}']
-            dates_output = self.run_git_command(dates_cmd)
+            dates = self.author_dates.get(contributor)
             
-            if dates_output:
-                dates = dates_output.split('\n')
+            if dates:
                 commit_patterns[contributor] = {
                     'total_commits': len(dates),
                     'first_commit': min(dates) if dates else None,
@@ -249,6 +299,7 @@ class ContributorAnalyzer:
         """Generate comprehensive contributor analysis report"""
         logger.info(f"Starting contributor analysis for: {self.repo_path}")
         logger.info(f"Analysis period: {self.analysis_period_months} months (since {self.since_date})")
+        started = time.perf_counter()
         
         # Get basic statistics
         contributor_commits, total_commits, contributor_emails = self.get_contributor_stats()
@@ -274,6 +325,16 @@ class ContributorAnalyzer:
         # Generate risk assessment
         risk_assessment = self.generate_risk_assessment(bus_factor, critical_contributors, total_human_commits, file_ownership)
         
+        if self.output_format != 'markdown':
+            self.write_structured_report(
+                total_commits, total_human_commits, total_bot_commits,
+                human_commits, bot_commits, contributor_emails,
+                bus_factor, critical_contributors, risk_assessment
+            )
+            logger.info(f"Contributor analysis took {time.perf_counter() - started:.2f}s "
+                        f"with {self.git_invocations} git invocations")
+            return
+        
         # Generate report
         report = self.create_markdown_report(
             total_commits, total_human_commits, total_bot_commits,
@@ -291,6 +352,52 @@ class ContributorAnalyzer:
             logger.info(f"Report saved to: {output_path}")
         else:
             print(report)
+        
+        logger.info(f"Contributor analysis took {time.perf_counter() - started:.2f}s "
+                    f"with {self.git_invocations} git invocations")
+    
+    def write_structured_report(self, total_commits, total_human_commits, total_bot_commits,
+                                human_commits, bot_commits, contributor_emails,
+                                bus_factor, critical_contributors, risk_assessment):
+        """Write one record per contributor (humans first, by commits) and the risk summary"""
+        contributors = ([(name, commits, False) for name, commits in
+                         rank_contributors(human_commits)] +
+                        [(name, commits, True) for name, commits in
+                         rank_contributors(bot_commits)])
+        
+        with open_record_writer(self.output_format, self.output_file) as writer:
+            for name, commits, is_bot in contributors:
+                dates = self.author_dates.get(name) or []
+                writer.write({
+                    'contributor': name,
+                    'email': contributor_emails.get(name, ''),
+                    'commits': commits,
+                    'percent_of_commits': round(commits / total_commits * 100, 1),
+                    'is_bot': is_bot,
+                    'first_commit': min(dates) if dates else None,
+                    'last_commit': max(dates) if dates else None
+                })
+            
+            files_blamed, tracked_files = self.ownership_coverage
+            writer.close({
+                'repository': str(self.repo_path),
+                'months_analyzed': self.analysis_period_months,
+                'since': self.since_date,
+                'total_commits': total_commits,
+                'human_commits': total_human_commits,
+                'bot_commits': total_bot_commits,
+                'human_contributors': len(human_commits),
+                'bus_factor': bus_factor,
+                'critical_contributors': [
+                    {'contributor': name, 'commits': commits, 'share': round(share, 3)}
+                    for name, commits, share in critical_contributors
+                ],
+                'risk_level': risk_assessment['risk_level'],
+                'recommendations': risk_assessment['recommendations'],
+                'single_owner_files': risk_assessment['single_owner_files'],
+                'ownership_files_analyzed': files_blamed,
+                'ownership_files_tracked': tracked_files
+            })
     
     def create_markdown_report(self, total_commits, total_human_commits, total_bot_commits,
                              human_commits, bot_commits, contributor_emails,
@@ -329,7 +436,7 @@ This analysis identified contributor concentration risks by analyzing:
 """
         
         # Add top contributors table
-        sorted_humans = sorted(human_commits.items(), key=lambda x: x[1], reverse=True)
+        sorted_humans = rank_contributors(human_commits)
         for i, (contributor, commits) in enumerate(sorted_humans[:15], 1):
             percentage = commits / total_human_commits * 100
             email = contributor_emails.get(contributor, 'N/A')
@@ -365,7 +472,7 @@ This analysis identified contributor concentration risks by analyzing:
 |-------------|---------|---------|
 """
         
-        sorted_bots = sorted(bot_commits.items(), key=lambda x: x[1], reverse=True)
+        sorted_bots = rank_contributors(bot_commits)
         for bot, commits in sorted_bots[:10]:
             purpose = "Automation"
             if "github-actions" in bot.lower():
@@ -381,7 +488,7 @@ This analysis identified contributor concentration risks by analyzing:
 
 ## File Ownership Analysis
 
-Analyzed {len(file_ownership)} files for ownership concentration:
+Analyzed {len(file_ownership)} of {self.ownership_coverage[1]} tracked source files for ownership concentration:
 
 ### High Ownership Concentration Files
 """
@@ -466,7 +573,7 @@ This analysis uses the following approach:
 1. **Commit Analysis**: Examines commit history over {self.analysis_period_months} months
 2. **Bot Detection**: Identifies automated contributors using pattern matching
 3. **Bus Factor Calculation**: Determines minimum contributors for 50% of work
-4. **File Ownership**: Analyzes code ownership using git blame
+4. **File Ownership**: Analyzes code ownership using git blame ({self.ownership_sample} sampling)
 5. **Risk Assessment**: Combines metrics to assess overall project risk
 
 ---
@@ -481,6 +588,17 @@ def main():
     parser.add_argument('-m', '--months', type=int, default=12, 
                        help='Analysis period in months (default: 12)')
     parser.add_argument('-o', '--output', help='Output file path (default: stdout)')
+    parser.add_argument('--blame-workers', type=int, default=0,
+                       help='Concurrent git blame processes (default: one per CPU, max 16)')
+    parser.add_argument('--ownership-sample', choices=SAMPLING_STRATEGIES, default='all',
+                       help='Order in which files are blamed: listing order, most churned first, '
+                            'or round-robin across directories (default: all)')
+    parser.add_argument('--ownership-max-files', type=int, default=0,
+                       help='Maximum files to blame, 0 for no limit (default: 0)')
+    parser.add_argument('--ownership-budget', type=float, default=DEFAULT_TIME_BUDGET,
+                       help=f'Time budget in seconds for ownership analysis, 0 for none (default: {DEFAULT_TIME_BUDGET})')
+    add_checkpoint_arguments(parser)
+    add_format_arguments(parser)
     parser.add_argument('-v', '--verbose', action='store_true', 
                        help='Enable verbose logging')
     
@@ -490,7 +608,11 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     try:
-        analyzer = ContributorAnalyzer(args.repo_path, args.months, args.output)
+        analyzer = ContributorAnalyzer(args.repo_path, args.months, args.output,
+                                       args.blame_workers, args.ownership_sample,
+                                       args.ownership_max_files, args.ownership_budget,
+                                       args.incremental, args.checkpoint_dir,
+                                       args.output_format)
         analyzer.generate_report()
     except Exception as e:
         logger.error(f"Analysis failed: {e}")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Shared File Inventory for Project Onboarding
+
+Walks a repository once with os.scandir, pruning excluded directories before
+descending into them, and records every file's path, suffix, size, mtime and
+inode in a compact array-backed table. The analyzers consume the same
+inventory instead of each traversing the tree on their own.
+
+With the 'git' enumeration the table is filled from the Git index instead
+(see git_index.py): only tracked files still present in the working tree.
+"""
+
+import os
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+import logging
+
+from git_index import GitIndexError, iter_tracked_files
+
+logger = logging.getLogger(__name__)
+
+# How the files of a repository are found: directory walk or Git index
+ENUMERATIONS = ('walk', 'git')
+
+
+class InventoryStat(NamedTuple):
+    """stat()-like view of a recorded file, usable wherever os.stat_result is read."""
+    st_size: int
+    st_mtime_ns: int
+    st_ino: int
+
+
+class FileInventory:
+    """Column-oriented table of the files found in one repository walk."""
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self._root_str = str(self.root)
+        self.directories: List[str] = []      # relative directory paths ('' for root)
+        self.suffixes: List[str] = []         # distinct lowercase suffixes
+        self._suffix_ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.dir_ids = array('I')
+        self.suffix_ids = array('I')
+        self.sizes = array('q')
+        self.mtimes_ns = array('q')
+        self.inodes = array('Q')
+
+    @classmethod
+    def scan(cls, root, prune: Optional[Callable[[str], bool]] = None) -> 'FileInventory':
+        """
+        Walk root once and build the inventory.
+
+        prune receives the path of each directory relative to root (such as
+        PathMatcher.matches_directory) and returns True to skip the whole
+        subtree. Files are recorded in the same order os.walk would list them.
+        """
+        inventory = cls(root)
+        inventory._walk(prune)
+        logger.info(f"Inventory: {len(inventory)} files in {len(inventory.directories)} directories")
+        return inventory
+
+    @classmethod
+    def from_git_index(cls, root, prune: Optional[Callable[[str], bool]] = None) -> 'FileInventory':
+        """
+        Build the inventory from the files tracked in Git, without walking the tree.
+
+        prune is applied to every directory on a file's path, parents first,
+        as the walk would. Files are recorded in index (path) order. Raises GitIndexError
+        if root is not in a Git checkout.
+        """
+        inventory = cls(root)
+        dir_ids: Dict[str, Optional[int]] = {}  # None: below a pruned directory
+
+        def directory_id(directory: str) -> Optional[int]:
+            if directory in dir_ids:
+                return dir_ids[directory]
+            parent = directory.rpartition('/')[0]
+            if (parent and directory_id(parent) is None) or (prune and prune(directory)):
+                dir_id = None
+            else:
+                dir_id = len(inventory.directories)
+                inventory.directories.append(directory.replace('/', os.sep))
+            dir_ids[directory] = dir_id
+            return dir_id
+
+        dir_ids[''] = 0
+        inventory.directories.append('')
+        for tracked_file in iter_tracked_files(inventory.root):
+            directory, _, name = tracked_file.path.rpartition('/')
+            dir_id = directory_id(directory)
+            if dir_id is None:
+                continue
+            inventory.names.append(name)
+            inventory.dir_ids.append(dir_id)
+            inventory.suffix_ids.append(inventory._suffix_id(name))
+            inventory.sizes.append(tracked_file.size)
+            inventory.mtimes_ns.append(tracked_file.mtime_ns)
+            inventory.inodes.append(tracked_file.ino)
+
+        logger.info(f"Inventory: {len(inventory)} tracked files in {len(inventory.directories)} directories")
+        return inventory
+
+    @classmethod
+    def build(cls, root, prune: Optional[Callable[[str], bool]] = None,
+              enumeration: str = 'walk') -> 'FileInventory':
+        """
+        Inventory root by walking it ('walk') or from the Git index ('git').
+
+        A 'git' enumeration outside a Git checkout falls back to the walk.
+        """
+        if enumeration == 'git':
+            try:
+                return cls.from_git_index(root, prune)
+            except GitIndexError as e:
+                logger.warning(f"Cannot list tracked files ({e}), walking the directory tree instead")
+        return cls.scan(root, prune)
+
+    def _suffix_id(self, name: str) -> int:
+        """Intern the lowercase suffix of a file name."""
+        suffix = os.path.splitext(name)[1].lower()
+        suffix_id = self._suffix_ids.get(suffix)
+        if suffix_id is None:
+            suffix_id = self._suffix_ids[suffix] = len(self.suffixes)
+            self.suffixes.append(suffix)
+        return suffix_id
+
+    def _walk(self, prune: Optional[Callable[[str], bool]]) -> None:
+        """Depth-first pre-order walk mirroring os.walk(topdown=True)."""
+        stack = ['']
+        while stack:
+            relative_dir = stack.pop()
+            absolute_dir = os.path.join(self._root_str, relative_dir) if relative_dir else self._root_str
+            dir_id = len(self.directories)
+            self.directories.append(relative_dir)
+            subdirs = []
+
+            try:
+                with os.scandir(absolute_dir) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not (prune and prune(os.path.join(relative_dir, entry.name)
+                                                        if relative_dir else entry.name)):
+                                    subdirs.append(entry.name)
+                                continue
+                            if not entry.is_file():
+                                continue
+                            stat_result = entry.stat()
+                        except OSError:
+                            continue
+
+                        self.names.append(entry.name)
+                        self.dir_ids.append(dir_id)
+                        self.suffix_ids.append(self._suffix_id(entry.name))
+                        self.sizes.append(stat_result.st_size)
+                        self.mtimes_ns.append(stat_result.st_mtime_ns)
+                        self.inodes.append(stat_result.st_ino)
+            except OSError as e:
+                logger.warning(f"Could not list {absolute_dir}: {e}")
+                continue
+
+            for name in reversed(subdirs):
+                stack.append(os.path.join(relative_dir, name) if relative_dir else name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def relative_path(self, index: int) -> str:
+        """Path of a file relative to the inventory root."""
+        directory = self.directories[self.dir_ids[index]]
+        name = self.names[index]
+        return os.path.join(directory, name) if directory else name
+
+    def path(self, index: int) -> Path:
+        """Absolute path of a file."""
+        return self.root / self.relative_path(index)
+
+    def stat(self, index: int) -> InventoryStat:
+        """Size, mtime and inode recorded for a file when it was inventoried."""
+        return InventoryStat(self.sizes[index], self.mtimes_ns[index], self.inodes[index])
+
+    def suffix(self, index: int) -> str:
+        """Lowercase suffix of a file, including the dot."""
+        return self.suffixes[self.suffix_ids[index]]
+
+    def select(self, suffixes: Optional[Iterable[str]] = None) -> Iterator[int]:
+        """Yield row indexes, optionally restricted to a set of lowercase suffixes."""
+        if suffixes is None:
+            yield from range(len(self.names))
+            return
+
+        wanted = {self._suffix_ids[s] for s in suffixes if s in self._suffix_ids}
+        suffix_ids = self.suffix_ids
+        for index in range(len(self.names)):
+            if suffix_ids[index] in wanted:
+                yield index
+
+    def paths(self, suffixes: Optional[Iterable[str]] = None) -> Iterator[Path]:
+        """Yield absolute file paths, optionally restricted to suffixes."""
+        for index in self.select(suffixes):
+            yield self.path(index)
+
+
+def add_enumeration_arguments(parser) -> None:
+    """Register the shared --enumeration command line option on a parser."""
+    parser.add_argument('--enumeration', choices=ENUMERATIONS, default='walk',
+                        help='Find files by walking the directory tree, or list the files tracked in the '
+                             'Git index, which skips untracked and ignored files (default: walk)')
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Streaming Git History Engine for Project Onboarding
+
+Reads `git log --numstat -z` incrementally from the subprocess pipe and
+aggregates per-file change counts, churn (lines added/removed) and last-touch
+dates in a single pass, without ever buffering the full log in memory.
+Commit metadata (author, email, dates) is streamed the same way.
+"""
+
+import re
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Separators injected through --pretty so commit headers can be told apart
+# from NUL-terminated numstat records.
+COMMIT_MARKER = b'\x1e'
+FIELD_MARKER = b'\x1f'
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+_DATE_ONLY = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def since_option(since: str) -> str:
+    """
+    git log --since option for a window start.
+
+    Git reads a bare date as that day at the current time of day, so a
+    YYYY-MM-DD start is pinned to midnight: every scan of the same window,
+    full, incremental or per commit, then sees the same commits.
+    """
+    if _DATE_ONLY.fullmatch(since):
+        since = f'{since} 00:00:00'
+    return f'--since={since}'
+
+
+@contextmanager
+def git_process(cmd: List[str], cwd, **popen_args) -> Iterator[subprocess.Popen]:
+    """
+    Run a git command whose stdout is read as a stream.
+
+    stderr goes to a temporary file, not a second pipe: git blocks once a
+    pipe nobody reads is full, and would never finish the stdout being
+    drained. Raises subprocess.CalledProcessError with that stderr when git
+    exits with an error (unless the reader stopped early).
+    """
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=stderr_file, **popen_args)
+        try:
+            yield process
+        finally:
+            process.stdout.close()
+            return_code = process.wait()
+
+        if return_code != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode('utf-8', 'replace')
+            raise subprocess.CalledProcessError(return_code, cmd, stderr=stderr)
+
+
+class FileHistory:
+    """Aggregated Git activity for a single file."""
+
+    __slots__ = ('change_count', 'lines_added', 'lines_removed', 'last_touch')
+
+    def __init__(self):
+        self.change_count = 0
+        self.lines_added = 0
+        self.lines_removed = 0
+        self.last_touch = 0  # Unix timestamp of the most recent commit
+
+    @property
+    def churn(self) -> int:
+        """Total number of lines added and removed."""
+        return self.lines_added + self.lines_removed
+
+    @property
+    def last_touch_date(self) -> str:
+        """Most recent commit date as YYYY-MM-DD."""
+        if not self.last_touch:
+            return ''
+        return datetime.fromtimestamp(self.last_touch).strftime('%Y-%m-%d')
+
+    def record(self, added: int, removed: int, timestamp: int) -> None:
+        """Account for one commit touching this file."""
+        self.change_count += 1
+        self.lines_added += added
+        self.lines_removed += removed
+        if timestamp > self.last_touch:
+            self.last_touch = timestamp
+
+
+def _parse_count(value: bytes) -> int:
+    """Parse a numstat counter; binary files report '-'."""
+    return int(value) if value and value != b'-' else 0
+
+
+def iter_numstat_records(chunks: Iterator[bytes]) -> Iterator[Tuple[str, int, int, int, str]]:
+    """
+    Parse a `git log --numstat -z` byte stream into records.
+
+    Yields (commit_sha, commit_timestamp, added, removed, path) tuples, one per
+    file touched by each commit. Renames are reported under their new path.
+    """
+    sha = ''
+    timestamp = 0
+    pending: Optional[Tuple[int, int]] = None  # counts waiting for rename paths
+    rename_paths: List[bytes] = []
+    remainder = b''
+
+    for chunk in chunks:
+        tokens = (remainder + chunk).split(b'\0')
+        remainder = tokens.pop()
+
+        for token in tokens:
+            if pending is not None:
+                rename_paths.append(token)
+                if len(rename_paths) == 2:
+                    added, removed = pending
+                    pending = None
+                    yield sha, timestamp, added, removed, rename_paths[1].decode('utf-8', 'surrogateescape')
+                    rename_paths = []
+                continue
+
+            if not token:
+                continue  # Separator between commits
+
+            if token.startswith(COMMIT_MARKER):
+                header, _, token = token[1:].partition(b'\n')
+                raw_sha, _, raw_time = header.partition(FIELD_MARKER)
+                sha = raw_sha.decode('ascii', 'replace')
+                timestamp = int(raw_time or 0)
+                if not token:
+                    continue
+
+            parts = token.split(b'\t', 2)
+            if len(parts) != 3:
+                continue
+
+            added, removed = _parse_count(parts[0]), _parse_count(parts[1])
+            if parts[2]:
+                yield sha, timestamp, added, removed, parts[2].decode('utf-8', 'surrogateescape')
+            else:
+                pending = (added, removed)
+
+
+class GitHistoryEngine:
+    """Builds per-file history statistics from a single streamed git log."""
+
+    def __init__(self, repo_path, path_filter: Optional[Callable[[str], bool]] = None):
+        self.repo_path = repo_path
+        self.path_filter = path_filter
+        self.commit_count = 0
+        self.files: Dict[str, FileHistory] = {}
+
+    def build_command(self, since: Optional[str] = None, revision_range: Optional[str] = None) -> List[str]:
+        """Build the git log command used for the history scan."""
+        cmd = [
+            'git', 'log', '--numstat', '-z', '--no-color',
+            '--pretty=format:%x1e%H%x1f%ct'
+        ]
+        if since:
+            cmd.append(since_option(since))
+        if revision_range:
+            cmd.append(revision_range)
+        return cmd
+
+    def _stream_chunks(self, process: subprocess.Popen) -> Iterator[bytes]:
+        """Read the git log output in fixed-size chunks."""
+        while True:
+            chunk = process.stdout.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+    def iter_records(self, since: Optional[str] = None,
+                     revision_range: Optional[str] = None) -> Iterator[Tuple[str, int, int, int, str]]:
+        """
+        Stream (sha, timestamp, added, removed, path) records for files passing the filter.
+
+        Raises subprocess.CalledProcessError if git exits with an error and
+        FileNotFoundError if git is not installed.
+        """
+        cmd = self.build_command(since, revision_range)
+        logger.debug(f"Streaming history: {' '.join(cmd)}")
+
+        last_sha = None
+        with git_process(cmd, self.repo_path) as process:
+            for record in iter_numstat_records(self._stream_chunks(process)):
+                if record[0] != last_sha:
+                    self.commit_count += 1
+                    last_sha = record[0]
+
+                if self.path_filter and not self.path_filter(record[4]):
+                    continue
+                yield record
+
+    def scan(self, since: Optional[str] = None, revision_range: Optional[str] = None) -> Dict[str, FileHistory]:
+        """
+        Stream the Git history and aggregate per-file statistics.
+
+        Raises subprocess.CalledProcessError if git exits with an error and
+        FileNotFoundError if git is not installed.
+        """
+        for _, timestamp, added, removed, path in self.iter_records(since, revision_range):
+            history = self.files.get(path)
+            if history is None:
+                history = self.files[path] = FileHistory()
+            history.record(added, removed, timestamp)
+
+        logger.info(f"Scanned {self.commit_count} commits with file changes, {len(self.files)} files retained")
+        return self.files
+
+
+def iter_commit_metadata(repo_path, since: Optional[str] = None,
+                         revision_range: Optional[str] = None) -> Iterator[Tuple[str, str, str, str, int]]:
+    """
+    Stream (sha, author_name, author_email, author_date, commit_timestamp) per commit.
+
+    Author dates are YYYY-MM-DD. Commits are yielded newest first, as git log
+    lists them. Raises subprocess.CalledProcessError if git exits with an error
+    and FileNotFoundError if git is not installed.
+    """
+    cmd = ['git', 'log', '--pretty=format:%H%x00%an%x00%ae%x00%ad%x00%ct', '--date=short']
+    if since:
+        cmd.append(since_option(since))
+    if revision_range:
+        cmd.append(revision_range)
+    logger.debug(f"Streaming commits: {' '.join(cmd)}")
+
+    with git_process(cmd, repo_path, text=True, encoding='utf-8', errors='replace') as process:
+        for line in process.stdout:
+            fields = line.rstrip('\n').split('\0')
+            if len(fields) != 5:
+                continue
+            sha, name, email, date, timestamp = fields
+            yield sha, name, email, date, int(timestamp or 0)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Git Index Reader for Project Onboarding
+
+Lists the files tracked in a Git repository straight from the .git/index
+file (index format versions 2, 3 and 4), so a checkout can be inventoried
+without walking the working tree: untracked build output and everything
+.gitignore'd never shows up, and no directory is listed. Each listed file is
+lstat'ed for its current size, mtime and inode; tracked files deleted from
+the working tree are left out.
+
+Indexes this reader does not handle (split indexes, unknown versions) fall
+back to `git ls-files -z`, with the same per-file lstat.
+"""
+
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEX_SIGNATURE = b'DIRC'
+SUPPORTED_VERSIONS = (2, 3, 4)
+
+# Fixed part of an index entry before the object name: ten 32-bit stat fields
+_STAT_FIELDS_SIZE = 40
+
+# Object type in the upper bits of an entry's mode
+_MODE_TYPE_SHIFT = 12
+_REGULAR_FILE = 0o10
+
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE = 0x3000
+_FLAG_NAME_LENGTH = 0x0FFF
+_EXTENDED_SKIP_WORKTREE = 0x4000
+
+_OBJECT_FORMAT = re.compile(rb'^\s*objectformat\s*=\s*sha256\s*$', re.IGNORECASE | re.MULTILINE)
+
+
+class GitIndexError(Exception):
+    """The tracked files of a path cannot be listed (not a Git checkout, or git failed)."""
+
+
+class TrackedFile(NamedTuple):
+    """A regular file tracked in the index, with its stat data from the working tree."""
+    path: str  # relative to the listed directory, '/'-separated
+    size: int
+    mtime_ns: int
+    ino: int
+
+
+def find_git_dir(path: Path) -> Optional[Tuple[Path, Path]]:
+    """Return (work tree root, git directory) of the checkout containing path, or None."""
+    for directory in (path, *path.parents):
+        dot_git = directory / '.git'
+        if dot_git.is_dir():
+            return directory, dot_git
+        if dot_git.is_file():
+            # Linked work trees and submodules: "gitdir: <path>"
+            try:
+                content = dot_git.read_text(encoding='utf-8').strip()
+            except OSError:
+                return None
+            if content.startswith('gitdir:'):
+                return directory, (directory / content[len('gitdir:'):].strip()).resolve()
+            return None
+    return None
+
+
+def _object_name_size(git_dir: Path) -> int:
+    """Bytes per object name in the index: 32 in SHA-256 repositories, else 20."""
+    config_dirs = [git_dir]
+    commondir = git_dir / 'commondir'
+    if commondir.is_file():
+        config_dirs.append((git_dir / commondir.read_text(encoding='utf-8').strip()).resolve())
+    for config_dir in config_dirs:
+        try:
+            if _OBJECT_FORMAT.search((config_dir / 'config').read_bytes()):
+                return 32
+        except OSError:
+            continue
+    return 20
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Decode the offset varint of index v4 path compression; returns (value, next offset)."""
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
+
+
+def _check_extensions(data: bytes, offset: int, end: int) -> None:
+    """Reject indexes whose entries are not all in this file (split index)."""
+    while offset + 8 <= end:
+        signature = data[offset:offset + 4]
+        size = int.from_bytes(data[offset + 4:offset + 8], 'big')
+        if signature == b'link':
+            raise GitIndexError("split index")
+        offset += 8 + size
+
+
+def parse_index(data: bytes, object_name_size: int = 20) -> Iterator[Tuple[bytes, int, int, int]]:
+    """
+    Parse index file bytes into (path, size, mtime_ns, ino) per regular file.
+
+    Conflicted paths are listed once. Symlinks, submodules, sparse directory
+    entries and skip-worktree files (not checked out) are left out. Raises
+    GitIndexError for an index this parser does not handle.
+    """
+    if len(data) < 12 or data[:4] != INDEX_SIGNATURE:
+        raise GitIndexError("not a Git index file")
+    version = int.from_bytes(data[4:8], 'big')
+    if version not in SUPPORTED_VERSIONS:
+        raise GitIndexError(f"unsupported index version {version}")
+    entry_count = int.from_bytes(data[8:12], 'big')
+
+    flags_offset = _STAT_FIELDS_SIZE + object_name_size
+    offset = 12
+    path = b''
+    previous = None
+    for _ in range(entry_count):
+        entry_start = offset
+        mtime = int.from_bytes(data[offset + 8:offset + 12], 'big') * 1_000_000_000 \
+            + int.from_bytes(data[offset + 12:offset + 16], 'big')
+        ino = int.from_bytes(data[offset + 20:offset + 24], 'big')
+        mode = int.from_bytes(data[offset + 24:offset + 28], 'big')
+        size = int.from_bytes(data[offset + 36:offset + 40], 'big')
+        flags = int.from_bytes(data[offset + flags_offset:offset + flags_offset + 2], 'big')
+        offset += flags_offset + 2
+        skip_worktree = False
+        if flags & _FLAG_EXTENDED:
+            skip_worktree = bool(int.from_bytes(data[offset:offset + 2], 'big') & _EXTENDED_SKIP_WORKTREE)
+            offset += 2
+
+        if version == 4:
+            strip, offset = _read_varint(data, offset)
+            name_end = data.index(b'\0', offset)
+            path = path[:len(path) - strip] + data[offset:name_end]
+            offset = name_end + 1
+        else:
+            name_length = flags & _FLAG_NAME_LENGTH
+            name_end = offset + name_length if name_length < _FLAG_NAME_LENGTH else data.index(b'\0', offset)
+            path = data[offset:name_end]
+            # NUL padding to a multiple of 8 bytes, at least one
+            offset = entry_start + ((name_end - entry_start + 8) & ~7)
+
+        if mode >> _MODE_TYPE_SHIFT != _REGULAR_FILE or skip_worktree or path == previous:
+            continue
+        if flags & _FLAG_STAGE:
+            previous = path  # one of the stages of a conflicted path
+        yield path, size, mtime, ino
+
+    # Extensions sit between the entries and the trailing checksum
+    _check_extensions(data, offset, len(data) - object_name_size)
+
+
+def _tracked_file(directory: Path, relative_path: str) -> Optional[TrackedFile]:
+    """TrackedFile for a path below directory, or None if it is no longer a regular file there."""
+    try:
+        stat_result = os.lstat(directory / relative_path)
+    except OSError:
+        return None  # deleted from the work tree, or not checked out
+    if stat_result.st_mode >> _MODE_TYPE_SHIFT != _REGULAR_FILE:
+        return None
+    return TrackedFile(relative_path, stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino)
+
+
+def _read_index(work_tree: Path, git_dir: Path, prefix: str) -> Iterator[TrackedFile]:
+    """Tracked files under prefix (a '/'-terminated path in the work tree, or '')."""
+    try:
+        data = (git_dir / 'index').read_bytes()
+    except OSError as e:
+        raise GitIndexError(f"cannot read the index: {e}")
+
+    # The index's own stat data lags behind edits made since git last refreshed it
+    directory = work_tree / prefix
+    prefix_bytes = prefix.encode('utf-8', 'surrogateescape')
+    for path, _, _, _ in parse_index(data, _object_name_size(git_dir)):
+        if not path.startswith(prefix_bytes):
+            continue
+        tracked_file = _tracked_file(directory, path[len(prefix_bytes):].decode('utf-8', 'surrogateescape'))
+        if tracked_file:
+            yield tracked_file
+
+
+def _ls_files(path: Path) -> Iterator[TrackedFile]:
+    """Tracked files from `git ls-files -z`, with the stat data of the files themselves."""
+    try:
+        result = subprocess.run(['git', 'ls-files', '-z'], cwd=path, capture_output=True, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        raise GitIndexError(f"git ls-files failed: {e}")
+
+    seen = set()
+    for raw_path in result.stdout.split(b'\0'):
+        if not raw_path or raw_path in seen:
+            continue
+        seen.add(raw_path)
+        tracked_file = _tracked_file(path, raw_path.decode('utf-8', 'surrogateescape'))
+        if tracked_file:
+            yield tracked_file
+
+
+def iter_tracked_files(path) -> Iterator[TrackedFile]:
+    """
+    Yield the regular files tracked by Git below path, relative to it.
+
+    Reads .git/index directly, or runs `git ls-files -z` if the index cannot
+    be parsed; either way the stat data comes from the files, and tracked
+    files missing from the working tree are skipped. Raises GitIndexError if
+    path is not in a Git checkout.
+    """
+    path = Path(path).resolve()
+    checkout = find_git_dir(path)
+    if checkout is None:
+        raise GitIndexError(f"not a Git repository: {path}")
+
+    work_tree, git_dir = checkout
+    prefix = path.relative_to(work_tree).as_posix()
+    prefix = '' if prefix == '.' else prefix + '/'
+    try:
+        # Parse up front so a fallback does not follow half a listing
+        return iter(list(_read_index(work_tree, git_dir, prefix)))
+    except GitIndexError as e:
+        logger.info(f"Listing tracked files with git ls-files ({e})")
+    return _ls_files(path)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Incremental Git History Checkpoints for Project Onboarding
+
+Keeps per-day aggregates of the analyzed history window together with the
+last analyzed commit in `.olaf-cache/`. A rerun only streams `last_sha..HEAD`,
+merges the new commits into their day buckets and drops buckets that fell
+out of the window, instead of walking the whole window again.
+
+A full rescan happens when there is no usable checkpoint: first run, another
+checkpoint format or analyzer configuration, a window that now starts before
+the checkpointed one, or a recorded commit that is no longer an ancestor of
+HEAD (history rewritten).
+"""
+
+import json
+import os
+import subprocess
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+import logging
+
+from analysis_cache import CACHE_DIR_NAME
+from git_history import FileHistory, GitHistoryEngine, iter_commit_metadata
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+
+def resolve_head(repo_path) -> Optional[str]:
+    """Return the SHA of HEAD, or None for an empty or invalid repository."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--verify', '-q', 'HEAD'], cwd=repo_path,
+                                capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def is_ancestor(repo_path, ancestor: str, descendant: str) -> bool:
+    """Check whether ancestor is reachable from descendant."""
+    result = subprocess.run(['git', 'merge-base', '--is-ancestor', ancestor, descendant],
+                            cwd=repo_path, capture_output=True)
+    return result.returncode == 0
+
+
+def day_of(timestamp: int) -> str:
+    """Bucket key (local YYYY-MM-DD) of a commit timestamp."""
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+
+
+class HistoryCheckpoint(ABC):
+    """
+    Day-bucketed history aggregates persisted between runs.
+
+    Subclasses define how commits are folded into a bucket (_scan_into) and
+    how buckets are combined into the analyzer's result.
+    """
+
+    NAME = 'history'
+
+    def __init__(self, repo_path, config_key: str = '', checkpoint_dir: Optional[Path] = None):
+        self.repo_path = Path(repo_path)
+        self.config_key = config_key
+        checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else self.repo_path / CACHE_DIR_NAME
+        self.checkpoint_path = checkpoint_dir / f'history-{self.NAME}.json'
+        self.commits_scanned = 0
+
+    def _load(self) -> Optional[Dict]:
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _save(self, state: Dict) -> None:
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, separators=(',', ':'))
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _usable(self, state: Optional[Dict], since_day: str, head: str) -> bool:
+        """Check that a stored checkpoint can be extended to HEAD for this window."""
+        if not state:
+            return False
+        if state.get('version') != CHECKPOINT_VERSION or state.get('config') != self.config_key:
+            return False
+        if state.get('since', '9999-99-99') > since_day:
+            logger.info("Analysis window starts before the checkpoint, rescanning")
+            return False
+        if state.get('head') != head and not is_ancestor(self.repo_path, state.get('head', ''), head):
+            logger.info("Checkpointed commit is no longer in the history of HEAD, rescanning")
+            return False
+        return True
+
+    @abstractmethod
+    def _scan_into(self, buckets: Dict[str, Dict], since: Optional[str], revision_range: str) -> None:
+        """Fold the commits of revision_range (since a date, if given) into the day buckets."""
+
+    def update(self, since_day: str) -> Dict[str, Dict]:
+        """
+        Bring the day buckets up to HEAD for the window starting at since_day.
+
+        Returns the buckets, keyed by YYYY-MM-DD, for days inside the window.
+        Git errors propagate as in GitHistoryEngine.scan.
+        """
+        head = resolve_head(self.repo_path)
+        if head is None:
+            return {}
+
+        state = self._load()
+        if self._usable(state, since_day, head):
+            buckets = state['buckets']
+            if state['head'] != head:
+                self._scan_into(buckets, None, f"{state['head']}..{head}")
+            logger.info(f"History checkpoint: {self.commits_scanned} new commits since {state['head'][:12]}")
+        else:
+            buckets = {}
+            # Whole-day window (since_option pins it to midnight, as for plain scans)
+            self._scan_into(buckets, since_day, head)
+            logger.info(f"History checkpoint: full scan of {self.commits_scanned} commits since {since_day}")
+
+        for day in [day for day in buckets if day < since_day]:
+            del buckets[day]
+
+        try:
+            self._save({
+                'version': CHECKPOINT_VERSION,
+                'config': self.config_key,
+                'head': head,
+                'since': since_day,
+                'buckets': buckets
+            })
+        except (IOError, OSError) as e:
+            logger.warning(f"Could not save history checkpoint {self.checkpoint_path}: {e}")
+
+        return buckets
+
+
+class FileHistoryCheckpoint(HistoryCheckpoint):
+    """Per-file change count, churn and last touch, bucketed by commit day."""
+
+    NAME = 'files'
+
+    def __init__(self, repo_path, path_filter=None, config_key: str = '',
+                 checkpoint_dir: Optional[Path] = None):
+        super().__init__(repo_path, config_key, checkpoint_dir)
+        self.path_filter = path_filter
+
+    def _scan_into(self, buckets: Dict[str, Dict], since: Optional[str], revision_range: str) -> None:
+        engine = GitHistoryEngine(self.repo_path, path_filter=self.path_filter)
+        for _, timestamp, added, removed, path in engine.iter_records(since, revision_range):
+            files = buckets.setdefault(day_of(timestamp), {})
+            entry = files.get(path)
+            if entry is None:
+                files[path] = [1, added, removed, timestamp]
+            else:
+                entry[0] += 1
+                entry[1] += added
+                entry[2] += removed
+                entry[3] = max(entry[3], timestamp)
+        self.commits_scanned = engine.commit_count
+
+    def file_histories(self, since_day: str) -> Dict[str, FileHistory]:
+        """Return per-file history for the window, updated to HEAD."""
+        files: Dict[str, FileHistory] = {}
+        buckets = self.update(since_day)
+        # Newest day first, matching the order a single git log pass yields
+        for day in sorted(buckets, reverse=True):
+            for path, (changes, added, removed, last_touch) in buckets[day].items():
+                history = files.get(path)
+                if history is None:
+                    history = files[path] = FileHistory()
+                history.change_count += changes
+                history.lines_added += added
+                history.lines_removed += removed
+                history.last_touch = max(history.last_touch, last_touch)
+        return files
+
+
+class ContributorCheckpoint(HistoryCheckpoint):
+    """Per-author commit counts, email and author dates, bucketed by commit day."""
+
+    NAME = 'contributors'
+
+    def _scan_into(self, buckets: Dict[str, Dict], since: Optional[str], revision_range: str) -> None:
+        created = set()
+        for _, name, email, date, timestamp in iter_commit_metadata(self.repo_path, since, revision_range):
+            self.commits_scanned += 1
+            day = day_of(timestamp)
+            authors = buckets.setdefault(day, {})
+            entry = authors.get(name)
+            if entry is None:
+                entry = authors[name] = {'commits': 0, 'email': email, 'dates': {}}
+                created.add((day, name))
+            elif (day, name) in created:
+                entry['email'] = email  # log is newest first: keep the oldest email
+            entry['commits'] += 1
+            entry['dates'][date] = entry['dates'].get(date, 0) + 1
+
+    def contributor_history(self, since_day: str):
+        """
+        Return (total_commits, commit counts, emails, author dates) for the window.
+
+        Emails are those of each author's oldest commit in the window and
+        author dates are listed newest first, as a single git log pass yields.
+        Authors are not in git log order (day buckets keep the order they were
+        scanned in): reports rank them with
+        contributor_analyzer.rank_contributors.
+        """
+        buckets = self.update(since_day)
+        total_commits = 0
+        commits: Dict[str, int] = {}
+        emails: Dict[str, str] = {}
+        dates: Dict[str, list] = {}
+
+        for day in sorted(buckets, reverse=True):
+            for name, entry in buckets[day].items():
+                total_commits += entry['commits']
+                commits[name] = commits.get(name, 0) + entry['commits']
+                emails[name] = entry['email']
+                dates.setdefault(name, []).extend(
+                    date for date, count in entry['dates'].items() for _ in range(count))
+
+        for author_dates in dates.values():
+            author_dates.sort(reverse=True)
+        return total_commits, commits, emails, dates
+
+
+def add_checkpoint_arguments(parser) -> None:
+    """Register the incremental history command line options on a parser."""
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'Keep a history checkpoint in {CACHE_DIR_NAME}/ and only scan commits added since the last run')
+    parser.add_argument('--checkpoint-dir', default=None,
+                        help=f'Checkpoint directory (implies --incremental, default: <repo>/{CACHE_DIR_NAME})')
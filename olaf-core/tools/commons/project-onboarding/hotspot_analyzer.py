@@ -15,9 +15,16 @@ import argparse
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, NamedTuple
+from typing import Callable, Dict, List, Optional, Tuple, NamedTuple
 import logging
 
+from analysis_cache import AnalysisCache, add_cache_arguments, open_cache_from_args
+from file_inventory import FileInventory, add_enumeration_arguments
+from git_history import FileHistory, GitHistoryEngine
+from history_checkpoint import FileHistoryCheckpoint, add_checkpoint_arguments
+from path_matcher import PathMatcher, add_exclude_arguments, exclude_patterns_from_args
+from structured_output import FORMAT_SUFFIXES, add_format_arguments, open_record_writer
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -31,23 +38,91 @@ class FileHotspot(NamedTuple):
     conditional_count: int
     conditional_density: float
     complexity_score: float
+    lines_added: int = 0
+    lines_removed: int = 0
+    last_modified: str = ''
+
+
+# Complexity patterns (simplified cyclomatic complexity indicators).
+# Whitespace is restricted to [^\S\n] so a match never spans two lines, and
+# patterns that only introduce another construct use lookaheads so they do not
+# consume text that a following indicator on the same line has to match.
+COMPLEXITY_PATTERNS = [
+    ('else_if', r'else[^\S\n]+(?=if)'),        # else if
+    ('else_block', r'else[^\S\n]*{'),          # else blocks
+    ('if_statement', r'if[^\S\n]*\('),          # if statements
+    ('switch_statement', r'switch[^\S\n]*\('),  # switch statements
+    ('case_label', r'case[^\S\n]+(?=[^:\n]*:)'),  # case statements
+    ('for_loop', r'for[^\S\n]*\('),             # for loops
+    ('while_loop', r'while[^\S\n]*\('),         # while loops
+    ('do_loop', r'do[^\S\n]*{'),               # do-while loops
+    ('ternary', r'\?(?=[^\n]*:)'),              # ternary operators
+    ('logical_and', r'&&'),                     # logical AND
+    ('logical_or', r'\|\|'),                    # logical OR
+    ('catch_block', r'catch[^\S\n]*\('),        # exception handling
+    ('except_block', r'except[^\S\n]*:'),       # Python exception handling
+    ('finally_block', r'finally[^\S\n]*:'),     # finally blocks
+]
+
+
+class ConditionalScanner:
+    """Counts complexity indicators with a single regex pass over a file buffer."""
+    
+    def __init__(self, patterns: List[Tuple[str, str]]):
+        self.names = [name for name, _ in patterns]
+        alternation = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in patterns)
+        # A first-character lookahead lets the engine skip positions where no
+        # alternative can start instead of trying all of them one by one.
+        first_chars = sorted({pattern[:2] if pattern.startswith('\\') else pattern[0]
+                              for _, pattern in patterns})
+        self.regex = re.compile(f"(?=[{''.join(first_chars)}])(?:{alternation})", re.IGNORECASE)
+    
+    def scan(self, text: str) -> Dict[str, int]:
+        """Return the number of matches per pattern name in text."""
+        counts = dict.fromkeys(self.names, 0)
+        for match in self.regex.finditer(text):
+            counts[match.lastgroup] += 1
+        return counts
+
+
+CONDITIONAL_SCANNER = ConditionalScanner(COMPLEXITY_PATTERNS)
 
 
 class HotspotAnalyzer:
     """Analyzes code hotspots by combining Git history and complexity metrics."""
     
-    def __init__(self, repo_path: str, output_file: str = None, months_to_analyze: int = 12):
+    RANKING_METRICS = ('changes', 'churn')
+    
+    # Result cache namespace; bump when COMPLEXITY_PATTERNS change
+    CACHE_NAMESPACE = 'hotspot/v1'
+    
+    def __init__(self, repo_path: str, output_file: str = None, months_to_analyze: int = 12,
+                 rank_by: str = 'changes', cache: Optional[AnalysisCache] = None,
+                 inventory: Optional[FileInventory] = None, incremental: bool = False,
+                 checkpoint_dir: Optional[str] = None, output_format: str = 'markdown',
+                 enumeration: str = 'walk', extra_excludes: Optional[List[str]] = None):
         self.repo_path = Path(repo_path).resolve()
-        self.output_file = output_file or self.repo_path / "complexity-hotspots.md"
+        self.output_format = output_format
+        self.output_file = output_file or self.repo_path / f"complexity-hotspots{FORMAT_SUFFIXES[output_format]}"
         self.months_to_analyze = months_to_analyze
+        self.rank_by = rank_by
+        self.file_history: Dict[str, FileHistory] = {}
+        self.cache = cache
+        self.inventory = inventory
+        self.enumeration = enumeration
+        self.incremental = incremental or checkpoint_dir is not None
+        self.checkpoint_dir = checkpoint_dir
         self.file_extensions = [
             '.cs', '.java', '.js', '.jsx', '.ts', '.tsx', '.py', '.rb', 
             '.php', '.go', '.rs', '.cpp', '.c', '.h', '.hpp'
         ]
         self.exclude_patterns = [
             'node_modules', 'dist', 'bin', 'obj', 'build', 'target', 
-            'vendor', 'packages', '.git', '__pycache__', '.pytest_cache'
+            'vendor', 'packages', '.git', '__pycache__', '.pytest_cache',
+            '.olaf-cache'
         ]
+        self.exclude_patterns.extend(extra_excludes or [])
+        self.path_matcher = PathMatcher(self.exclude_patterns, root=self.repo_path)
         
     def is_git_repository(self) -> bool:
         """Check if the path is a Git repository."""
@@ -56,7 +131,7 @@ class HotspotAnalyzer:
     
     def should_exclude_file(self, file_path: str) -> bool:
         """Check if file should be excluded from analysis."""
-        return any(pattern in file_path for pattern in self.exclude_patterns)
+        return self.path_matcher.matches_file(file_path)
     
     def get_file_extension(self, file_path: str) -> str:
         """Get file extension in lowercase."""
@@ -83,26 +158,17 @@ class HotspotAnalyzer:
         logger.info(f"Analyzing Git history since {since_str}")
         
         try:
-            # Get changed files from git log
-            cmd = [
-                'git', 'log', f'--since={since_str}', 
-                '--name-only', '--pretty=format:'
-            ]
+            # Stream numstat history once: change counts, churn and last touch
+            if self.incremental:
+                self.file_history = self._checkpoint().file_histories(since_str)
+            else:
+                engine = GitHistoryEngine(self.repo_path, path_filter=self.is_source_file)
+                self.file_history = engine.scan(since=since_str)
             
-            result = subprocess.run(
-                cmd, 
-                cwd=self.repo_path, 
-                capture_output=True, 
-                text=True, 
-                check=True
-            )
-            
-            # Process git log output
-            changed_files = {}
-            for line in result.stdout.split('\n'):
-                line = line.strip()
-                if line and self.is_source_file(line):
-                    changed_files[line] = changed_files.get(line, 0) + 1
+            changed_files = {
+                path: self._activity(history)
+                for path, history in self.file_history.items()
+            }
             
             if not changed_files:
                 logger.warning("No Git history found, analyzing all source files")
@@ -118,18 +184,30 @@ class HotspotAnalyzer:
             logger.error("Git not found in PATH")
             return self._get_all_source_files()
     
+    def _checkpoint(self) -> FileHistoryCheckpoint:
+        """History checkpoint keyed by the file selection settings."""
+        # 'paths:' marks exclusion by path component; older checkpoints used substrings
+        config_key = '|'.join(self.file_extensions) + '#paths:' + '|'.join(self.exclude_patterns)
+        return FileHistoryCheckpoint(self.repo_path, self.is_source_file, config_key, self.checkpoint_dir)
+    
+    def _activity(self, history: FileHistory) -> int:
+        """Activity metric used for ranking, per the configured rank_by."""
+        if self.rank_by == 'churn':
+            return history.churn
+        return history.change_count
+    
     def _get_all_source_files(self) -> Dict[str, int]:
         """Get all source files as fallback when Git history is unavailable."""
         all_files = {}
+        inventory = self.inventory or FileInventory.build(
+            self.repo_path, prune=self.path_matcher.matches_directory, enumeration=self.enumeration)
         
+        # Grouped by extension, as ties in the ranking keep this order
         for ext in self.file_extensions:
-            pattern = f"**/*{ext}"
-            files = self.repo_path.glob(pattern)
-            
-            for file_path in files:
-                if not self.should_exclude_file(str(file_path)):
-                    relative_path = file_path.relative_to(self.repo_path)
-                    all_files[str(relative_path)] = 1  # Assign weight of 1
+            for index in inventory.select([ext]):
+                relative_path = inventory.relative_path(index)
+                if not self.should_exclude_file(relative_path):
+                    all_files[relative_path] = 1  # Assign weight of 1
         
         logger.info(f"Found {len(all_files)} source files")
         return all_files
@@ -141,66 +219,71 @@ class HotspotAnalyzer:
         
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.readlines()
+                content = f.read()
         except (IOError, UnicodeDecodeError) as e:
             logger.warning(f"Could not read {file_path}: {e}")
             return 0, 0
         
+        return self.analyze_text_complexity(content)
+    
+    def analyze_text_complexity(self, content: str) -> Tuple[int, int]:
+        """Return (line_count, conditional_count) for already-read file text."""
         if not content:
             return 0, 0
         
-        line_count = len(content)
-        conditional_count = 0
-        
-        # Complexity patterns (simplified cyclomatic complexity indicators)
-        complexity_patterns = [
-            r'if\s*\(',           # if statements
-            r'else\s*{',          # else blocks
-            r'else\s+if',         # else if
-            r'switch\s*\(',       # switch statements
-            r'case\s+[^:]*:',     # case statements
-            r'for\s*\(',          # for loops
-            r'while\s*\(',        # while loops
-            r'do\s*{',            # do-while loops
-            r'\?\s*.*\s*:',       # ternary operators
-            r'&&',                # logical AND
-            r'\|\|',              # logical OR
-            r'catch\s*\(',        # exception handling
-            r'except\s*:',        # Python exception handling
-            r'finally\s*:',       # finally blocks
-        ]
+        line_count = content.count('\n') + (0 if content.endswith('\n') else 1)
+        conditional_count = sum(CONDITIONAL_SCANNER.scan(content).values())
+        
+        return line_count, conditional_count
+    
+    def _cached_file_complexity(self, relative_path: str, full_path: Path) -> Tuple[int, int]:
+        """Analyze file complexity, reusing the cached result for unchanged files."""
+        if not self.cache:
+            return self.analyze_file_complexity(full_path)
         
-        for line in content:
-            for pattern in complexity_patterns:
-                matches = len(re.findall(pattern, line, re.IGNORECASE))
-                conditional_count += matches
+        cached = self.cache.get(self.CACHE_NAMESPACE, relative_path, full_path)
+        if cached is not None:
+            return cached[0], cached[1]
         
+        line_count, conditional_count = self.analyze_file_complexity(full_path)
+        self.cache.put(self.CACHE_NAMESPACE, relative_path, full_path, [line_count, conditional_count])
         return line_count, conditional_count
     
-    def analyze_hotspots(self) -> List[FileHotspot]:
-        """Analyze code hotspots combining change frequency and complexity."""
+    def select_top_files(self) -> List[Tuple[str, int]]:
+        """Return the most active files as (relative path, activity) pairs."""
         changed_files = self.get_git_changed_files()
-        hotspots = []
         
         # Analyze top changed files (limit to avoid excessive processing)
-        top_files = sorted(changed_files.items(), key=lambda x: x[1], reverse=True)[:50]
+        return sorted(changed_files.items(), key=lambda x: x[1], reverse=True)[:50]
+    
+    def analyze_hotspots(self) -> List[FileHotspot]:
+        """Analyze code hotspots combining change frequency and complexity."""
+        return self.build_hotspots(self.select_top_files(), self._cached_file_complexity)
+    
+    def build_hotspots(self, top_files: List[Tuple[str, int]],
+                       file_complexity: Callable[[str, Path], Tuple[int, int]]) -> List[FileHotspot]:
+        """Score top files, obtaining (lines, conditionals) through file_complexity."""
+        hotspots = []
         
         logger.info(f"Analyzing complexity for {len(top_files)} files")
         
-        for file_path, change_frequency in top_files:
+        for file_path, activity in top_files:
             full_path = self.repo_path / file_path
             
             if not full_path.exists():
                 continue
             
-            line_count, conditional_count = self.analyze_file_complexity(full_path)
+            line_count, conditional_count = file_complexity(file_path, full_path)
             
             if line_count == 0:
                 continue
             
+            history = self.file_history.get(file_path)
+            change_frequency = history.change_count if history else activity
+            
             # Calculate metrics
             conditional_density = conditional_count / line_count if line_count > 0 else 0
-            complexity_score = change_frequency * conditional_density * 100
+            complexity_score = activity * conditional_density * 100
             
             hotspot = FileHotspot(
                 file_path=file_path,
@@ -208,7 +291,10 @@ class HotspotAnalyzer:
                 line_count=line_count,
                 conditional_count=conditional_count,
                 conditional_density=round(conditional_density, 3),
-                complexity_score=round(complexity_score, 1)
+                complexity_score=round(complexity_score, 1),
+                lines_added=history.lines_added if history else 0,
+                lines_removed=history.lines_removed if history else 0,
+                last_modified=history.last_touch_date if history else ''
             )
             
             hotspots.append(hotspot)
@@ -238,12 +324,14 @@ This analysis identified {len(hotspots)} potential complexity hotspots by combin
 
 Files with high change frequency and complexity (top 20):
 
-| File | Change Frequency | Lines | Conditionals | Conditional Density | Complexity Score |
-|------|-----------------|-------|-------------|-------------------|----------------|
+| File | Change Frequency | Churn (+/-) | Last Changed | Lines | Conditionals | Conditional Density | Complexity Score |
+|------|-----------------|-------------|--------------|-------|-------------|-------------------|----------------|
 """
         
         for hotspot in hotspots[:20]:
-            report += f"| {hotspot.file_path} | {hotspot.change_frequency} | {hotspot.line_count} | {hotspot.conditional_count} | {hotspot.conditional_density} | {hotspot.complexity_score} |\n"
+            churn = f"+{hotspot.lines_added}/-{hotspot.lines_removed}"
+            last_changed = hotspot.last_modified or 'N/A'
+            report += f"| {hotspot.file_path} | {hotspot.change_frequency} | {churn} | {last_changed} | {hotspot.line_count} | {hotspot.conditional_count} | {hotspot.conditional_density} | {hotspot.complexity_score} |\n"
         
         # Calculate statistics
         if hotspots:
@@ -280,14 +368,21 @@ Based on complexity scores, files are categorized as:
                 score_range = f"{round(min_score, 1)}-{round(max_score, 1) if max_score != float('inf') else '∞'}"
                 report += f"| {risk_level} | {score_range} | {count} | {recommendation} |\n"
         
+        if self.rank_by == 'churn':
+            activity_label = "Churn"
+            activity_description = "Lines added plus lines removed in a file"
+        else:
+            activity_label = "Change frequency"
+            activity_description = "How often a file has been modified"
+        
         report += f"""
 ## Analysis Methodology
 
 This report identifies potential complexity hotspots by combining:
 
-1. **Change Frequency**: How often a file has been modified in the last {self.months_to_analyze} months
+1. **Change Activity**: {activity_description} in the last {self.months_to_analyze} months
 2. **Conditional Density**: The ratio of conditional statements to total lines of code
-3. **Complexity Score**: Change frequency × conditional density × 100
+3. **Complexity Score**: {activity_label} × conditional density × 100
 
 Higher scores indicate files that are both frequently changed and complex, which may benefit from refactoring.
 
@@ -336,7 +431,7 @@ For files with **Critical** risk scores:
                 report += f"""
 **{hotspot.file_path}**
 - Complexity Score: {hotspot.complexity_score}
-- Changed {hotspot.change_frequency} times in {self.months_to_analyze} months
+- Changed {hotspot.change_frequency} times in {self.months_to_analyze} months (+{hotspot.lines_added}/-{hotspot.lines_removed} lines)
 - {hotspot.line_count} lines with {hotspot.conditional_count} conditional statements
 - Conditional density: {hotspot.conditional_density}
 """
@@ -358,11 +453,41 @@ For files with **Critical** risk scores:
         
         return report
     
+    def summarize(self, hotspots: List[FileHotspot]) -> Dict:
+        """Summary statistics of the structured output."""
+        avg_score = sum(h.complexity_score for h in hotspots) / len(hotspots) if hotspots else 0
+        return {
+            'repository': str(self.repo_path),
+            'months_analyzed': self.months_to_analyze,
+            'since': (datetime.now() - timedelta(days=30 * self.months_to_analyze)).strftime('%Y-%m-%d'),
+            'rank_by': self.rank_by,
+            'hotspot_count': len(hotspots),
+            'average_score': round(avg_score, 1),
+            'max_score': max((h.complexity_score for h in hotspots), default=0),
+            'high_risk_count': len([h for h in hotspots if h.complexity_score > avg_score * 1.5])
+        }
+    
+    def write_structured_report(self, hotspots: List[FileHotspot]) -> None:
+        """Write the hotspots, highest score first, in the structured output format."""
+        with open_record_writer(self.output_format, self.output_file, list(FileHotspot._fields)) as writer:
+            for hotspot in hotspots:
+                writer.write(hotspot)
+            writer.close(self.summarize(hotspots))
+    
     def run_analysis(self) -> None:
         """Run complete hotspot analysis."""
         logger.info(f"Starting hotspot analysis of: {self.repo_path}")
         
-        hotspots = self.analyze_hotspots()
+        try:
+            hotspots = self.analyze_hotspots()
+        finally:
+            if self.cache:
+                self.cache.close()
+        
+        if self.output_format != 'markdown':
+            self.write_structured_report(hotspots)
+            return
+        
         report = self.generate_report(hotspots)
         
         # Save report
@@ -381,6 +506,13 @@ def main():
     parser.add_argument('repo_path', help='Path to Git repository')
     parser.add_argument('-o', '--output', help='Output file path', default=None)
     parser.add_argument('-m', '--months', type=int, default=12, help='Months of history to analyze')
+    parser.add_argument('--rank-by', choices=HotspotAnalyzer.RANKING_METRICS, default='changes',
+                        help='Activity metric used to rank hotspots: commit count or line churn')
+    add_cache_arguments(parser)
+    add_checkpoint_arguments(parser)
+    add_format_arguments(parser)
+    add_enumeration_arguments(parser)
+    add_exclude_arguments(parser)
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
     
     args = parser.parse_args()
@@ -392,7 +524,11 @@ def main():
         logger.error(f"Repository path does not exist: {args.repo_path}")
         sys.exit(1)
     
-    analyzer = HotspotAnalyzer(args.repo_path, args.output, args.months)
+    analyzer = HotspotAnalyzer(args.repo_path, args.output, args.months, args.rank_by,
+                               open_cache_from_args(args, args.repo_path),
+                               incremental=args.incremental, checkpoint_dir=args.checkpoint_dir,
+                               output_format=args.output_format, enumeration=args.enumeration,
+                               extra_excludes=exclude_patterns_from_args(args))
     analyzer.run_analysis()
 
 
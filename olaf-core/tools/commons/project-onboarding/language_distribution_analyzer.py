@@ -14,9 +14,18 @@ import argparse
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 import logging
 
+from analysis_cache import AnalysisCache, add_cache_arguments, open_cache_from_args
+from file_inventory import FileInventory, add_enumeration_arguments
+from content_classifier import (CLASSIFY_BYTES, CONTENT_LANGUAGES, GENERATED, VENDORED, ContentClass, classify,
+                                name_exclusion)
+from line_counter import READ_CHUNK_SIZE, count_file_lines, count_stream_lines
+from path_matcher import PathMatcher, add_exclude_arguments, exclude_patterns_from_args
+from size_format import format_bytes
+from structured_output import FORMAT_SUFFIXES, add_format_arguments, open_record_writer
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -60,84 +69,248 @@ class LanguageDistributionAnalyzer:
         "Kubernetes": ["*.yaml", "*.yml"]  # In k8s context
     }
     
-    def __init__(self, project_path: str, output_file: str = None):
+    # Result cache namespace for per-file line counts
+    CACHE_NAMESPACE = 'language-lines/v1'
+    # Result cache namespace for per-file [language, exclusion, lines] of content classification
+    CONTENT_CACHE_NAMESPACE = 'language-content/v2'
+    
+    # Subdirectories listed per directory in the report's directory size tree
+    TREE_CHILDREN_LISTED = 5
+    
+    def __init__(self, project_path: str, output_file: str = None,
+                 cache: Optional[AnalysisCache] = None, inventory: Optional[FileInventory] = None,
+                 output_format: str = 'markdown', count_loc: bool = True, structure_depth: int = 2,
+                 classify_content: bool = False, enumeration: str = 'walk',
+                 extra_excludes: Optional[List[str]] = None):
         self.project_path = Path(project_path).resolve()
-        self.output_file = output_file or self.project_path / "language-distribution.md"
+        # Prefix length to strip from walked paths for relative ones
+        self._root_length = len(str(self.project_path)) + 1
+        self.output_format = output_format
+        self.output_file = output_file or self.project_path / f"language-distribution{FORMAT_SUFFIXES[output_format]}"
+        self.cache = cache
+        self.inventory = inventory
+        self.enumeration = enumeration
+        # Without LOC the distribution is by file count and bytes, and no file is opened
+        self.count_loc = count_loc
+        # Levels of the directory size tree rolled up from the file walk
+        self.structure_depth = max(1, structure_depth)
+        # Refine languages from file heads and keep generated/vendored files out of LOC
+        self.classify_content = classify_content
+        # Extension languages whose files classification reads the head of (see needs_head)
+        self._head_languages = CONTENT_LANGUAGES if count_loc else frozenset({None})
+        # Inverted LANGUAGE_MAP; an extension listed twice keeps its first language
+        self.extension_index: Dict[str, str] = {}
+        for language, extensions in self.LANGUAGE_MAP.items():
+            for extension in extensions:
+                self.extension_index.setdefault(extension, language)
         self.exclude_patterns = [
             'node_modules', 'dist', 'bin', 'obj', 'build', 'target', 
             'vendor', 'packages', '.git', '__pycache__', '.pytest_cache',
-            '.next', '.turbo', '.cache', 'coverage', 'out', 'tmp'
+            '.next', '.turbo', '.cache', 'coverage', 'out', 'tmp', '.olaf-cache'
         ]
+        self.exclude_patterns.extend(extra_excludes or [])
+        self.path_matcher = PathMatcher(self.exclude_patterns, root=self.project_path)
         
     def should_exclude_path(self, path: Path) -> bool:
         """Check if path should be excluded from analysis."""
-        path_str = str(path)
-        return any(pattern in path_str for pattern in self.exclude_patterns)
+        return self.path_matcher.matches_file(path)
     
     def get_all_files(self) -> List[Path]:
         """Get all files in the project, excluding specified patterns."""
-        all_files = []
-        
-        for root, dirs, files in os.walk(self.project_path):
-            # Remove excluded directories from traversal
-            dirs[:] = [d for d in dirs if not any(pattern in d for pattern in self.exclude_patterns)]
-            
-            for file in files:
-                file_path = Path(root) / file
-                if not self.should_exclude_path(file_path):
-                    all_files.append(file_path)
-        
-        return all_files
+        return self.get_all_files_with_sizes()[0]
+    
+    def get_all_files_with_sizes(self) -> Tuple[List[Path], List[int]]:
+        """Get the project files and their sizes in bytes, as recorded by the walk (or the Git index)."""
+        # Excluded directories are pruned during the walk
+        inventory = self.inventory or FileInventory.build(
+            self.project_path, prune=self.path_matcher.matches_directory, enumeration=self.enumeration)
+        
+        files, sizes = [], []
+        for index in inventory.select():
+            path = inventory.path(index)
+            if not self.should_exclude_path(path):
+                files.append(path)
+                sizes.append(inventory.sizes[index])
+        return files, sizes
+    
+    def count_lines(self, file_path: Path) -> int:
+        """Count lines in a file, reusing the cached count for unchanged files."""
+        if self.cache:
+            relative_path = str(file_path.relative_to(self.project_path))
+            cached = self.cache.get(self.CACHE_NAMESPACE, relative_path, file_path)
+            if cached is not None:
+                return cached
+        
+        try:
+            lines = count_file_lines(file_path)
+        except (IOError, OSError):
+            return 0
+        
+        if self.cache:
+            self.cache.put(self.CACHE_NAMESPACE, relative_path, file_path, lines)
+        return lines
+    
+    def get_file_language(self, file_path: Path) -> Optional[str]:
+        """Return the language a file is counted under, or None to skip it."""
+        extension = file_path.suffix.lower()
+        language = self.extension_index.get(extension)
+        if language:
+            return language
+        
+        return "Other" if extension else None
+    
+    def get_name_language(self, name: str) -> Optional[str]:
+        """get_file_language for a file name, without a Path (the same suffix: a leading or trailing dot is none)."""
+        dot = name.rfind('.')
+        extension = name[dot:].lower() if 0 < dot < len(name) - 1 else ''
+        language = self.extension_index.get(extension)
+        if language:
+            return language
+        
+        return "Other" if extension else None
+    
+    def content_cache_namespace(self) -> str:
+        """Cache namespace of classify_file results; without LOC the lines are not stored."""
+        return self.CONTENT_CACHE_NAMESPACE if self.count_loc else f"{self.CONTENT_CACHE_NAMESPACE}/no-loc"
+    
+    def needs_head(self, suffix_language: Optional[str]) -> bool:
+        """
+        Whether content classification reads a file with this extension language.
+        
+        Only files whose head can change the answer are classified from it
+        (content_classifier.CONTENT_LANGUAGES); the others get the path
+        rules, and their lines, if counted, from the plain line count.
+        Without LOC only files without an extension are read.
+        """
+        return suffix_language in self._head_languages
+    
+    def classify_head(self, relative_path: str, suffix_language: Optional[str],
+                      head: Optional[bytes]) -> ContentClass:
+        """Classify a file from its path, extension language (get_file_language) and head (None if not read)."""
+        return classify(relative_path, suffix_language, head)
+    
+    def classify_file(self, file_path: Path,
+                      relative_path: str) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+        """
+        Return (language, exclusion, lines) of a file from at most one open.
+        
+        The head is classified first; the rest of the file is read only to
+        count the lines of a file that has a language. lines is None when LOC
+        is not counted, or when the file is classified by its path alone (see
+        needs_head) and summarize_languages counts its lines.
+        """
+        # One split of the relative path gives the name for the extension and the path rules
+        directory, _, name = relative_path.rpartition(os.sep)
+        suffix_language = self.get_name_language(name)
+        if suffix_language not in self._head_languages:
+            # Path rules only (see needs_head), cheaper than a cache lookup; lines come from the line counter
+            return (suffix_language, name_exclusion(directory, name), None)
+        
+        if self.cache:
+            cached = self.cache.get(self.content_cache_namespace(), relative_path, file_path)
+            if cached is not None:
+                return tuple(cached)
+        
+        lines = 0 if self.count_loc else None
+        try:
+            with open(file_path, 'rb', buffering=0) as f:
+                # A file with a language is counted anyway: read its first line-count chunk
+                # at once. Others are read only up to the classification budget.
+                head = f.read(READ_CHUNK_SIZE if self.count_loc and suffix_language else CLASSIFY_BYTES)
+                language, exclusion = classify(relative_path, suffix_language, head)
+                if self.count_loc and language:
+                    lines = count_stream_lines(f, head)
+        except (IOError, OSError):
+            return (suffix_language, name_exclusion(directory, name), lines)
+        
+        result = (language, exclusion, lines)
+        if self.cache:
+            self.cache.put(self.content_cache_namespace(), relative_path, file_path, list(result))
+        return result
     
     def analyze_language_distribution(self) -> Dict:
         """Analyze language distribution across all files."""
-        all_files = self.get_all_files()
+        all_files, file_sizes = self.get_all_files_with_sizes()
+        line_counter = self.count_lines if self.count_loc else None
+        classifier = self.classify_file if self.classify_content else None
+        return self.summarize_languages(all_files, line_counter, file_sizes, classifier)
+    
+    def summarize_languages(self, all_files: List[Path], line_counter: Optional[Callable[[Path], int]],
+                            file_sizes: Optional[Sequence[int]] = None,
+                            classifier: Optional[Callable[[Path, str], Tuple]] = None) -> Dict:
+        """
+        Aggregate language statistics, counting lines through line_counter.
+        
+        Without a line_counter no lines are counted. file_sizes, parallel to
+        all_files, gives the bytes per language. Files, bytes and lines are
+        also totalled per directory, down to structure_depth, for the
+        directory size tree.
+        
+        classifier, if given, returns (language, exclusion, lines) for a file
+        and its path relative to the project, in place of the extension's
+        language (see classify_file); lines of
+        generated and vendored files are totalled apart from the LOC.
+        """
         language_stats = {}
         file_examples = {}
         total_loc = 0
+        excluded = {GENERATED: {'file_count': 0, 'total_lines': 0},
+                    VENDORED: {'file_count': 0, 'total_lines': 0}}
+        directory_totals: Dict[Tuple[str, ...], List[int]] = {}
         
         # Initialize language counters
         for language in self.LANGUAGE_MAP.keys():
             language_stats[language] = {
                 'file_count': 0,
                 'total_lines': 0,
+                'total_bytes': 0,
                 'extensions': set()
             }
             file_examples[language] = []
         
         logger.info(f"Analyzing {len(all_files)} files...")
         
-        for file_path in all_files:
+        for i, file_path in enumerate(all_files):
             extension = file_path.suffix.lower()
+            relative_path = str(file_path)[self._root_length:]
+            if classifier:
+                matched_language, exclusion, lines = classifier(file_path, relative_path)
+            else:
+                matched_language, exclusion, lines = self.get_file_language(file_path), None, None
+            size_bytes = file_sizes[i] if file_sizes is not None else 0
             
-            # Find matching language
-            matched_language = None
-            for language, extensions in self.LANGUAGE_MAP.items():
-                if extension in extensions:
-                    matched_language = language
-                    break
-            
-            if not matched_language and extension:
-                matched_language = "Other"
-            
+            if exclusion:
+                excluded[exclusion]['file_count'] += 1
             if matched_language:
                 # Count lines of code
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = len(f.readlines())
-                        language_stats[matched_language]['total_lines'] += lines
-                        total_loc += lines
-                except (IOError, UnicodeDecodeError):
-                    lines = 0
+                if line_counter:
+                    if lines is None:
+                        lines = line_counter(file_path)
+                    if exclusion:
+                        excluded[exclusion]['total_lines'] += lines
+                        lines = 0
+                    language_stats[matched_language]['total_lines'] += lines
+                    total_loc += lines
+                language_stats[matched_language]['total_bytes'] += size_bytes
                 
                 # Update statistics
                 language_stats[matched_language]['file_count'] += 1
-                language_stats[matched_language]['extensions'].add(extension)
+                if extension:
+                    language_stats[matched_language]['extensions'].add(extension)
                 
                 # Store file examples (limit to 5 per language)
                 if len(file_examples[matched_language]) < 5:
-                    relative_path = file_path.relative_to(self.project_path)
-                    file_examples[matched_language].append(str(relative_path))
+                    file_examples[matched_language].append(relative_path)
+            
+            # Files directly in the project root belong to no directory
+            directory = tuple(relative_path.split(os.sep)[:-1][:self.structure_depth])
+            if directory:
+                totals = directory_totals.get(directory)
+                if totals is None:
+                    totals = directory_totals[directory] = [0, 0, 0]
+                totals[0] += 1
+                totals[1] += size_bytes
+                totals[2] += lines or 0
         
         # Convert sets to lists for JSON serialization
         for language in language_stats:
@@ -147,9 +320,49 @@ class LanguageDistributionAnalyzer:
             'language_stats': language_stats,
             'file_examples': file_examples,
             'total_files': len(all_files),
-            'total_loc': total_loc
+            'total_loc': total_loc,
+            'total_bytes': sum(stats['total_bytes'] for stats in language_stats.values()),
+            'loc_counted': line_counter is not None,
+            'content_classified': classifier is not None,
+            'excluded_from_loc': excluded,
+            'directory_tree': self.build_directory_tree(directory_totals)
         }
     
+    @staticmethod
+    def build_directory_tree(directory_totals: Dict[Tuple[str, ...], List[int]]) -> List[Dict]:
+        """
+        Roll per-directory [files, bytes, lines] totals up into nested nodes.
+        
+        Every directory's totals include its subdirectories; children are
+        sorted by file count (descending).
+        """
+        nodes: Dict[Tuple[str, ...], Dict] = {}
+        roots = []
+        
+        for directory in sorted(directory_totals, key=len):
+            file_count, total_bytes, total_lines = directory_totals[directory]
+            # Each file is added to its own directory and every ancestor
+            for depth in range(1, len(directory) + 1):
+                prefix = directory[:depth]
+                node = nodes.get(prefix)
+                if node is None:
+                    node = nodes[prefix] = {
+                        'name': prefix[-1],
+                        'path': '/'.join(prefix),
+                        'file_count': 0,
+                        'total_bytes': 0,
+                        'total_lines': 0,
+                        'children': []
+                    }
+                    (nodes[prefix[:-1]]['children'] if depth > 1 else roots).append(node)
+                node['file_count'] += file_count
+                node['total_bytes'] += total_bytes
+                node['total_lines'] += total_lines
+        
+        for node in nodes.values():
+            node['children'].sort(key=lambda x: (-x['file_count'], x['name']))
+        return sorted(roots, key=lambda x: (-x['file_count'], x['name']))
+    
     def detect_project_types(self) -> Dict:
         """Detect project types based on configuration files."""
         detected_types = {}
@@ -180,8 +393,13 @@ class LanguageDistributionAnalyzer:
             'config_files': config_files_found
         }
     
-    def analyze_project_structure(self) -> Dict:
-        """Analyze overall project structure."""
+    def analyze_project_structure(self, directory_tree: Optional[List[Dict]] = None) -> Dict:
+        """
+        Analyze overall project structure.
+        
+        directory_tree is the one summarize_languages builds from the file
+        walk; without it the project is walked again to build it.
+        """
         structure_info = {
             'is_monorepo': False,
             'directory_structure': {},
@@ -205,17 +423,21 @@ class LanguageDistributionAnalyzer:
         
         structure_info['monorepo_indicators'] = found_indicators
         
-        # Analyze top-level directory structure
-        top_level_dirs = []
-        for item in self.project_path.iterdir():
-            if item.is_dir() and not item.name.startswith('.') and item.name not in self.exclude_patterns:
-                file_count = len(list(item.rglob('*')))
-                top_level_dirs.append({
-                    'name': item.name,
-                    'file_count': file_count
-                })
-        
-        structure_info['top_level_directories'] = sorted(top_level_dirs, key=lambda x: x['file_count'], reverse=True)
+        # Top-level directory sizes, rolled up from the file walk
+        if directory_tree is None:
+            all_files, file_sizes = self.get_all_files_with_sizes()
+            directory_tree = self.summarize_languages(all_files, None, file_sizes)['directory_tree']
+        directory_tree = [node for node in directory_tree
+                          if not node['name'].startswith('.') and not self.path_matcher.matches_directory(node['name'])]
+        
+        structure_info['top_level_directories'] = [{
+            'name': node['name'],
+            'file_count': node['file_count'],
+            'total_bytes': node['total_bytes'],
+            'total_lines': node['total_lines']
+        } for node in directory_tree]
+        structure_info['directory_tree'] = directory_tree
+        structure_info['directory_tree_depth'] = self.structure_depth
         
         return structure_info
     
@@ -316,7 +538,13 @@ class LanguageDistributionAnalyzer:
         # Filter out languages with no files
         active_languages = {k: v for k, v in language_stats.items() if v['file_count'] > 0}
         
-        report = f"""# Language Distribution Analysis Report
+        # Sort by file count (descending)
+        sorted_languages = sorted(active_languages.items(), key=lambda x: x[1]['file_count'], reverse=True)
+        
+        if not analysis_data.get('loc_counted', True):
+            report = self._size_distribution_overview(analysis_data, sorted_languages, timestamp)
+        else:
+            report = f"""# Language Distribution Analysis Report
 
 **Analysis Date**: {timestamp}  
 **Project Path**: {self.project_path}  
@@ -328,18 +556,18 @@ class LanguageDistributionAnalyzer:
 | Language | Files | % of Files | Lines of Code | % of LOC | Avg Lines/File |
 |----------|-------|------------|---------------|----------|----------------|
 """
-        
-        # Sort by file count (descending)
-        sorted_languages = sorted(active_languages.items(), key=lambda x: x[1]['file_count'], reverse=True)
-        
-        for language, stats in sorted_languages:
-            file_count = stats['file_count']
-            lines = stats['total_lines']
-            file_percent = round((file_count / total_files) * 100, 1) if total_files > 0 else 0
-            loc_percent = round((lines / total_loc) * 100, 1) if total_loc > 0 else 0
-            avg_lines = round(lines / file_count, 1) if file_count > 0 else 0
             
-            report += f"| {language} | {file_count:,} | {file_percent}% | {lines:,} | {loc_percent}% | {avg_lines} |\n"
+            for language, stats in sorted_languages:
+                file_count = stats['file_count']
+                lines = stats['total_lines']
+                file_percent = round((file_count / total_files) * 100, 1) if total_files > 0 else 0
+                loc_percent = round((lines / total_loc) * 100, 1) if total_loc > 0 else 0
+                avg_lines = round(lines / file_count, 1) if file_count > 0 else 0
+                
+                report += f"| {language} | {file_count:,} | {file_percent}% | {lines:,} | {loc_percent}% | {avg_lines} |\n"
+        
+        if analysis_data.get('content_classified'):
+            report += self._excluded_files_note(analysis_data)
         
         report += """
 ## Project Type Detection
@@ -383,11 +611,22 @@ Based on configuration files and project structure:
         else:
             report += "**Structure Type**: Single project\n"
         
+        loc_counted = analysis_data.get('loc_counted', True)
         report += "\n**Top-Level Directories**:\n\n"
-        report += "| Directory | File Count |\n|-----------|------------|\n"
+        if loc_counted:
+            report += ("| Directory | File Count | Size | Lines of Code |\n"
+                       "|-----------|------------|------|---------------|\n")
+        else:
+            report += "| Directory | File Count | Size |\n|-----------|------------|------|\n"
         
         for dir_info in structure['top_level_directories'][:10]:  # Top 10
-            report += f"| {dir_info['name']} | {dir_info['file_count']:,} |\n"
+            report += f"| {dir_info['name']} | {dir_info['file_count']:,} | {format_bytes(dir_info['total_bytes'])} |"
+            report += f" {dir_info['total_lines']:,} |\n" if loc_counted else "\n"
+        
+        if structure.get('directory_tree_depth', 1) > 1 and structure.get('directory_tree'):
+            report += (f"\n**Directory Size Tree** (to depth {structure['directory_tree_depth']}, "
+                       f"largest {self.TREE_CHILDREN_LISTED} subdirectories per directory):\n\n")
+            report += self._format_directory_tree(structure['directory_tree'][:10], loc_counted)
         
         report += """
 ## Language-Specific File Examples
@@ -468,46 +707,158 @@ This project has a **focused technology stack** with few languages:
         
         return report
     
+    def _size_distribution_overview(self, analysis_data: Dict, sorted_languages: List[Tuple[str, Dict]],
+                                    timestamp: str) -> str:
+        """Report header and language table by file count and bytes (--no-loc)."""
+        total_files = analysis_data['total_files']
+        total_bytes = analysis_data['total_bytes']
+        
+        report = f"""# Language Distribution Analysis Report
+
+**Analysis Date**: {timestamp}  
+**Project Path**: {self.project_path}  
+**Total Files**: {total_files:,}  
+**Total Size**: {format_bytes(total_bytes)} (lines of code not counted)
+
+## Language Distribution Overview
+
+| Language | Files | % of Files | Size | % of Size | Avg Size/File |
+|----------|-------|------------|------|-----------|---------------|
+"""
+        
+        for language, stats in sorted_languages:
+            file_count = stats['file_count']
+            size_bytes = stats['total_bytes']
+            file_percent = round((file_count / total_files) * 100, 1) if total_files > 0 else 0
+            size_percent = round((size_bytes / total_bytes) * 100, 1) if total_bytes > 0 else 0
+            
+            report += (f"| {language} | {file_count:,} | {file_percent}% | {format_bytes(size_bytes)} | "
+                       f"{size_percent}% | {format_bytes(size_bytes // file_count)} |\n")
+        
+        return report
+    
+    def _excluded_files_note(self, analysis_data: Dict) -> str:
+        """Generated and vendored files found by content classification."""
+        excluded = analysis_data['excluded_from_loc']
+        generated, vendored = excluded[GENERATED], excluded[VENDORED]
+        if analysis_data.get('loc_counted', True):
+            return (f"\n**Excluded from Lines of Code**: {generated['file_count']:,} generated files "
+                    f"({generated['total_lines']:,} lines), {vendored['file_count']:,} vendored files "
+                    f"({vendored['total_lines']:,} lines). Languages are refined from shebangs and modelines.\n")
+        return (f"\n**Generated/Vendored Files**: {generated['file_count']:,} generated, "
+                f"{vendored['file_count']:,} vendored. Languages are refined from shebangs and modelines.\n")
+    
+    def _format_directory_tree(self, nodes: List[Dict], loc_counted: bool, level: int = 0) -> str:
+        """Nested Markdown list of directory sizes, largest subdirectories first."""
+        indent = '  ' * level
+        lines = []
+        for node in nodes:
+            line = f"{indent}- `{node['path']}/`: {node['file_count']:,} files, {format_bytes(node['total_bytes'])}"
+            if loc_counted:
+                line += f", {node['total_lines']:,} lines"
+            lines.append(line + "\n")
+            children = node['children']
+            if children:
+                lines.append(self._format_directory_tree(children[:self.TREE_CHILDREN_LISTED], loc_counted, level + 1))
+                if len(children) > self.TREE_CHILDREN_LISTED:
+                    lines.append(f"{indent}  - ... {len(children) - self.TREE_CHILDREN_LISTED} more\n")
+        return ''.join(lines)
+    
+    def language_records(self, analysis_data: Dict) -> List[Dict]:
+        """One row per language with files, by file count (descending), as in the report table."""
+        total_files = analysis_data['total_files']
+        total_loc = analysis_data['total_loc']
+        records = []
+        
+        for language, stats in analysis_data['language_stats'].items():
+            file_count = stats['file_count']
+            if file_count == 0:
+                continue
+            lines = stats['total_lines']
+            records.append({
+                'language': language,
+                'file_count': file_count,
+                'file_percent': round((file_count / total_files) * 100, 1) if total_files > 0 else 0,
+                'total_lines': lines,
+                'loc_percent': round((lines / total_loc) * 100, 1) if total_loc > 0 else 0,
+                'avg_lines': round(lines / file_count, 1),
+                'total_bytes': stats['total_bytes'],
+                'extensions': sorted(stats['extensions']),
+                'examples': analysis_data['file_examples'].get(language, [])
+            })
+        
+        return sorted(records, key=lambda x: x['file_count'], reverse=True)
+    
+    def write_structured_report(self, analysis_data: Dict) -> None:
+        """Write the language rows and project details in the structured output format."""
+        with open_record_writer(self.output_format, self.output_file) as writer:
+            for record in self.language_records(analysis_data):
+                writer.write(record)
+            writer.close({
+                'project_path': str(self.project_path),
+                'total_files': analysis_data['total_files'],
+                'total_loc': analysis_data['total_loc'],
+                'total_bytes': analysis_data['total_bytes'],
+                'loc_counted': analysis_data['loc_counted'],
+                'content_classified': analysis_data['content_classified'],
+                'excluded_from_loc': analysis_data['excluded_from_loc'],
+                'project_types': analysis_data['project_types'],
+                'structure': analysis_data['structure'],
+                'tech_details': analysis_data['tech_details']
+            })
+    
     def run_analysis(self) -> None:
         """Run complete language distribution analysis."""
         logger.info(f"Starting language distribution analysis of: {self.project_path}")
         
         # Analyze language distribution
         logger.info("Analyzing language distribution...")
-        language_analysis = self.analyze_language_distribution()
+        try:
+            language_analysis = self.analyze_language_distribution()
+        finally:
+            if self.cache:
+                self.cache.close()
+        
+        analysis_data = self.complete_analysis(language_analysis)
+        
+        if self.output_format != 'markdown':
+            self.write_structured_report(analysis_data)
+            return
+        
+        # Generate report
+        logger.info("Generating report...")
+        report = self.generate_report(analysis_data)
+        
+        # Save report
+        output_path = Path(self.output_file)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(report)
         
+        logger.info(f"Analysis complete. Report saved to: {output_path}")
+    
+    def complete_analysis(self, language_analysis: Dict) -> Dict:
+        """Add project type, structure and technology details to the language analysis."""
         # Detect project types
         logger.info("Detecting project types...")
         project_types = self.detect_project_types()
         
         # Analyze project structure
         logger.info("Analyzing project structure...")
-        structure = self.analyze_project_structure()
+        structure = self.analyze_project_structure(language_analysis.get('directory_tree'))
         
         # Extract technology details
         logger.info("Extracting technology details...")
         tech_details = self.extract_technology_details(project_types['detected_types'])
         
-        # Combine all analysis data
-        analysis_data = {
-            **language_analysis,
+        # Combine all analysis data; the directory tree is reported under structure
+        return {
+            **{key: value for key, value in language_analysis.items() if key != 'directory_tree'},
             'project_types': project_types,
             'structure': structure,
             'tech_details': tech_details
         }
-        
-        # Generate report
-        logger.info("Generating report...")
-        report = self.generate_report(analysis_data)
-        
-        # Save report
-        output_path = Path(self.output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(report)
-        
-        logger.info(f"Analysis complete. Report saved to: {output_path}")
 
 
 def main():
@@ -516,6 +867,17 @@ def main():
     parser.add_argument('project_path', help='Path to project directory')
     parser.add_argument('-o', '--output', help='Output file path', default=None)
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+    parser.add_argument('--no-loc', action='store_true',
+                        help='Skip line counting: distribution by file count and bytes, without reading any file')
+    parser.add_argument('--classify-content', action='store_true',
+                        help='Refine languages from the first KB of each file (shebangs, modelines) and '
+                             'keep generated and vendored files out of the lines of code')
+    parser.add_argument('--structure-depth', type=int, default=2,
+                        help='Directory levels in the directory size tree of the report (default: 2)')
+    add_cache_arguments(parser)
+    add_format_arguments(parser)
+    add_enumeration_arguments(parser)
+    add_exclude_arguments(parser)
     
     args = parser.parse_args()
     
@@ -526,7 +888,13 @@ def main():
         logger.error(f"Project path does not exist: {args.project_path}")
         sys.exit(1)
     
-    analyzer = LanguageDistributionAnalyzer(args.project_path, args.output)
+    analyzer = LanguageDistributionAnalyzer(args.project_path, args.output,
+                                            open_cache_from_args(args, args.project_path),
+                                            output_format=args.output_format, count_loc=not args.no_loc,
+                                            structure_depth=args.structure_depth,
+                                            classify_content=args.classify_content,
+                                            enumeration=args.enumeration,
+                                            extra_excludes=exclude_patterns_from_args(args))
     analyzer.run_analysis()
 
 
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Byte-Level Line Counting for Project Onboarding
+
+Counts the lines of a file from its raw bytes, without decoding it as text.
+The count matches iterating the file in text mode (universal newlines, UTF-8
+with errors ignored): '\\n', '\\r\\n' and a lone '\\r' each end a line, and a
+last line without a line break counts too.
+
+scan_file() opens a file once, reads it in large binary chunks, sniffs the
+first block for NUL bytes and counts line breaks with bytes.count, so binary
+detection and line counting cost one open and no text decoding.
+"""
+
+from typing import Tuple
+
+# Bytes per read() call when scanning a file
+READ_CHUNK_SIZE = 1 << 20
+
+# Leading bytes searched for a NUL to classify a file as binary
+BINARY_SNIFF_BYTES = 1024
+
+_CR = 13
+_LF = 10
+
+
+class LineCounter:
+    """Incremental universal-newline line count over a sequence of byte chunks."""
+
+    __slots__ = ('breaks', '_last')
+
+    def __init__(self):
+        self.breaks = 0
+        self._last = _LF  # as if preceded by a line break: nothing counted yet
+
+    def feed(self, chunk: bytes) -> None:
+        """Count the line breaks in the next chunk of the file."""
+        if not chunk:
+            return
+        breaks = chunk.count(b'\n')
+        if b'\r' in chunk:
+            # A CR ends a line on its own, but CRLF is a single break
+            breaks += chunk.count(b'\r') - chunk.count(b'\r\n')
+        if self._last == _CR and chunk[0] == _LF:
+            breaks -= 1  # CRLF split across two chunks
+        self.breaks += breaks
+        self._last = chunk[-1]
+
+    @property
+    def lines(self) -> int:
+        """Lines seen so far, including a last line without a line break."""
+        return self.breaks + (self._last not in (_CR, _LF))
+
+
+def count_lines(data: bytes) -> int:
+    """Line count of a whole file's bytes."""
+    counter = LineCounter()
+    counter.feed(data)
+    return counter.lines
+
+
+def is_binary_data(head: bytes) -> bool:
+    """Check the first block of a file for the NUL bytes text files do not contain."""
+    return b'\0' in head[:BINARY_SNIFF_BYTES]
+
+
+def _count_rest(f, counter: LineCounter, chunk: bytes, chunk_size: int) -> int:
+    while chunk:
+        counter.feed(chunk)
+        chunk = f.read(chunk_size)
+    return counter.lines
+
+
+def count_stream_lines(f, head: bytes = b'', chunk_size: int = READ_CHUNK_SIZE) -> int:
+    """Line count of an open binary file, whose first bytes were already read as head."""
+    return _count_rest(f, LineCounter(), head or f.read(chunk_size), chunk_size)
+
+
+def count_file_lines(file_path, chunk_size: int = READ_CHUNK_SIZE) -> int:
+    """
+    Line count of a file, whatever its content, read in binary chunks.
+
+    Raises OSError when the file cannot be read.
+    """
+    with open(file_path, 'rb', buffering=0) as f:
+        return _count_rest(f, LineCounter(), f.read(chunk_size), chunk_size)
+
+
+def scan_file(file_path, chunk_size: int = READ_CHUNK_SIZE) -> Tuple[int, bool]:
+    """
+    Return (line count, is_binary) for a file, opening it once.
+
+    Binary files report 0 lines and are not read past the first block.
+    Raises OSError when the file cannot be read.
+    """
+    # Unbuffered: chunks go straight from read() to bytes.count
+    with open(file_path, 'rb', buffering=0) as f:
+        chunk = f.read(chunk_size)
+        if is_binary_data(chunk):
+            return 0, True
+        return _count_rest(f, LineCounter(), chunk, chunk_size), False
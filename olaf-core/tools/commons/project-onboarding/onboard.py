@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+Combined Onboarding Pipeline Runner
+
+Runs the complete project onboarding analysis in one process. The repository
+is walked once, each file's bytes are read once, and the content is pushed
+through per-analyzer visitors (repository size, language distribution,
+cyclomatic complexity, hotspot complexity). The contributor and workspace
+analyzers then run as usual, and all six reports are written to one
+output directory. With --format json/csv/ndjson the metric reports are
+written as structured records instead (the workspace report stays Markdown).
+
+The reports are identical to those of the individual scripts.
+"""
+
+import os
+import argparse
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from analysis_cache import AnalysisCache, add_cache_arguments, open_cache_from_args
+from complexity_analyzer import ComplexityAnalyzer, FunctionComplexity
+from contributor_analyzer import ContributorAnalyzer
+from file_inventory import FileInventory, add_enumeration_arguments
+from history_checkpoint import add_checkpoint_arguments
+from hotspot_analyzer import HotspotAnalyzer
+from language_distribution_analyzer import LanguageDistributionAnalyzer
+from line_counter import count_lines, is_binary_data
+from path_matcher import PathMatcher, add_exclude_arguments, exclude_patterns_from_args
+from repo_size_metrics_calculator import FileMetricsStore, RepoSizeMetricsCalculator
+from structured_output import add_format_arguments, output_path_for
+from workspace_content_analyzer import WorkspaceContentAnalyzer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+REPORT_FILES = {
+    'workspace': 'workspace-analysis.md',
+    'language': 'language-distribution.md',
+    'size': 'repo-size-metrics.md',
+    'complexity': 'cyclomatic-complexity.md',
+    'hotspots': 'complexity-hotspots.md',
+    'contributors': 'contributor-analysis.md',
+}
+
+
+class FileContent:
+    """The bytes of one file, read once, with lazily decoded views shared by visitors."""
+
+    __slots__ = ('data', '_text', '_lines')
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self._text: Optional[str] = None
+        self._lines: Optional[List[str]] = None
+
+    @property
+    def text(self) -> str:
+        """UTF-8 text with universal newlines, as open(..., errors='ignore').read() returns."""
+        if self._text is None:
+            self._text = self.data.decode('utf-8', 'ignore').replace('\r\n', '\n').replace('\r', '\n')
+        return self._text
+
+    @property
+    def lines(self) -> List[str]:
+        """Lines of the text, as readlines() returns them."""
+        if self._lines is None:
+            parts = self.text.split('\n')
+            last = parts.pop()
+            self._lines = [part + '\n' for part in parts]
+            if last:
+                self._lines.append(last)
+        return self._lines
+
+
+class FileVisitor(ABC):
+    """
+    Per-analyzer stage of the pipeline.
+
+    prepare() is called for every inventoried file and returns True when the
+    visitor needs the file content; visit() then receives it (None if the file
+    could not be read).
+    """
+
+    def __init__(self, cache: Optional[AnalysisCache]):
+        self.cache = cache
+
+    def _cached(self, namespace: str, relative_path: str, file_path: Path, stat_result):
+        """Look up a cached per-file result, if caching is enabled."""
+        if not self.cache:
+            return None
+        return self.cache.get(namespace, relative_path, file_path, stat_result)
+
+    def _store(self, namespace: str, relative_path: str, file_path: Path, result, stat_result) -> None:
+        """Store a per-file result, if caching is enabled."""
+        if self.cache:
+            self.cache.put(namespace, relative_path, file_path, result, stat_result)
+
+    @abstractmethod
+    def prepare(self, relative_path: str, file_path: Path, stat_result) -> bool:
+        """Return True when visit() needs the file content."""
+
+    @abstractmethod
+    def visit(self, relative_path: str, file_path: Path, stat_result,
+              content: Optional[FileContent]) -> None:
+        """Process the content of a file prepare() asked for (None if it could not be read)."""
+
+
+class RepoSizeVisitor(FileVisitor):
+    """Collects size, line count and binary flag for RepoSizeMetricsCalculator."""
+
+    def __init__(self, calculator: RepoSizeMetricsCalculator, cache: Optional[AnalysisCache]):
+        super().__init__(cache)
+        self.calculator = calculator
+        self.file_metrics = FileMetricsStore()
+
+    def _record(self, relative_path: str, file_path: Path, stat_result,
+                line_count: int, is_binary: bool) -> None:
+        self.file_metrics.append(relative_path, stat_result.st_size, line_count, is_binary,
+                                 self.calculator.get_file_category(file_path))
+
+    def prepare(self, relative_path: str, file_path: Path, stat_result) -> bool:
+        if self.calculator.should_exclude_path(file_path):
+            return False
+
+        cached = self._cached(self.calculator.CACHE_NAMESPACE, relative_path, file_path, stat_result)
+        if cached is not None:
+            self._record(relative_path, file_path, stat_result, cached[0], cached[1])
+            return False
+
+        if file_path.suffix.lower() in self.calculator.BINARY_EXTENSIONS:
+            self._record(relative_path, file_path, stat_result, 0, True)
+            self._store(self.calculator.CACHE_NAMESPACE, relative_path, file_path, [0, True], stat_result)
+            return False
+
+        return True
+
+    def visit(self, relative_path: str, file_path: Path, stat_result,
+              content: Optional[FileContent]) -> None:
+        if content is None:
+            return  # unreadable (deleted since the inventory, or no permission), as in scan_file()
+        is_binary = is_binary_data(content.data)
+        line_count = 0 if is_binary else count_lines(content.data)
+
+        self._record(relative_path, file_path, stat_result, line_count, is_binary)
+        self._store(self.calculator.CACHE_NAMESPACE, relative_path, file_path,
+                    [line_count, is_binary], stat_result)
+
+    def results(self) -> Dict:
+        return self.calculator.summarize_metrics(self.file_metrics)
+
+
+class LanguageVisitor(FileVisitor):
+    """Counts lines per file, and classifies file content if enabled, for LanguageDistributionAnalyzer."""
+
+    def __init__(self, analyzer: LanguageDistributionAnalyzer, cache: Optional[AnalysisCache]):
+        super().__init__(cache)
+        self.analyzer = analyzer
+        self.files: List[Path] = []
+        self.file_sizes: List[int] = []
+        self.line_counts: Dict[Path, int] = {}
+        self.content_classes: Dict[Path, Tuple] = {}
+        # Extension language of the files read for classification, looked up once in prepare()
+        self.suffix_languages: Dict[Path, Optional[str]] = {}
+
+    def prepare(self, relative_path: str, file_path: Path, stat_result) -> bool:
+        if self.analyzer.should_exclude_path(file_path):
+            return False
+
+        self.files.append(file_path)
+        self.file_sizes.append(stat_result.st_size)
+        suffix_language = self.analyzer.get_file_language(file_path)
+        if self.analyzer.classify_content and self.analyzer.needs_head(suffix_language):
+            return self._prepare_classification(relative_path, file_path, stat_result, suffix_language)
+        # Files not classified from their head are classified by path in results(), and counted below
+        if not self.analyzer.count_loc or suffix_language is None:
+            return False
+
+        cached = self._cached(self.analyzer.CACHE_NAMESPACE, relative_path, file_path, stat_result)
+        if cached is not None:
+            self.line_counts[file_path] = cached
+            return False
+        return True
+
+    def _prepare_classification(self, relative_path: str, file_path: Path, stat_result,
+                                suffix_language: Optional[str]) -> bool:
+        cached = self._cached(self.analyzer.content_cache_namespace(), relative_path, file_path, stat_result)
+        if cached is not None:
+            self.content_classes[file_path] = tuple(cached)
+            return False
+        self.suffix_languages[file_path] = suffix_language
+        return True
+
+    def visit(self, relative_path: str, file_path: Path, stat_result,
+              content: Optional[FileContent]) -> None:
+        classified = file_path in self.suffix_languages
+        suffix_language = self.suffix_languages.pop(file_path, None)
+        if content is None:
+            return
+
+        if classified:
+            content_class = self.analyzer.classify_head(relative_path, suffix_language, content.data)
+            lines = None
+            if self.analyzer.count_loc:
+                lines = count_lines(content.data) if content_class.language else 0
+            self.content_classes[file_path] = (content_class.language, content_class.exclusion, lines)
+            self._store(self.analyzer.content_cache_namespace(), relative_path, file_path,
+                        list(self.content_classes[file_path]), stat_result)
+            return
+
+        self.line_counts[file_path] = count_lines(content.data)
+        self._store(self.analyzer.CACHE_NAMESPACE, relative_path, file_path,
+                    self.line_counts[file_path], stat_result)
+
+    def _content_class(self, file_path: Path, relative_path: str) -> Tuple:
+        """Classification of a visited file; files not classified from their head get path and extension."""
+        content_class = self.content_classes.get(file_path)
+        if content_class is None:
+            language, exclusion = self.analyzer.classify_head(relative_path,
+                                                              self.analyzer.get_file_language(file_path), None)
+            content_class = (language, exclusion, None)  # lines, if counted, come from the line counter
+        return content_class
+
+    def results(self) -> Dict:
+        line_counter = (lambda file_path: self.line_counts.get(file_path, 0)) if self.analyzer.count_loc else None
+        classifier = self._content_class if self.analyzer.classify_content else None
+        language_analysis = self.analyzer.summarize_languages(self.files, line_counter, self.file_sizes,
+                                                              classifier)
+        return self.analyzer.complete_analysis(language_analysis)
+
+
+class ComplexityVisitor(FileVisitor):
+    """Runs the cyclomatic complexity analysis of ComplexityAnalyzer on source files."""
+
+    def __init__(self, analyzer: ComplexityAnalyzer, cache: Optional[AnalysisCache]):
+        super().__init__(cache)
+        self.analyzer = analyzer
+        self.functions: Dict[Path, List[FunctionComplexity]] = {}
+
+    def prepare(self, relative_path: str, file_path: Path, stat_result) -> bool:
+        if file_path.suffix.lower() not in self.analyzer.LANGUAGE_MAP:
+            return False
+        if self.analyzer.should_exclude_file(file_path):
+            return False
+
+        cached = self._cached(self.analyzer.CACHE_NAMESPACE, relative_path, file_path, stat_result)
+        if cached is not None:
+            self.functions[file_path] = [FunctionComplexity(*func) for func in cached]
+            return False
+        return True
+
+    def visit(self, relative_path: str, file_path: Path, stat_result,
+              content: Optional[FileContent]) -> None:
+        functions = self.analyzer.analyze_lines(content.lines if content else None, file_path)
+        self.functions[file_path] = functions
+        self._store(self.analyzer.CACHE_NAMESPACE, relative_path, file_path,
+                    [list(func) for func in functions], stat_result)
+
+    def results(self) -> Dict:
+        # Same ordering as get_source_files()
+        source_files = sorted(self.functions)
+        return self.analyzer.collect_results(source_files, (self.functions[path] for path in source_files))
+
+
+class HotspotVisitor(FileVisitor):
+    """Measures lines and conditionals of the most active files for HotspotAnalyzer."""
+
+    def __init__(self, analyzer: HotspotAnalyzer, cache: Optional[AnalysisCache]):
+        super().__init__(cache)
+        self.analyzer = analyzer
+        # Git history must be scanned first to know which files to measure
+        self.top_files = analyzer.select_top_files()
+        self.wanted = {file_path for file_path, _ in self.top_files}
+        self.complexity: Dict[str, Tuple[int, int]] = {}
+
+    @staticmethod
+    def _git_path(relative_path: str) -> str:
+        return relative_path.replace(os.sep, '/')
+
+    def prepare(self, relative_path: str, file_path: Path, stat_result) -> bool:
+        git_path = self._git_path(relative_path)
+        if git_path not in self.wanted:
+            return False
+
+        cached = self._cached(self.analyzer.CACHE_NAMESPACE, git_path, file_path, stat_result)
+        if cached is not None:
+            self.complexity[git_path] = (cached[0], cached[1])
+            return False
+        return True
+
+    def visit(self, relative_path: str, file_path: Path, stat_result,
+              content: Optional[FileContent]) -> None:
+        git_path = self._git_path(relative_path)
+        result = self.analyzer.analyze_text_complexity(content.text) if content else (0, 0)
+        self.complexity[git_path] = result
+        self._store(self.analyzer.CACHE_NAMESPACE, git_path, file_path, list(result), stat_result)
+
+    def _file_complexity(self, file_path: str, full_path: Path) -> Tuple[int, int]:
+        # Top files outside the inventory (e.g. below a pruned directory) are read directly
+        if file_path in self.complexity:
+            return self.complexity[file_path]
+        return self.analyzer._cached_file_complexity(file_path, full_path)
+
+    def results(self):
+        return self.analyzer.build_hotspots(self.top_files, self._file_complexity)
+
+
+class OnboardingPipeline:
+    """Runs all onboarding analyzers over a single walk and a single read per file."""
+
+    def __init__(self, repo_path: str, output_dir: str = None, months_to_analyze: int = 12,
+                 complexity_threshold: int = 10, rank_by: str = 'changes',
+                 cache: Optional[AnalysisCache] = None, incremental: bool = False,
+                 checkpoint_dir: Optional[str] = None, output_format: str = 'markdown',
+                 python_engine: str = 'regex', brace_engine: str = 'regex', tree_sitter: bool = False,
+                 classify_content: bool = False, enumeration: str = 'walk',
+                 extra_excludes: Optional[List[str]] = None):
+        self.repo_path = Path(repo_path).resolve()
+        self.output_dir = Path(output_dir) if output_dir else self.repo_path
+        self.months_to_analyze = months_to_analyze
+        self.complexity_threshold = complexity_threshold
+        self.rank_by = rank_by
+        self.cache = cache
+        self.incremental = incremental
+        self.checkpoint_dir = checkpoint_dir
+        self.output_format = output_format
+        self.python_engine = python_engine
+        self.brace_engine = brace_engine
+        self.tree_sitter = tree_sitter
+        self.classify_content = classify_content
+        self.enumeration = enumeration
+        self.extra_excludes = extra_excludes
+        self.bytes_read = 0
+        self.files_read = 0
+
+    def _output(self, report: str) -> Path:
+        output_path = self.output_dir / REPORT_FILES[report]
+        if report == 'workspace' or self.output_format == 'markdown':
+            return output_path
+        return output_path_for(output_path, self.output_format)
+
+    def _write_report(self, report_name: str, report: str) -> None:
+        output_path = self._output(report_name)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(report)
+
+        logger.info(f"Report saved to: {output_path}")
+
+    def _read(self, file_path: Path) -> Optional[FileContent]:
+        """Read a file's bytes once, or return None if it cannot be read."""
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        except (IOError, OSError) as e:
+            logger.warning(f"Could not read {file_path}: {e}")
+            return None
+
+        self.files_read += 1
+        self.bytes_read += len(data)
+        return FileContent(data)
+
+    def _run_file_stage(self, inventory: FileInventory, visitors: List[FileVisitor]) -> None:
+        """Read every inventoried file at most once and fan it out to the visitors."""
+        for index in inventory.select():
+            if index % 1000 == 0 and index > 0:
+                logger.info(f"Processed {index}/{len(inventory)} files")
+
+            relative_path = inventory.relative_path(index)
+            file_path = inventory.path(index)
+            stat_result = inventory.stat(index)
+
+            interested = [visitor for visitor in visitors
+                          if visitor.prepare(relative_path, file_path, stat_result)]
+            if not interested:
+                continue
+
+            content = self._read(file_path)
+            for visitor in interested:
+                visitor.visit(relative_path, file_path, stat_result, content)
+
+    def run_file_analyzers(self) -> None:
+        """Run the size, language, complexity and hotspot analyzers in one pass."""
+        size_calculator = RepoSizeMetricsCalculator(self.repo_path, self._output('size'),
+                                                    output_format=self.output_format,
+                                                    extra_excludes=self.extra_excludes)
+        language_analyzer = LanguageDistributionAnalyzer(self.repo_path, self._output('language'),
+                                                         output_format=self.output_format,
+                                                         classify_content=self.classify_content,
+                                                         extra_excludes=self.extra_excludes)
+        complexity_analyzer = ComplexityAnalyzer(self.repo_path, self._output('complexity'),
+                                                 self.complexity_threshold,
+                                                 output_format=self.output_format,
+                                                 python_engine=self.python_engine,
+                                                 brace_engine=self.brace_engine,
+                                                 tree_sitter=self.tree_sitter,
+                                                 extra_excludes=self.extra_excludes)
+        hotspot_analyzer = HotspotAnalyzer(self.repo_path, self._output('hotspots'),
+                                           self.months_to_analyze, self.rank_by, self.cache,
+                                           incremental=self.incremental,
+                                           checkpoint_dir=self.checkpoint_dir,
+                                           output_format=self.output_format,
+                                           extra_excludes=self.extra_excludes)
+
+        # Prune only what every analyzer excludes; each visitor applies its own list
+        common_excludes = [
+            pattern for pattern in complexity_analyzer.exclude_patterns
+            if all(pattern in analyzer.exclude_patterns
+                   for analyzer in (size_calculator, language_analyzer, hotspot_analyzer))
+        ]
+        inventory = FileInventory.build(self.repo_path,
+                                        prune=PathMatcher(common_excludes, root=self.repo_path).matches_directory,
+                                        enumeration=self.enumeration)
+
+        logger.info("Scanning Git history for hotspot candidates...")
+        size_visitor = RepoSizeVisitor(size_calculator, self.cache)
+        language_visitor = LanguageVisitor(language_analyzer, self.cache)
+        complexity_visitor = ComplexityVisitor(complexity_analyzer, self.cache)
+        hotspot_visitor = HotspotVisitor(hotspot_analyzer, self.cache)
+
+        started = time.perf_counter()
+        self._run_file_stage(inventory, [size_visitor, language_visitor, complexity_visitor, hotspot_visitor])
+        logger.info(f"Read {self.files_read} files ({self.bytes_read / (1024 * 1024):.1f} MB) once "
+                    f"for 4 analyzers in {time.perf_counter() - started:.2f}s")
+
+        if self.output_format != 'markdown':
+            size_calculator.write_structured_report(size_visitor.results())
+            language_analyzer.write_structured_report(language_visitor.results())
+            complexity_analyzer.write_structured_report(complexity_visitor.results())
+            hotspot_analyzer.write_structured_report(hotspot_visitor.results())
+            return
+
+        self._write_report('size', size_calculator.generate_report(size_visitor.results()))
+        self._write_report('language', language_analyzer.generate_report(language_visitor.results()))
+        self._write_report('complexity', complexity_analyzer.generate_report(complexity_visitor.results()))
+        self._write_report('hotspots', hotspot_analyzer.generate_report(hotspot_visitor.results()))
+
+    def run_contributor_analysis(self) -> None:
+        """Run the contributor analysis, skipping repositories without Git metadata."""
+        try:
+            analyzer = ContributorAnalyzer(self.repo_path, self.months_to_analyze,
+                                           self._output('contributors'),
+                                           incremental=self.incremental,
+                                           checkpoint_dir=self.checkpoint_dir,
+                                           output_format=self.output_format)
+        except ValueError as e:
+            logger.warning(f"Skipping contributor analysis: {e}")
+            return
+        analyzer.generate_report()
+
+    def run_analysis(self) -> None:
+        """Run the complete onboarding analysis and write all reports."""
+        logger.info(f"Starting onboarding analysis of: {self.repo_path}")
+        started = time.perf_counter()
+
+        try:
+            WorkspaceContentAnalyzer(self.repo_path, self._output('workspace')).run_analysis()
+            self.run_file_analyzers()
+            self.run_contributor_analysis()
+        finally:
+            if self.cache:
+                self.cache.close()
+
+        logger.info(f"Onboarding analysis complete in {time.perf_counter() - started:.2f}s. "
+                    f"Reports saved to: {self.output_dir}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description='Run the complete project onboarding analysis')
+    parser.add_argument('repo_path', help='Path to repository')
+    parser.add_argument('-o', '--output-dir', help='Directory for the reports (default: repo_path)',
+                        default=None)
+    parser.add_argument('-m', '--months', type=int, default=12, help='Months of history to analyze')
+    parser.add_argument('-t', '--threshold', type=int, default=10, help='Complexity threshold')
+    parser.add_argument('--rank-by', choices=HotspotAnalyzer.RANKING_METRICS, default='changes',
+                        help='Activity metric used to rank hotspots: commit count or line churn')
+    parser.add_argument('--python-engine', choices=ComplexityAnalyzer.PYTHON_ENGINES, default='regex',
+                        help='Python complexity engine: line regexes or the ast module (default: regex)')
+    parser.add_argument('--brace-engine', choices=ComplexityAnalyzer.BRACE_ENGINES, default='regex',
+                        help='C-family complexity engine: per-line regexes or the tokenizer (default: regex)')
+    parser.add_argument('--tree-sitter', action='store_true',
+                        help='Complexity from tree-sitter grammars where installed (overrides the engines above)')
+    parser.add_argument('--classify-content', action='store_true',
+                        help='Refine languages from file heads (shebangs, modelines) and keep generated '
+                             'and vendored files out of the lines of code')
+    add_cache_arguments(parser)
+    add_checkpoint_arguments(parser)
+    add_format_arguments(parser)
+    add_enumeration_arguments(parser)
+    add_exclude_arguments(parser)
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    if not os.path.exists(args.repo_path):
+        logger.error(f"Repository path does not exist: {args.repo_path}")
+        sys.exit(1)
+
+    pipeline = OnboardingPipeline(args.repo_path, args.output_dir, args.months, args.threshold,
+                                  args.rank_by, open_cache_from_args(args, args.repo_path),
+                                  args.incremental, args.checkpoint_dir, args.output_format,
+                                  args.python_engine, args.brace_engine, args.tree_sitter,
+                                  args.classify_content, args.enumeration, exclude_patterns_from_args(args))
+    pipeline.run_analysis()
+
+
+if __name__ == '__main__':
+    main()
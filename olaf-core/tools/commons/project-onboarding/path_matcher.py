@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Path Exclusion Matcher for Project Onboarding
+
+Compiles exclude rules once and matches them against whole path components,
+relative to the analyzed root, instead of searching each rule as a substring
+of the full path: 'out' excludes an out/ directory but not outbox/ or
+layout.py, and a root that happens to live under /tmp or build/ is not
+excluded as a whole.
+
+Rules use .gitignore syntax:
+
+- a plain name (node_modules, .git) matches a file or directory of that name
+  at any depth; these go into a set, so checking a component is one lookup
+- a glob without a slash (*.egg-info, cmake-build-*) matches names at any
+  depth; all of them are compiled into one regular expression
+- a pattern with a slash (/docs/build, src/**/generated) is matched against
+  the path relative to the root, '**' spanning any number of directories
+- a trailing slash (logs/) matches directories only, a leading '!' re-includes
+  what an earlier rule excluded (except below an excluded directory), and
+  blank lines and '#' comments are ignored
+
+Directory decisions are cached, so the files of a directory only have their
+own name checked, and a walk can prune an excluded directory before
+descending into it (FileInventory's prune callback).
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern
+
+_GLOB_CHARACTERS = frozenset('*?[\\')
+
+
+class ExcludeRule(NamedTuple):
+    """One compiled exclude pattern."""
+    pattern: str
+    negated: bool
+    directory_only: bool
+    anchored: bool  # matched against the relative path rather than one name
+    name: Optional[str]  # plain name, compared for equality
+    regex: Optional[Pattern]
+
+    def matches(self, relative_path: str, name: str, is_dir: bool) -> bool:
+        if self.directory_only and not is_dir:
+            return False
+        if self.name is not None:
+            return name == self.name
+        return self.regex.fullmatch(relative_path if self.anchored else name) is not None
+
+
+def _translate_segment(segment: str) -> str:
+    """Regex for one glob path segment: '*' and '?' do not cross '/'."""
+    parts = []
+    index = 0
+    while index < len(segment):
+        char = segment[index]
+        index += 1
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '\\' and index < len(segment):
+            parts.append(re.escape(segment[index]))
+            index += 1
+        elif char == '[':
+            end = segment.find(']', index + 1 if segment[index:index + 1] in ('!', '^') else index)
+            if end < 0:
+                parts.append(re.escape(char))
+                continue
+            body = segment[index:end]
+            negated = body[:1] in ('!', '^')
+            body = body[1:] if negated else body
+            parts.append('[' + ('^' if negated else '') + body.replace('\\', '\\\\').replace('[', '\\[') + ']')
+            index = end + 1
+        else:
+            parts.append(re.escape(char))
+    return ''.join(parts)
+
+
+def translate_glob(pattern: str) -> str:
+    """Regex source for a '/'-separated .gitignore glob (without leading or trailing slash)."""
+    segments = pattern.split('/')
+    regex = ''
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == '**':
+            # a/** is everything inside a; **/b and a/**/b allow zero or more directories
+            regex += '.*' if last else '(?:.*/)?'
+        else:
+            regex += _translate_segment(segment) + ('' if last else '/')
+    return regex
+
+
+def compile_rule(pattern: str) -> Optional[ExcludeRule]:
+    """Compile one .gitignore-style line, or return None for blanks and comments."""
+    line = pattern.rstrip('\n')
+    if not line.endswith('\\ '):
+        line = line.rstrip()
+    if not line or line.startswith('#'):
+        return None
+
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    elif line.startswith('\\'):
+        line = line[1:]  # \! and \# stand for the literal characters
+    directory_only = line.endswith('/')
+    line = line.rstrip('/')
+    anchored = '/' in line
+    line = line.lstrip('/')
+    if not line:
+        return None
+
+    if not anchored and not _GLOB_CHARACTERS.intersection(line):
+        return ExcludeRule(pattern, negated, directory_only, False, line, None)
+    return ExcludeRule(pattern, negated, directory_only, anchored, None, re.compile(translate_glob(line)))
+
+
+def _combined_regex(rules: List[ExcludeRule]) -> Optional[Pattern]:
+    """One alternation of the rules' regexes, or None if there are none."""
+    if not rules:
+        return None
+    return re.compile('|'.join(f'(?:{rule.regex.pattern})' for rule in rules))
+
+
+class PathMatcher:
+    """
+    Exclusion test for paths relative to a root, compiled from exclude patterns.
+
+    Paths may be given relative to the root (with '/' or os.sep) or, if a
+    root was given, as absolute paths below it.
+    """
+
+    def __init__(self, patterns: Iterable[str], root=None):
+        self.patterns = list(patterns)
+        self.rules = [rule for rule in map(compile_rule, self.patterns) if rule is not None]
+        self._root_prefix = str(Path(root).resolve()).rstrip(os.sep) + os.sep if root is not None else None
+        self._directories: Dict[str, bool] = {'': False}
+
+        # Without negations the order of the rules does not matter: merge them by kind
+        self._ordered = any(rule.negated for rule in self.rules)
+        self._names = frozenset(rule.name for rule in self.rules
+                                if rule.name is not None and not rule.directory_only)
+        self._directory_names = frozenset(rule.name for rule in self.rules
+                                          if rule.name is not None and rule.directory_only)
+        self._name_regex, self._directory_name_regex, self._path_regex, self._directory_path_regex = (
+            _combined_regex([rule for rule in self.rules if rule.regex is not None
+                             and rule.anchored == anchored and rule.directory_only == directory_only])
+            for anchored, directory_only in ((False, False), (False, True), (True, False), (True, True)))
+
+    def _matches(self, relative_path: str, name: str, is_dir: bool) -> bool:
+        """Whether the rules exclude this path itself, leaving its parents aside."""
+        if self._ordered:
+            # Last matching rule wins, as in .gitignore
+            for rule in reversed(self.rules):
+                if rule.matches(relative_path, name, is_dir):
+                    return not rule.negated
+            return False
+
+        if name in self._names or (self._name_regex and self._name_regex.fullmatch(name)):
+            return True
+        if self._path_regex and self._path_regex.fullmatch(relative_path):
+            return True
+        if not is_dir:
+            return False
+        return (name in self._directory_names
+                or bool(self._directory_name_regex and self._directory_name_regex.fullmatch(name))
+                or bool(self._directory_path_regex and self._directory_path_regex.fullmatch(relative_path)))
+
+    def _relative(self, path) -> str:
+        """'/'-separated form of a path, relative to the root if it lies below it."""
+        path = os.fspath(path)
+        if self._root_prefix and path.startswith(self._root_prefix):
+            path = path[len(self._root_prefix):]
+        elif self._root_prefix and path + os.sep == self._root_prefix:
+            return ''
+        if os.sep != '/':
+            path = path.replace(os.sep, '/')
+        return path
+
+    def matches_directory(self, relative_dir) -> bool:
+        """Whether a directory, or one of its parents, is excluded. Suitable as a walk prune callback."""
+        relative_dir = self._relative(relative_dir)
+        excluded = self._directories.get(relative_dir)
+        if excluded is None:
+            parent, _, name = relative_dir.rpartition('/')
+            excluded = self.matches_directory(parent) or self._matches(relative_dir, name, True)
+            self._directories[relative_dir] = excluded
+        return excluded
+
+    def matches_file(self, relative_path) -> bool:
+        """Whether a file is excluded, by its own name or one of its directories."""
+        relative_path = self._relative(relative_path)
+        directory, _, name = relative_path.rpartition('/')
+        excluded = self._directories.get(directory)
+        if excluded is None:
+            excluded = self.matches_directory(directory)
+        return excluded or self._matches(relative_path, name, False)
+
+
+def read_patterns(pattern_file) -> List[str]:
+    """Read exclude patterns from a .gitignore-format file (one per line)."""
+    with open(pattern_file, 'r', encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def add_exclude_arguments(parser) -> None:
+    """Register the shared --exclude/--exclude-from command line options on a parser."""
+    parser.add_argument('--exclude', action='append', default=[], metavar='PATTERN',
+                        help='Additionally exclude files or directories matching a name, glob or '
+                             '.gitignore-style pattern (repeatable)')
+    parser.add_argument('--exclude-from', action='append', default=[], metavar='FILE',
+                        help='Read additional exclude patterns from a .gitignore-format file (repeatable)')
+
+
+def exclude_patterns_from_args(args) -> List[str]:
+    """Collect the extra exclude patterns given on the command line."""
+    patterns = list(args.exclude)
+    for pattern_file in args.exclude_from:
+        patterns.extend(read_patterns(pattern_file))
+    return patterns
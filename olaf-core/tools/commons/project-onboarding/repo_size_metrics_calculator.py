@@ -8,15 +8,27 @@ lines of code, binary file sizes, and Git repository statistics.
 Built from scratch for OLAF toolkit project onboarding workflow.
 """
 
+import heapq
 import os
 import subprocess
 import argparse
 import sys
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, NamedTuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, NamedTuple
 import logging
 
+from analysis_cache import AnalysisCache, add_cache_arguments, open_cache_from_args
+from file_inventory import FileInventory, add_enumeration_arguments
+from line_counter import BINARY_SNIFF_BYTES, is_binary_data, scan_file
+from path_matcher import PathMatcher, add_exclude_arguments, exclude_patterns_from_args
+from size_format import format_bytes
+from structured_output import (FORMAT_SUFFIXES, RecordWriter, add_format_arguments,
+                               open_record_writer)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -31,6 +43,68 @@ class FileMetrics(NamedTuple):
     file_type: str
 
 
+class FileMetricsStore:
+    """
+    Column-oriented FileMetrics table for very large repositories.
+    
+    Keeps parallel arrays (size, line count, category id, binary flag) and
+    the UTF-8 paths in one byte buffer instead of a tuple and several Python
+    objects per file; rows are materialized as FileMetrics only when read.
+    """
+    
+    def __init__(self, metrics: Iterable[FileMetrics] = ()):
+        self.categories: List[str] = []
+        self._category_ids: Dict[str, int] = {}
+        self._path_data = bytearray()
+        self._path_ends = array('Q')
+        self.sizes = array('q')
+        self.line_counts = array('q')
+        self.category_ids = array('B')
+        self.binary_flags = array('B')
+        for file_metrics in metrics:
+            self.append(*file_metrics)
+    
+    def append(self, path: str, size_bytes: int, line_count: int, is_binary: bool, file_type: str) -> None:
+        """Add one file's metrics (the FileMetrics fields, in order)."""
+        category_id = self._category_ids.get(file_type)
+        if category_id is None:
+            category_id = self._category_ids[file_type] = len(self.categories)
+            self.categories.append(file_type)
+        # surrogatepass round-trips any str path, undecodable file names included
+        self._path_data += path.encode('utf-8', 'surrogatepass')
+        self._path_ends.append(len(self._path_data))
+        self.sizes.append(size_bytes)
+        self.line_counts.append(line_count)
+        self.category_ids.append(category_id)
+        self.binary_flags.append(is_binary)
+    
+    def __len__(self) -> int:
+        return len(self.sizes)
+    
+    def path(self, index: int) -> str:
+        start = self._path_ends[index - 1] if index > 0 else 0
+        return self._path_data[start:self._path_ends[index]].decode('utf-8', 'surrogatepass')
+    
+    def __getitem__(self, index: int) -> FileMetrics:
+        if index < 0:
+            index += len(self)
+        return FileMetrics(
+            path=self.path(index),
+            size_bytes=self.sizes[index],
+            line_count=self.line_counts[index],
+            is_binary=bool(self.binary_flags[index]),
+            file_type=self.categories[self.category_ids[index]]
+        )
+    
+    def __iter__(self) -> Iterator[FileMetrics]:
+        for index in range(len(self)):
+            yield self[index]
+    
+    def largest(self, count: int) -> List[FileMetrics]:
+        """The count largest files, in the order sorted(..., reverse=True) gives."""
+        return [self[index] for index in heapq.nlargest(count, range(len(self)), key=self.sizes.__getitem__)]
+
+
 class RepoSizeMetricsCalculator:
     """Calculates comprehensive repository size and complexity metrics."""
     
@@ -77,19 +151,35 @@ class RepoSizeMetricsCalculator:
         '.sqlite', '.db', '.parquet'
     }
     
-    def __init__(self, repo_path: str, output_file: str = None):
+    # Result cache namespace for per-file line counts and binary flags
+    CACHE_NAMESPACE = 'repo-size/v1'
+    
+    # Files scanned ahead of the one being recorded, per reader thread
+    THREAD_READ_AHEAD = 16
+    
+    def __init__(self, repo_path: str, output_file: str = None,
+                 cache: Optional[AnalysisCache] = None, inventory: Optional[FileInventory] = None,
+                 output_format: str = 'markdown', threads: int = 1, enumeration: str = 'walk',
+                 extra_excludes: Optional[List[str]] = None):
         self.repo_path = Path(repo_path).resolve()
-        self.output_file = output_file or self.repo_path / "repo-size-metrics.md"
+        self.output_format = output_format
+        self.output_file = output_file or self.repo_path / f"repo-size-metrics{FORMAT_SUFFIXES[output_format]}"
+        self.cache = cache
+        self.inventory = inventory
+        self.enumeration = enumeration
+        # File reads are I/O bound (network file systems): threads overlap them
+        self.threads = threads if threads > 0 else min(32, (os.cpu_count() or 1) + 4)
         self.exclude_patterns = [
             'node_modules', 'dist', 'bin', 'obj', 'build', 'target', 
             'vendor', 'packages', '.git', '__pycache__', '.pytest_cache',
-            '.next', '.turbo', '.cache', 'coverage', 'out', 'tmp'
+            '.next', '.turbo', '.cache', 'coverage', 'out', 'tmp', '.olaf-cache'
         ]
+        self.exclude_patterns.extend(extra_excludes or [])
+        self.path_matcher = PathMatcher(self.exclude_patterns, root=self.repo_path)
         
     def should_exclude_path(self, path: Path) -> bool:
         """Check if path should be excluded from analysis."""
-        path_str = str(path)
-        return any(pattern in path_str for pattern in self.exclude_patterns)
+        return self.path_matcher.matches_file(path)
     
     def is_binary_file(self, file_path: Path) -> bool:
         """Determine if a file is binary based on extension and content."""
@@ -100,13 +190,9 @@ class RepoSizeMetricsCalculator:
         # For unknown extensions, check content (sample first 1024 bytes)
         try:
             with open(file_path, 'rb') as f:
-                chunk = f.read(1024)
-                if b'\0' in chunk:  # Null bytes indicate binary
-                    return True
+                return is_binary_data(f.read(BINARY_SNIFF_BYTES))
         except (IOError, OSError):
             return True  # Assume binary if can't read
-        
-        return False
     
     def get_file_category(self, file_path: Path) -> str:
         """Categorize file based on extension."""
@@ -120,27 +206,40 @@ class RepoSizeMetricsCalculator:
     
     def count_lines_in_file(self, file_path: Path) -> int:
         """Count lines in a text file."""
-        if self.is_binary_file(file_path):
-            return 0
-        
+        scanned = self.scan_file(file_path)
+        return scanned[0] if scanned else 0
+    
+    def scan_file(self, file_path: Path) -> Optional[Tuple[int, bool]]:
+        """
+        Return (line count, is_binary) for a file, opening it at most once.
+        
+        Known binary extensions are not opened; other files are read in
+        binary chunks, without text decoding. Returns None for files that
+        cannot be read (deleted since the inventory, or no permission).
+        """
+        if file_path.suffix.lower() in self.BINARY_EXTENSIONS:
+            return 0, True
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return sum(1 for _ in f)
-        except (IOError, UnicodeDecodeError):
-            return 0
+            return scan_file(file_path)
+        except (IOError, OSError) as e:
+            logger.warning(f"Skipping unreadable file {file_path}: {e}")
+            return None
     
-    def analyze_file(self, file_path: Path) -> FileMetrics:
-        """Analyze a single file and return its metrics."""
+    def analyze_file(self, file_path: Path) -> Optional[FileMetrics]:
+        """Analyze a single file and return its metrics, or None if it cannot be read."""
         try:
-            size_bytes = file_path.stat().st_size
+            stat_result = file_path.stat()
         except (OSError, IOError):
-            size_bytes = 0
+            return None
         
-        is_binary = self.is_binary_file(file_path)
-        line_count = 0 if is_binary else self.count_lines_in_file(file_path)
+        relative_path = file_path.relative_to(self.repo_path)
         file_type = self.get_file_category(file_path)
         
-        relative_path = file_path.relative_to(self.repo_path)
+        scanned = self._cached_scan(str(relative_path), file_path, stat_result)
+        if scanned is None:
+            return None
+        line_count, is_binary = scanned
+        size_bytes = stat_result.st_size
         
         return FileMetrics(
             path=str(relative_path),
@@ -239,76 +338,114 @@ class RepoSizeMetricsCalculator:
         
         return git_info
     
-    def analyze_repository(self) -> Dict:
-        """Analyze entire repository for size metrics."""
+    def _cached_scan(self, relative_path: str, file_path: Path, stat_result) -> Optional[Tuple[int, bool]]:
+        """Line count and binary flag of a file from the cache, else by scanning it (None if unreadable)."""
+        if self.cache:
+            cached = self.cache.get(self.CACHE_NAMESPACE, relative_path, file_path, stat_result)
+            if cached is not None:
+                return cached[0], cached[1]
+        scanned = self.scan_file(file_path)
+        if self.cache and scanned is not None:
+            self.cache.put(self.CACHE_NAMESPACE, relative_path, file_path, list(scanned), stat_result)
+        return scanned
+    
+    def _measure_files(self, inventory: FileInventory,
+                       rows: List[int]) -> Iterator[Tuple[int, Optional[Tuple[int, bool]]]]:
+        """
+        Yield (inventory row, (line count, is_binary) or None if unreadable) in row order.
+        
+        With several threads, files missing from the cache are scanned by a
+        thread pool a bounded window ahead; the cache is only used from this
+        thread, which also keeps the output order.
+        """
+        if self.threads <= 1:
+            for index in rows:
+                yield index, self._cached_scan(inventory.relative_path(index), inventory.path(index),
+                                               inventory.stat(index))
+            return
+        
+        def resolve(entry):
+            index, relative_path, file_path, stat_result, scanned = entry
+            if not isinstance(scanned, tuple):
+                scanned = scanned.result()
+                if self.cache and scanned is not None:
+                    self.cache.put(self.CACHE_NAMESPACE, relative_path, file_path, list(scanned), stat_result)
+            return index, scanned
+        
+        window = deque()
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            for index in rows:
+                relative_path, file_path, stat_result = (inventory.relative_path(index), inventory.path(index),
+                                                         inventory.stat(index))
+                cached = (self.cache.get(self.CACHE_NAMESPACE, relative_path, file_path, stat_result)
+                          if self.cache else None)
+                scanned = tuple(cached) if cached is not None else executor.submit(self.scan_file, file_path)
+                window.append((index, relative_path, file_path, stat_result, scanned))
+                if len(window) >= self.threads * self.THREAD_READ_AHEAD:
+                    yield resolve(window.popleft())
+            while window:
+                yield resolve(window.popleft())
+    
+    def analyze_repository(self, writer: Optional[RecordWriter] = None) -> Dict:
+        """Analyze entire repository for size metrics, streaming file records to writer."""
         logger.info(f"Analyzing repository: {self.repo_path}")
         
-        all_files = []
-        file_metrics = []
+        file_metrics = FileMetricsStore()
         
-        # Get all files
-        for root, dirs, files in os.walk(self.repo_path):
-            # Remove excluded directories from traversal
-            dirs[:] = [d for d in dirs if not any(pattern in d for pattern in self.exclude_patterns)]
-            
-            for file in files:
-                file_path = Path(root) / file
-                if not self.should_exclude_path(file_path):
-                    all_files.append(file_path)
+        # Get all files (excluded directories are pruned during the walk)
+        inventory = self.inventory or FileInventory.build(
+            self.repo_path, prune=self.path_matcher.matches_directory, enumeration=self.enumeration)
+        rows = [index for index in inventory.select() if not self.should_exclude_path(inventory.path(index))]
         
-        logger.info(f"Found {len(all_files)} files to analyze")
+        logger.info(f"Found {len(rows)} files to analyze"
+                    + (f" ({self.threads} reader threads)" if self.threads > 1 else ""))
         
-        # Analyze each file
-        total_size_bytes = 0
-        total_lines = 0
-        category_stats = {}
-        
-        for i, file_path in enumerate(all_files):
+        # Analyze each file, reusing the sizes recorded by the walk
+        for i, (index, scanned) in enumerate(self._measure_files(inventory, rows)):
             if i % 1000 == 0 and i > 0:
-                logger.info(f"Analyzed {i}/{len(all_files)} files")
-            
-            metrics = self.analyze_file(file_path)
-            file_metrics.append(metrics)
-            
-            total_size_bytes += metrics.size_bytes
-            total_lines += metrics.line_count
-            
-            # Update category statistics
-            category = metrics.file_type
-            if category not in category_stats:
-                category_stats[category] = {
-                    'file_count': 0,
-                    'total_size_bytes': 0,
-                    'total_lines': 0,
-                    'binary_files': 0
-                }
+                logger.info(f"Analyzed {i}/{len(rows)} files")
+            if scanned is None:
+                continue
             
-            category_stats[category]['file_count'] += 1
-            category_stats[category]['total_size_bytes'] += metrics.size_bytes
-            category_stats[category]['total_lines'] += metrics.line_count
-            if metrics.is_binary:
-                category_stats[category]['binary_files'] += 1
+            line_count, is_binary = scanned
+            file_metrics.append(inventory.relative_path(index), inventory.sizes[index], line_count, is_binary,
+                                self.get_file_category(Path(inventory.names[index])))
+            if writer:
+                writer.write(file_metrics[-1])
+        
+        return self.summarize_metrics(file_metrics)
+    
+    def summarize_metrics(self, file_metrics: Iterable[FileMetrics]) -> Dict:
+        """Aggregate per-file metrics into repository totals and category statistics."""
+        if not isinstance(file_metrics, FileMetricsStore):
+            file_metrics = FileMetricsStore(file_metrics)
+        
+        # Category ids follow first appearance, as the per-file loop used to
+        category_stats = {
+            category: {'file_count': 0, 'total_size_bytes': 0, 'total_lines': 0, 'binary_files': 0}
+            for category in file_metrics.categories
+        }
+        per_category = [category_stats[category] for category in file_metrics.categories]
+        for category_id, size_bytes, line_count, is_binary in zip(
+                file_metrics.category_ids, file_metrics.sizes, file_metrics.line_counts, file_metrics.binary_flags):
+            stats = per_category[category_id]
+            stats['file_count'] += 1
+            stats['total_size_bytes'] += size_bytes
+            stats['total_lines'] += line_count
+            stats['binary_files'] += is_binary
         
         # Get Git repository information
         git_info = self.get_git_repository_size()
         
         return {
             'file_metrics': file_metrics,
-            'total_files': len(all_files),
-            'total_size_bytes': total_size_bytes,
-            'total_lines': total_lines,
+            'total_files': len(file_metrics),
+            'total_size_bytes': sum(file_metrics.sizes),
+            'total_lines': sum(file_metrics.line_counts),
             'category_stats': category_stats,
             'git_info': git_info
         }
     
-    def format_bytes(self, bytes_value: int) -> str:
-        """Format bytes into human-readable string."""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if bytes_value < 1024.0:
-                return f"{bytes_value:.1f} {unit}"
-            bytes_value /= 1024.0
-        return f"{bytes_value:.1f} PB"
-    
     def generate_report(self, analysis_data: Dict) -> str:
         """Generate comprehensive repository size metrics report."""
         file_metrics = analysis_data['file_metrics']
@@ -325,19 +462,19 @@ class RepoSizeMetricsCalculator:
 **Analysis Date**: {timestamp}  
 **Repository Path**: {self.repo_path}  
 **Total Files**: {total_files:,}  
-**Total Size**: {self.format_bytes(total_size_bytes)}  
+**Total Size**: {format_bytes(total_size_bytes)}  
 **Total Lines of Code**: {total_lines:,}
 
 ## Overview Summary
 
 | Metric | Value |
 |--------|-------|
-| Repository Size (excluding .git) | {self.format_bytes(total_size_bytes)} |
-| Git Repository Size (.git directory) | {self.format_bytes(git_info['git_dir_size_bytes'])} |
-| Total Repository Size | {self.format_bytes(total_size_bytes + git_info['git_dir_size_bytes'])} |
+| Repository Size (excluding .git) | {format_bytes(total_size_bytes)} |
+| Git Repository Size (.git directory) | {format_bytes(git_info['git_dir_size_bytes'])} |
+| Total Repository Size | {format_bytes(total_size_bytes + git_info['git_dir_size_bytes'])} |
 | File Count | {total_files:,} |
 | Lines of Code | {total_lines:,} |
-| Average File Size | {self.format_bytes(total_size_bytes // total_files) if total_files > 0 else '0 B'} |
+| Average File Size | {format_bytes(total_size_bytes // total_files) if total_files > 0 else '0 B'} |
 | Average Lines per File | {total_lines // total_files if total_files > 0 else 0} |
 
 ## File Category Breakdown
@@ -356,9 +493,9 @@ class RepoSizeMetricsCalculator:
             
             file_percent = round((file_count / total_files) * 100, 1) if total_files > 0 else 0
             size_percent = round((size_bytes / total_size_bytes) * 100, 1) if total_size_bytes > 0 else 0
-            avg_size = self.format_bytes(size_bytes // file_count) if file_count > 0 else '0 B'
+            avg_size = format_bytes(size_bytes // file_count) if file_count > 0 else '0 B'
             
-            report += f"| {category} | {file_count:,} | {file_percent}% | {self.format_bytes(size_bytes)} | {size_percent}% | {lines:,} | {avg_size} |\n"
+            report += f"| {category} | {file_count:,} | {file_percent}% | {format_bytes(size_bytes)} | {size_percent}% | {lines:,} | {avg_size} |\n"
         
         report += """
 ## Git Repository Statistics
@@ -368,7 +505,7 @@ class RepoSizeMetricsCalculator:
         if git_info['is_git_repo']:
             report += f"""| Metric | Value |
 |--------|-------|
-| Git Directory Size | {self.format_bytes(git_info['git_dir_size_bytes'])} |
+| Git Directory Size | {format_bytes(git_info['git_dir_size_bytes'])} |
 | Total Commits | {git_info['commit_count']:,} |
 | Branches | {git_info['branch_count']} |
 | Tags | {git_info['tag_count']} |
@@ -387,11 +524,11 @@ Top 20 largest files in the repository:
 """
         
         # Sort files by size (descending) and show top 20
-        largest_files = sorted(file_metrics, key=lambda x: x.size_bytes, reverse=True)[:20]
+        largest_files = file_metrics.largest(20)
         
         for file_metric in largest_files:
             lines_str = f"{file_metric.line_count:,}" if not file_metric.is_binary else "Binary"
-            report += f"| {file_metric.path} | {self.format_bytes(file_metric.size_bytes)} | {file_metric.file_type} | {lines_str} |\n"
+            report += f"| {file_metric.path} | {format_bytes(file_metric.size_bytes)} | {file_metric.file_type} | {lines_str} |\n"
         
         report += """
 ## Code Density Analysis
@@ -402,6 +539,13 @@ Analysis of lines of code per file type:
 |-----------|-------------|-------|----------------|----------------|
 """
         
+        # Max lines per category, in one pass over the columns
+        max_lines_by_id = [0] * len(file_metrics.categories)
+        for category_id, line_count in zip(file_metrics.category_ids, file_metrics.line_counts):
+            if line_count > max_lines_by_id[category_id]:
+                max_lines_by_id[category_id] = line_count
+        max_lines_by_category = dict(zip(file_metrics.categories, max_lines_by_id))
+        
         # Analyze code density by category
         for category, stats in sorted_categories:
             if stats['total_lines'] > 0:  # Only show categories with code
@@ -409,11 +553,7 @@ Analysis of lines of code per file type:
                 total_lines_cat = stats['total_lines']
                 avg_lines = total_lines_cat // file_count if file_count > 0 else 0
                 
-                # Find max lines for this category
-                max_lines = 0
-                for fm in file_metrics:
-                    if fm.file_type == category and fm.line_count > max_lines:
-                        max_lines = fm.line_count
+                max_lines = max_lines_by_category[category]
                 
                 report += f"| {category} | {total_lines_cat:,} | {file_count:,} | {avg_lines} | {max_lines:,} |\n"
         
@@ -455,18 +595,18 @@ Analysis of lines of code per file type:
 """
         
         # Check for large files
-        large_files = [fm for fm in file_metrics if fm.size_bytes > 10 * 1024 * 1024]  # > 10MB
-        if large_files:
+        large_file_count = sum(1 for size in file_metrics.sizes if size > 10 * 1024 * 1024)  # > 10MB
+        if large_file_count:
             report += f"""
-**Large Files Detected**: {len(large_files)} files larger than 10MB
+**Large Files Detected**: {large_file_count} files larger than 10MB
 - Consider using Git LFS for these files
 - Review if these files should be in version control
 
 """
         
         # Check for many small files
-        small_files = [fm for fm in file_metrics if fm.size_bytes < 1024]  # < 1KB
-        if len(small_files) > total_files * 0.3:  # > 30% small files
+        small_file_count = sum(1 for size in file_metrics.sizes if size < 1024)  # < 1KB
+        if small_file_count > total_files * 0.3:  # > 30% small files
             report += """
 **Many Small Files**: High proportion of very small files detected
 - Consider consolidating configuration files
@@ -489,9 +629,34 @@ Analysis of lines of code per file type:
         
         return report
     
+    def summarize(self, analysis_data: Dict) -> Dict:
+        """Repository totals, category statistics and Git information, without per-file rows."""
+        return {'repository': str(self.repo_path),
+                **{key: value for key, value in analysis_data.items() if key != 'file_metrics'}}
+    
+    def write_structured_report(self, analysis_data: Dict) -> None:
+        """Write already collected analysis data in the structured output format."""
+        with open_record_writer(self.output_format, self.output_file, list(FileMetrics._fields)) as writer:
+            for metrics in analysis_data['file_metrics']:
+                writer.write(metrics)
+            writer.close(self.summarize(analysis_data))
+    
+    def write_structured(self) -> None:
+        """Run the analysis, writing one record per file as it is analyzed."""
+        with open_record_writer(self.output_format, self.output_file, list(FileMetrics._fields)) as writer:
+            analysis_data = self.analyze_repository(writer)
+            writer.close(self.summarize(analysis_data))
+    
     def run_analysis(self) -> None:
         """Run complete repository size analysis."""
-        analysis_data = self.analyze_repository()
+        try:
+            if self.output_format != 'markdown':
+                self.write_structured()
+                return
+            analysis_data = self.analyze_repository()
+        finally:
+            if self.cache:
+                self.cache.close()
         report = self.generate_report(analysis_data)
         
         # Save report
@@ -510,6 +675,13 @@ def main():
     parser.add_argument('repo_path', help='Path to repository')
     parser.add_argument('-o', '--output', help='Output file path', default=None)
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='Threads reading files; helps on network file systems where reads wait on I/O '
+                             '(0 = automatic, default: 1)')
+    add_cache_arguments(parser)
+    add_format_arguments(parser)
+    add_enumeration_arguments(parser)
+    add_exclude_arguments(parser)
     
     args = parser.parse_args()
     
@@ -520,7 +692,11 @@ def main():
         logger.error(f"Repository path does not exist: {args.repo_path}")
         sys.exit(1)
     
-    calculator = RepoSizeMetricsCalculator(args.repo_path, args.output)
+    calculator = RepoSizeMetricsCalculator(args.repo_path, args.output,
+                                           open_cache_from_args(args, args.repo_path),
+                                           output_format=args.output_format, threads=args.threads,
+                                           enumeration=args.enumeration,
+                                           extra_excludes=exclude_patterns_from_args(args))
     calculator.run_analysis()
 
 
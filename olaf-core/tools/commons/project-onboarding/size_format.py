@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Human-Readable Sizes for Project Onboarding Reports
+
+Formats byte counts the same way in every report (12.3 KB, 4.0 MB, ...),
+with binary (1024) steps and one decimal.
+"""
+
+
+def format_bytes(bytes_value: int) -> str:
+    """Format bytes into human-readable string."""
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if bytes_value < 1024.0:
+            return f"{bytes_value:.1f} {unit}"
+        bytes_value /= 1024.0
+    return f"{bytes_value:.1f} PB"
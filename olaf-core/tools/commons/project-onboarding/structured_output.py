@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Machine-Readable Report Output for Project Onboarding
+
+Writes analyzer results as JSON, CSV or NDJSON next to (or instead of) the
+Markdown reports, for dashboards and other downstream tools. Records are
+written one at a time as the analyzers produce them, so a large result set
+never has to be held in memory just to be serialized.
+
+Layouts:
+- json:   {"records": [...], "summary": {...}}
+- ndjson: one record per line, then a final {"summary": {...}} line
+- csv:    one row per record; the summary goes to <name>.summary.json
+"""
+
+import csv
+import json
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+import logging
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ('markdown', 'json', 'csv', 'ndjson')
+
+FORMAT_SUFFIXES = {
+    'markdown': '.md',
+    'json': '.json',
+    'csv': '.csv',
+    'ndjson': '.ndjson',
+}
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize the non-JSON types analyzers put in their results."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if hasattr(value, '_asdict'):
+        return value._asdict()
+    return str(value)
+
+
+def to_json(value: Any, indent: Optional[int] = None) -> str:
+    return json.dumps(value, default=_json_default, ensure_ascii=False, indent=indent)
+
+
+def output_path_for(output_file, output_format: str) -> Path:
+    """Give a default report path the suffix of the requested format."""
+    return Path(output_file).with_suffix(FORMAT_SUFFIXES[output_format])
+
+
+class RecordWriter(ABC):
+    """Incrementally writes records, then a summary on close."""
+
+    def __init__(self, output_file=None, fields: Optional[List[str]] = None):
+        self.output_path = Path(output_file) if output_file else None
+        self.fields = fields
+        self.records_written = 0
+        self.closed = False
+        if self.output_path:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self.stream: TextIO = open(self.output_path, 'w', encoding='utf-8', newline='')
+        else:
+            self.stream = sys.stdout
+        self._start()
+
+    def _start(self) -> None:
+        pass
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Write one record (a dict or a NamedTuple)."""
+        if hasattr(record, '_asdict'):
+            record = record._asdict()
+        self._write(record)
+        self.records_written += 1
+
+    @abstractmethod
+    def _write(self, record: Dict[str, Any]) -> None:
+        """Write one record, as a dict, in the output format."""
+
+    def _finish(self, summary: Optional[Dict[str, Any]]) -> None:
+        pass
+
+    def close(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        """Write the summary and close the output."""
+        if self.closed:
+            return
+        self.closed = True
+        self._finish(summary)
+        if self.output_path:
+            self.stream.close()
+            logger.info(f"Wrote {self.records_written} records to: {self.output_path}")
+        else:
+            self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Leaves a well-formed file behind even when the analysis failed
+        self.close()
+
+
+class JsonRecordWriter(RecordWriter):
+
+    def _start(self) -> None:
+        self.stream.write('{"records": [')
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self.stream.write(',\n  ' if self.records_written else '\n  ')
+        self.stream.write(to_json(record))
+
+    def _finish(self, summary: Optional[Dict[str, Any]]) -> None:
+        self.stream.write('\n], "summary": ' if self.records_written else '], "summary": ')
+        self.stream.write(to_json(summary or {}, indent=2))
+        self.stream.write('}\n')
+
+
+class NdjsonRecordWriter(RecordWriter):
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self.stream.write(to_json(record))
+        self.stream.write('\n')
+
+    def _finish(self, summary: Optional[Dict[str, Any]]) -> None:
+        if summary is not None:
+            self.stream.write(to_json({'summary': summary}))
+            self.stream.write('\n')
+
+
+class CsvRecordWriter(RecordWriter):
+
+    def _start(self) -> None:
+        self._writer = None
+        if self.fields:
+            self._open_writer(self.fields)
+
+    def _open_writer(self, fields: List[str]) -> None:
+        self._writer = csv.DictWriter(self.stream, fieldnames=fields, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self._writer is None:
+            self._open_writer(list(record))
+        self._writer.writerow({key: value if isinstance(value, (str, int, float, bool)) or value is None
+                               else to_json(value) for key, value in record.items()})
+
+    def _finish(self, summary: Optional[Dict[str, Any]]) -> None:
+        if summary is None:
+            return
+        if not self.output_path:
+            logger.info("CSV output to stdout: summary not written")
+            return
+        summary_path = self.output_path.with_suffix('.summary.json')
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(to_json(summary, indent=2))
+            f.write('\n')
+
+
+WRITERS = {
+    'json': JsonRecordWriter,
+    'ndjson': NdjsonRecordWriter,
+    'csv': CsvRecordWriter,
+}
+
+
+def open_record_writer(output_format: str, output_file=None,
+                       fields: Optional[List[str]] = None) -> RecordWriter:
+    """
+    Open a writer for a structured format ('json', 'csv' or 'ndjson').
+
+    Writes to stdout when output_file is None. fields fixes the CSV columns;
+    without it the keys of the first record are used.
+    """
+    if output_format not in WRITERS:
+        raise ValueError(f"Not a structured output format: {output_format}")
+    return WRITERS[output_format](output_file, fields)
+
+
+def add_format_arguments(parser) -> None:
+    """Register the shared --format command line option on a parser."""
+    parser.add_argument('--format', dest='output_format', choices=OUTPUT_FORMATS, default='markdown',
+                        help='Report format: Markdown, or JSON/CSV/NDJSON records for other tools '
+                             '(default: markdown)')
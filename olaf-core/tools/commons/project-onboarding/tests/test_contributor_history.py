@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the contributor history of a full git log pass and of the
+day-bucketed checkpoint (--incremental), which must report the same.
+
+Temporary repositories get commits with pinned dates and authors; the tests
+are skipped when git is not installed.
+
+Run from the project-onboarding directory:
+    python -m unittest discover tests
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from contributor_analyzer import ContributorAnalyzer, rank_contributors  # noqa: E402
+
+
+class RankContributorsTest(unittest.TestCase):
+
+    def test_most_commits_first(self):
+        self.assertEqual(rank_contributors({'a': 1, 'b': 3, 'c': 2}), [('b', 3), ('c', 2), ('a', 1)])
+
+    def test_ties_are_ordered_by_name_whatever_the_insertion_order(self):
+        self.assertEqual(rank_contributors({'bob': 2, 'alice': 2, 'carol': 5}),
+                         [('carol', 5), ('alice', 2), ('bob', 2)])
+        self.assertEqual(rank_contributors({'alice': 2, 'bob': 2, 'carol': 5}),
+                         [('carol', 5), ('alice', 2), ('bob', 2)])
+
+
+@unittest.skipUnless(shutil.which('git'), "git is not installed")
+class IncrementalHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.repo = self.directory / 'repo'
+        self.repo.mkdir()
+        self.git('init', '-q')
+        # Ten days ago, within the default 12-month window; commits on that day are an hour apart
+        self.day = datetime.combine(date.today() - timedelta(days=10), time(9))
+        self.commit_count = 0
+        logging.disable(logging.INFO)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.directory)
+
+    def git(self, *args, env=None):
+        subprocess.run(['git', *args], cwd=self.repo, check=True, capture_output=True,
+                       env={**os.environ, **(env or {})})
+
+    def commit(self, author: str, day: int = 0):
+        """Commit as author on the test day (or day days later), an hour after the previous commit."""
+        self.commit_count += 1
+        moment = self.day + timedelta(days=day, hours=self.commit_count)
+        stamp = f'@{int(moment.timestamp())}'
+        (self.repo / 'notes.txt').write_text(f'{self.commit_count}\n')
+        self.git('add', 'notes.txt')
+        self.git('commit', '-q', '-m', f'change {self.commit_count}',
+                 env={'GIT_AUTHOR_NAME': author, 'GIT_AUTHOR_EMAIL': f'{author.lower()}@example.com',
+                      'GIT_AUTHOR_DATE': stamp, 'GIT_COMMITTER_NAME': author,
+                      'GIT_COMMITTER_EMAIL': f'{author.lower()}@example.com', 'GIT_COMMITTER_DATE': stamp})
+
+    def report(self, name: str, incremental: bool):
+        output = self.directory / f'{name}.json'
+        analyzer = ContributorAnalyzer(self.repo, output_file=output, output_format='json',
+                                       checkpoint_dir=self.directory / 'checkpoint' if incremental else None)
+        analyzer.generate_report()
+        return json.loads(output.read_text(encoding='utf-8'))
+
+    def test_tied_authors_are_reported_in_the_same_order(self):
+        # Bob and Alice end up tied. Alice's commit is checkpointed first, then Bob commits on the
+        # same day: the day bucket lists Alice first, a single git log pass lists Bob (newest) first
+        self.commit('Carol')
+        self.commit('Carol')
+        self.commit('Alice')
+        self.report('checkpointed', incremental=True)
+        self.commit('Bob')
+
+        incremental = self.report('incremental', incremental=True)
+        full = self.report('full', incremental=False)
+        self.assertEqual(incremental, full)
+        self.assertEqual([record['contributor'] for record in full['records']], ['Carol', 'Alice', 'Bob'])
+        self.assertEqual([entry['contributor'] for entry in full['summary']['critical_contributors']], ['Carol'])
+
+    def test_tied_authors_across_days(self):
+        for day, author in enumerate(['Dave', 'Bob', 'Alice', 'Bob']):
+            self.commit(author, day)
+        self.report('checkpointed', incremental=True)
+        self.commit('Alice', 4)
+        self.commit('Dave', 4)
+
+        incremental = self.report('incremental', incremental=True)
+        self.assertEqual(incremental, self.report('full', incremental=False))
+        self.assertEqual([record['contributor'] for record in incremental['records']], ['Alice', 'Bob', 'Dave'])
+
+
+if __name__ == '__main__':
+    unittest.main()
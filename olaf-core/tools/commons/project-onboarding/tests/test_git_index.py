@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Tests for the .git/index reader of git_index.
+
+Index files are built byte by byte for each format version; a temporary
+repository checks the reader against `git ls-files` when git is installed.
+
+Run from the project-onboarding directory:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from git_index import GitIndexError, iter_tracked_files, parse_index  # noqa: E402
+
+REGULAR = 0o100644
+EXECUTABLE = 0o100755
+SYMLINK = 0o120000
+GITLINK = 0o160000
+
+FLAG_EXTENDED = 0x4000
+SKIP_WORKTREE = 0x4000
+INTENT_TO_ADD = 0x2000
+
+
+def encode_varint(value: int) -> bytes:
+    """Offset varint of index v4 path compression (git's encode_varint)."""
+    encoded = [value & 0x7F]
+    value >>= 7
+    while value:
+        value -= 1
+        encoded.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(encoded))
+
+
+def build_index(version: int, entries, extensions: bytes = b'', object_name_size: int = 20) -> bytes:
+    """
+    Index file bytes for entries of (path, mode, size, stage, extended_flags).
+
+    Stat fields are derived from the position of an entry: mtime is
+    (1000 + index) seconds and index nanoseconds, the inode 100 + index.
+    """
+    data = bytearray(b'DIRC' + version.to_bytes(4, 'big') + len(entries).to_bytes(4, 'big'))
+    previous = b''
+    for index, (path, mode, size, stage, extended_flags) in enumerate(entries):
+        path = path.encode('utf-8')
+        entry = bytearray()
+        entry += (0).to_bytes(8, 'big')  # ctime
+        entry += (1000 + index).to_bytes(4, 'big') + index.to_bytes(4, 'big')  # mtime
+        entry += (0).to_bytes(4, 'big')  # dev
+        entry += (100 + index).to_bytes(4, 'big')  # ino
+        entry += mode.to_bytes(4, 'big')
+        entry += (0).to_bytes(8, 'big')  # uid, gid
+        entry += size.to_bytes(4, 'big')
+        entry += bytes(range(object_name_size))
+        flags = (stage << 12) | min(len(path), 0xFFF)
+        if extended_flags:
+            flags |= FLAG_EXTENDED
+        entry += flags.to_bytes(2, 'big')
+        if extended_flags:
+            entry += extended_flags.to_bytes(2, 'big')
+
+        if version == 4:
+            common = len(os.path.commonprefix([previous, path]))
+            entry += encode_varint(len(previous) - common) + path[common:] + b'\0'
+        else:
+            entry += path
+            entry += b'\0' * (8 - len(entry) % 8)  # at least one NUL, to a multiple of 8
+        data += entry
+        previous = path
+    return bytes(data + extensions + b'\xAA' * object_name_size)
+
+
+def extension(signature: bytes, payload: bytes) -> bytes:
+    return signature + len(payload).to_bytes(4, 'big') + payload
+
+
+def regular(path: str, size: int = 0, stage: int = 0, extended_flags: int = 0):
+    return (path, REGULAR, size, stage, extended_flags)
+
+
+class VarintTest(unittest.TestCase):
+
+    def test_encoding_matches_git(self):
+        self.assertEqual(encode_varint(0), b'\x00')
+        self.assertEqual(encode_varint(127), b'\x7f')
+        self.assertEqual(encode_varint(128), b'\x80\x00')
+        self.assertEqual(encode_varint(16511), b'\xff\x7f')
+
+
+class ParseIndexTest(unittest.TestCase):
+
+    def parse(self, data: bytes, object_name_size: int = 20):
+        return [(path.decode('utf-8'), size, mtime_ns, ino)
+                for path, size, mtime_ns, ino in parse_index(data, object_name_size)]
+
+    def test_v2_padding_for_every_name_length(self):
+        # Names of 1 to 16 bytes end the entry at every position within 8 bytes
+        paths = ['x' * length for length in range(1, 17)]
+        entries = [regular(path, size=len(path)) for path in paths]
+        parsed = self.parse(build_index(2, entries))
+        self.assertEqual([path for path, _, _, _ in parsed], paths)
+        self.assertEqual([size for _, size, _, _ in parsed], list(range(1, 17)))
+
+    def test_stat_fields(self):
+        parsed = self.parse(build_index(2, [regular('a.txt', size=42), regular('b.txt', size=7)]))
+        self.assertEqual(parsed, [('a.txt', 42, 1000 * 1_000_000_000, 100),
+                                  ('b.txt', 7, 1001 * 1_000_000_000 + 1, 101)])
+
+    def test_v3_extended_flags(self):
+        entries = [regular('checked_out.py'),
+                   regular('sparse/skipped.py', extended_flags=SKIP_WORKTREE),
+                   regular('intent_to_add.py', extended_flags=INTENT_TO_ADD),
+                   regular('z_last.py', size=3)]
+        parsed = self.parse(build_index(3, entries))
+        # The extended flags move the name by two bytes; padding still lines up the next entry
+        self.assertEqual([path for path, _, _, _ in parsed], ['checked_out.py', 'intent_to_add.py', 'z_last.py'])
+        self.assertEqual(parsed[-1][1], 3)
+
+    def test_v4_path_compression(self):
+        paths = ['README.md', 'src/app/main.py', 'src/app/models.py', 'src/lib/util.py', 'tests/test_main.py']
+        parsed = self.parse(build_index(4, [regular(path, size=index) for index, path in enumerate(paths)]))
+        self.assertEqual([(path, size) for path, size, _, _ in parsed], list(zip(paths, range(len(paths)))))
+
+    def test_v4_strip_lengths_beyond_one_varint_byte(self):
+        deep = 'd/' * 100 + 'file.txt'
+        paths = [deep, 'e.txt', deep + '.bak']
+        parsed = self.parse(build_index(4, [regular(path) for path in paths]))
+        self.assertEqual([path for path, _, _, _ in parsed], paths)
+
+    def test_v4_with_extended_flags(self):
+        entries = [regular('a/one.py'), regular('a/two.py', extended_flags=SKIP_WORKTREE), regular('a/three.py')]
+        parsed = self.parse(build_index(4, entries))
+        self.assertEqual([path for path, _, _, _ in parsed], ['a/one.py', 'a/three.py'])
+
+    def test_conflicted_path_is_listed_once(self):
+        for version in (2, 3, 4):
+            entries = [regular('a.py'),
+                       regular('conflict.py', size=1, stage=1),
+                       regular('conflict.py', size=2, stage=2),
+                       regular('conflict.py', size=3, stage=3),
+                       regular('z.py')]
+            parsed = self.parse(build_index(version, entries))
+            self.assertEqual([path for path, _, _, _ in parsed], ['a.py', 'conflict.py', 'z.py'], version)
+
+    def test_conflict_with_a_missing_stage(self):
+        # Deleted on one side: only stages 1 and 3 are present
+        entries = [regular('gone.py', stage=1), regular('gone.py', stage=3), regular('next.py')]
+        parsed = self.parse(build_index(2, entries))
+        self.assertEqual([path for path, _, _, _ in parsed], ['gone.py', 'next.py'])
+
+    def test_only_regular_files_are_listed(self):
+        entries = [('bin/run.sh', EXECUTABLE, 1, 0, 0), ('link', SYMLINK, 1, 0, 0),
+                   ('submodule', GITLINK, 0, 0, 0), regular('src/main.c')]
+        parsed = self.parse(build_index(2, entries))
+        self.assertEqual([path for path, _, _, _ in parsed], ['bin/run.sh', 'src/main.c'])
+
+    def test_long_names_are_read_up_to_the_nul(self):
+        long_path = 'l' * 5000
+        for version in (2, 4):
+            parsed = self.parse(build_index(version, [regular(long_path), regular('m.txt')]))
+            self.assertEqual([path for path, _, _, _ in parsed], [long_path, 'm.txt'], version)
+
+    def test_sha256_object_names(self):
+        entries = [regular('a.py', size=5), regular('b/c.py', size=6)]
+        for version in (2, 4):
+            parsed = self.parse(build_index(version, entries, object_name_size=32), object_name_size=32)
+            self.assertEqual([(path, size) for path, size, _, _ in parsed], [('a.py', 5), ('b/c.py', 6)])
+
+    def test_extensions_are_skipped(self):
+        data = build_index(2, [regular('a.py')], extensions=extension(b'TREE', b'\0' * 23) + extension(b'REUC', b''))
+        self.assertEqual([path for path, _, _, _ in self.parse(data)], ['a.py'])
+
+    def test_split_index_is_rejected(self):
+        data = build_index(2, [regular('a.py')], extensions=extension(b'link', b'\0' * 20))
+        with self.assertRaises(GitIndexError):
+            self.parse(data)
+
+    def test_invalid_indexes_are_rejected(self):
+        with self.assertRaises(GitIndexError):
+            self.parse(b'')
+        with self.assertRaises(GitIndexError):
+            self.parse(b'XXXX' + build_index(2, [])[4:])
+        with self.assertRaises(GitIndexError):
+            self.parse(build_index(5, [regular('a.py')]))
+
+
+@unittest.skipUnless(shutil.which('git'), "git is not installed")
+class IterTrackedFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.git('init', '-q')
+        files = {'README.md': 'readme\n', 'src/main.py': 'print(1)\n', 'src/lib/util.py': 'x = 1\n',
+                 'docs/guide.md': 'guide\n', 'deleted.txt': 'gone\n', 'ignored.log': 'log\n'}
+        for path, content in files.items():
+            (self.directory / path).parent.mkdir(parents=True, exist_ok=True)
+            (self.directory / path).write_text(content)
+        (self.directory / '.gitignore').write_text('*.log\n')
+        self.git('add', '.')
+        (self.directory / 'deleted.txt').unlink()
+        (self.directory / 'untracked.txt').write_text('new\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def git(self, *args):
+        subprocess.run(['git', *args], cwd=self.directory, check=True, capture_output=True)
+
+    def listing(self, path):
+        return {tracked.path: tracked.size for tracked in iter_tracked_files(path)}
+
+    def test_every_index_version(self):
+        expected = {'.gitignore': 6, 'README.md': 7, 'docs/guide.md': 6, 'src/lib/util.py': 6, 'src/main.py': 9}
+        for version in (2, 3, 4):
+            self.git('update-index', '--index-version', str(version))
+            self.assertEqual(self.listing(self.directory), expected, version)
+
+    def test_subdirectory_paths_are_relative_to_it(self):
+        self.git('update-index', '--index-version', '4')
+        self.assertEqual(self.listing(self.directory / 'src'), {'main.py': 9, 'lib/util.py': 6})
+
+    def test_stat_comes_from_the_working_tree(self):
+        (self.directory / 'README.md').write_text('a longer readme\n')
+        self.assertEqual(self.listing(self.directory)['README.md'], 16)
+
+    def test_not_a_repository(self):
+        outside = Path(tempfile.mkdtemp())
+        try:
+            if any(parent.joinpath('.git').exists() for parent in (outside, *outside.parents)):
+                self.skipTest("temporary directory is inside a Git checkout")
+            with self.assertRaises(GitIndexError):
+                iter_tracked_files(outside)
+        finally:
+            shutil.rmtree(outside)
+
+
+if __name__ == '__main__':
+    unittest.main()
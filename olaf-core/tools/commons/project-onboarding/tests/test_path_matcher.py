@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Tests for the .gitignore-style exclusion rules of path_matcher.
+
+Run from the project-onboarding directory:
+    python -m unittest discover tests
+"""
+
+import os
+import re
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from path_matcher import PathMatcher, compile_rule, translate_glob  # noqa: E402
+
+
+class CompileRuleTest(unittest.TestCase):
+
+    def test_blank_lines_and_comments_are_ignored(self):
+        for line in ('', '   ', '\n', '# build output', '/', '!'):
+            self.assertIsNone(compile_rule(line), line)
+
+    def test_plain_name_is_compared_for_equality(self):
+        rule = compile_rule('node_modules')
+        self.assertEqual(rule.name, 'node_modules')
+        self.assertIsNone(rule.regex)
+        self.assertFalse(rule.anchored or rule.negated or rule.directory_only)
+
+    def test_pattern_flags(self):
+        rule = compile_rule('!/docs/build/')
+        self.assertTrue(rule.negated)
+        self.assertTrue(rule.directory_only)
+        self.assertTrue(rule.anchored)
+        self.assertTrue(rule.regex.fullmatch('docs/build'))
+
+    def test_escaped_leading_characters_are_literal(self):
+        self.assertEqual(compile_rule('\\!important').name, '!important')
+        self.assertEqual(compile_rule('\\#notes').name, '#notes')
+        self.assertFalse(compile_rule('\\!important').negated)
+
+    def test_trailing_spaces_are_stripped_unless_escaped(self):
+        self.assertEqual(compile_rule('tmp   ').name, 'tmp')
+        self.assertTrue(compile_rule('tmp\\ ').regex.fullmatch('tmp '))
+
+
+class TranslateGlobTest(unittest.TestCase):
+
+    def assertMatches(self, pattern, path, expected=True):
+        self.assertEqual(bool(re.fullmatch(translate_glob(pattern), path)), expected, f"{pattern!r} ~ {path!r}")
+
+    def test_star_and_question_mark_stay_within_a_segment(self):
+        self.assertMatches('*.log', 'debug.log')
+        self.assertMatches('*.log', 'logs/debug.log', False)
+        self.assertMatches('file?.txt', 'file1.txt')
+        self.assertMatches('file?.txt', 'file/.txt', False)
+
+    def test_double_star(self):
+        self.assertMatches('**/generated', 'generated')
+        self.assertMatches('**/generated', 'src/a/generated')
+        self.assertMatches('src/**/generated', 'src/generated')
+        self.assertMatches('src/**/generated', 'src/a/b/generated')
+        self.assertMatches('src/**', 'src/a/b.py')
+        self.assertMatches('src/**/generated', 'lib/src/generated', False)
+
+    def test_character_classes(self):
+        self.assertMatches('file[0-9].txt', 'file7.txt')
+        self.assertMatches('file[!0-9].txt', 'file7.txt', False)
+        self.assertMatches('file[!0-9].txt', 'fileA.txt')
+        self.assertMatches('file[.txt', 'file[.txt')
+
+    def test_special_characters_are_escaped(self):
+        self.assertMatches('a+b.(c)', 'a+b.(c)')
+        self.assertMatches('a+b.(c)', 'aab.(c)', False)
+
+
+class PathMatcherTest(unittest.TestCase):
+
+    def test_names_match_whole_components_at_any_depth(self):
+        matcher = PathMatcher(['out', 'node_modules'])
+        self.assertTrue(matcher.matches_directory('out'))
+        self.assertTrue(matcher.matches_directory('web/node_modules'))
+        self.assertTrue(matcher.matches_file('src/out/app.js'))
+        self.assertTrue(matcher.matches_file('src/out'))
+        self.assertFalse(matcher.matches_directory('outbox'))
+        self.assertFalse(matcher.matches_file('src/layout.py'))
+        self.assertFalse(matcher.matches_file('checkout/main.py'))
+
+    def test_globs_without_slash_match_names(self):
+        matcher = PathMatcher(['*.egg-info', 'cmake-build-*', '*.pyc'])
+        self.assertTrue(matcher.matches_directory('pkg/demo.egg-info'))
+        self.assertTrue(matcher.matches_directory('cmake-build-debug'))
+        self.assertTrue(matcher.matches_file('pkg/__init__.pyc'))
+        self.assertFalse(matcher.matches_file('pkg/__init__.py'))
+
+    def test_patterns_with_a_slash_are_anchored_to_the_root(self):
+        matcher = PathMatcher(['/build', 'docs/_build'])
+        self.assertTrue(matcher.matches_directory('build'))
+        self.assertFalse(matcher.matches_directory('src/build'))
+        self.assertTrue(matcher.matches_file('docs/_build/index.html'))
+        self.assertFalse(matcher.matches_file('site/docs/_build/index.html'))
+
+    def test_double_star_patterns(self):
+        matcher = PathMatcher(['src/**/generated', '**/fixtures/*.json'])
+        self.assertTrue(matcher.matches_file('src/generated/a.py'))
+        self.assertTrue(matcher.matches_file('src/api/v1/generated/a.py'))
+        self.assertTrue(matcher.matches_file('tests/fixtures/data.json'))
+        self.assertTrue(matcher.matches_file('fixtures/data.json'))
+        self.assertFalse(matcher.matches_file('tests/fixtures/data.yaml'))
+        self.assertFalse(matcher.matches_file('lib/src/generated/a.py'))
+
+    def test_trailing_slash_matches_directories_only(self):
+        matcher = PathMatcher(['logs/', 'cache*/'])
+        self.assertTrue(matcher.matches_directory('app/logs'))
+        self.assertTrue(matcher.matches_file('app/logs/today.txt'))
+        self.assertFalse(matcher.matches_file('app/logs'))
+        self.assertTrue(matcher.matches_directory('cache_v2'))
+        self.assertFalse(matcher.matches_file('cache_v2'))
+
+    def test_negation_re_includes_what_an_earlier_rule_excluded(self):
+        matcher = PathMatcher(['*.log', '!keep.log'])
+        self.assertTrue(matcher.matches_file('logs/debug.log'))
+        self.assertFalse(matcher.matches_file('logs/keep.log'))
+
+    def test_last_matching_rule_wins(self):
+        # The same rules in the other order: the exclusion comes last and wins
+        matcher = PathMatcher(['!keep.log', '*.log'])
+        self.assertTrue(matcher.matches_file('keep.log'))
+        matcher = PathMatcher(['*.log', '!keep.log', 'keep.log'])
+        self.assertTrue(matcher.matches_file('keep.log'))
+        matcher = PathMatcher(['data/', '!data/', 'data/'])
+        self.assertTrue(matcher.matches_directory('data'))
+
+    def test_negation_does_not_reach_below_an_excluded_directory(self):
+        matcher = PathMatcher(['build/', '!build/keep.txt', '!important.txt'])
+        self.assertTrue(matcher.matches_file('build/keep.txt'))
+        self.assertTrue(matcher.matches_file('build/sub/important.txt'))
+        self.assertFalse(matcher.matches_file('src/important.txt'))
+
+    def test_negated_directory_is_walked_again(self):
+        matcher = PathMatcher(['vendor*', '!vendor_patches'])
+        self.assertTrue(matcher.matches_directory('vendor'))
+        self.assertFalse(matcher.matches_directory('vendor_patches'))
+        self.assertFalse(matcher.matches_file('vendor_patches/fix.diff'))
+
+    def test_paths_are_relative_to_the_root(self):
+        root = Path('/tmp/build/project')
+        matcher = PathMatcher(['tmp', 'build'], root=root)
+        # The root itself lives under tmp/ and build/: only paths below it count
+        self.assertFalse(matcher.matches_file(root.resolve() / 'src' / 'main.py'))
+        self.assertFalse(matcher.matches_directory(root.resolve()))
+        self.assertTrue(matcher.matches_file(root.resolve() / 'build' / 'main.o'))
+        self.assertTrue(matcher.matches_directory(os.path.join('src', 'tmp')))
+
+    def test_directory_decisions_are_cached(self):
+        matcher = PathMatcher(['node_modules'])
+        self.assertFalse(matcher.matches_file('a/b/c.py'))
+        self.assertIn('a/b', matcher._directories)
+        self.assertTrue(matcher.matches_file('a/node_modules/x/y.js'))
+        self.assertTrue(matcher._directories['a/node_modules/x'])
+
+    def test_no_rules_exclude_nothing(self):
+        matcher = PathMatcher(['', '# comment'])
+        self.assertEqual(matcher.rules, [])
+        self.assertFalse(matcher.matches_file('anything/at/all.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Optional tree-sitter Backend for Complexity and Halstead Metrics
+
+Parses a source file once with a tree-sitter grammar and derives, from the
+same syntax tree, the function spans and McCabe complexity used by
+ComplexityAnalyzer and the operator/operand counts used by the Halstead
+metrics. Unlike the regex engines it is not fooled by braces, keywords or
+operators inside strings and comments.
+
+tree-sitter is optional: grammars are loaded from the per-language wheels
+(tree-sitter-python, tree-sitter-java, ...) or from tree-sitter-languages.
+When neither the bindings nor a language's grammar are installed,
+get_backend() returns None and the callers keep using their regex engines.
+"""
+
+import importlib
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+import logging
+
+try:
+    import tree_sitter
+except ImportError:  # optional dependency
+    tree_sitter = None
+
+logger = logging.getLogger(__name__)
+
+# Analyzer language code -> (grammar module, language function, tree-sitter-languages name)
+GRAMMARS = {
+    'py': ('tree_sitter_python', 'language', 'python'),
+    'js': ('tree_sitter_javascript', 'language', 'javascript'),
+    'ts': ('tree_sitter_typescript', 'language_typescript', 'typescript'),
+    'java': ('tree_sitter_java', 'language', 'java'),
+    'cs': ('tree_sitter_c_sharp', 'language', 'c_sharp'),
+    'go': ('tree_sitter_go', 'language', 'go'),
+    'rs': ('tree_sitter_rust', 'language', 'rust'),
+    'php': ('tree_sitter_php', 'language_php', 'php'),
+    'rb': ('tree_sitter_ruby', 'language', 'ruby'),
+    'c': ('tree_sitter_c', 'language', 'c'),
+    'cpp': ('tree_sitter_cpp', 'language', 'cpp'),
+}
+
+
+class LanguageRules(NamedTuple):
+    """Node types that matter to the metrics in one grammar."""
+    functions: FrozenSet[str]   # separate entries in the complexity results
+    scopes: FrozenSet[str]      # classes and the like, used to qualify function names
+    decisions: FrozenSet[str]   # +1 complexity each
+    cases: FrozenSet[str]       # +1 unless the label is 'default'
+    logical: FrozenSet[str]     # binary nodes that add one path for a short-circuit operator
+
+
+_C_FAMILY_LOGICAL = frozenset({'binary_expression'})
+_SHORT_CIRCUIT = frozenset({'&&', '||', '??', 'and', 'or'})
+
+RULES: Dict[str, LanguageRules] = {
+    'py': LanguageRules(
+        functions=frozenset({'function_definition'}),
+        scopes=frozenset({'class_definition'}),
+        decisions=frozenset({'if_statement', 'elif_clause', 'conditional_expression', 'for_statement',
+                             'while_statement', 'except_clause', 'case_clause', 'for_in_clause',
+                             'if_clause', 'boolean_operator'}),
+        cases=frozenset(),
+        logical=frozenset()),
+    'js': LanguageRules(
+        functions=frozenset({'function_declaration', 'generator_function_declaration', 'function_expression',
+                             'generator_function', 'arrow_function', 'method_definition'}),
+        scopes=frozenset({'class_declaration', 'class'}),
+        decisions=frozenset({'if_statement', 'for_statement', 'for_in_statement', 'while_statement',
+                             'do_statement', 'catch_clause', 'ternary_expression', 'switch_case'}),
+        cases=frozenset(),
+        logical=_C_FAMILY_LOGICAL),
+    'java': LanguageRules(
+        functions=frozenset({'method_declaration', 'constructor_declaration'}),
+        scopes=frozenset({'class_declaration', 'interface_declaration', 'enum_declaration',
+                          'record_declaration'}),
+        decisions=frozenset({'if_statement', 'for_statement', 'enhanced_for_statement', 'while_statement',
+                             'do_statement', 'catch_clause', 'ternary_expression'}),
+        cases=frozenset({'switch_label'}),
+        logical=_C_FAMILY_LOGICAL),
+    'cs': LanguageRules(
+        functions=frozenset({'method_declaration', 'constructor_declaration', 'local_function_statement',
+                             'operator_declaration'}),
+        scopes=frozenset({'class_declaration', 'struct_declaration', 'interface_declaration',
+                          'record_declaration'}),
+        decisions=frozenset({'if_statement', 'for_statement', 'foreach_statement', 'while_statement',
+                             'do_statement', 'catch_clause', 'conditional_expression',
+                             'switch_expression_arm'}),
+        cases=frozenset({'switch_section'}),
+        logical=_C_FAMILY_LOGICAL),
+    'go': LanguageRules(
+        functions=frozenset({'function_declaration', 'method_declaration'}),
+        scopes=frozenset(),
+        decisions=frozenset({'if_statement', 'for_statement', 'expression_case', 'type_case',
+                             'communication_case'}),
+        cases=frozenset(),
+        logical=_C_FAMILY_LOGICAL),
+    'rs': LanguageRules(
+        functions=frozenset({'function_item'}),
+        scopes=frozenset({'impl_item', 'trait_item'}),
+        decisions=frozenset({'if_expression', 'while_expression', 'for_expression', 'loop_expression',
+                             'match_arm'}),
+        cases=frozenset(),
+        logical=_C_FAMILY_LOGICAL),
+    'php': LanguageRules(
+        functions=frozenset({'function_definition', 'method_declaration'}),
+        scopes=frozenset({'class_declaration', 'interface_declaration', 'trait_declaration'}),
+        decisions=frozenset({'if_statement', 'else_if_clause', 'for_statement', 'foreach_statement',
+                             'while_statement', 'do_statement', 'case_statement', 'catch_clause',
+                             'conditional_expression'}),
+        cases=frozenset(),
+        logical=_C_FAMILY_LOGICAL),
+    'rb': LanguageRules(
+        functions=frozenset({'method', 'singleton_method'}),
+        scopes=frozenset({'class', 'module'}),
+        decisions=frozenset({'if', 'elsif', 'unless', 'while', 'until', 'for', 'when', 'rescue',
+                             'conditional', 'if_modifier', 'unless_modifier', 'while_modifier',
+                             'until_modifier', 'rescue_modifier'}),
+        cases=frozenset(),
+        logical=frozenset({'binary'})),
+    'c': LanguageRules(
+        functions=frozenset({'function_definition'}),
+        scopes=frozenset(),
+        decisions=frozenset({'if_statement', 'for_statement', 'while_statement', 'do_statement',
+                             'conditional_expression'}),
+        cases=frozenset({'case_statement'}),
+        logical=_C_FAMILY_LOGICAL),
+    'cpp': LanguageRules(
+        functions=frozenset({'function_definition'}),
+        scopes=frozenset({'class_specifier', 'struct_specifier', 'namespace_definition'}),
+        decisions=frozenset({'if_statement', 'for_statement', 'for_range_loop', 'while_statement',
+                             'do_statement', 'catch_clause', 'conditional_expression'}),
+        cases=frozenset({'case_statement'}),
+        logical=_C_FAMILY_LOGICAL),
+}
+RULES['ts'] = RULES['js']
+
+# Bracket and separator punctuation is not counted by the Halstead metrics
+SEPARATORS = frozenset({'(', ')', '[', ']', '{', '}', ';', ',', '.'})
+
+# Named nodes counted as one operand without looking inside (besides *string* nodes)
+ATOMIC_OPERANDS = frozenset({'char_literal', 'character_literal', 'rune_literal', 'variable_name'})
+
+# Function-like nodes whose name is given by the node they are assigned to
+_NAME_HOLDERS = {'variable_declarator': 'name', 'pair': 'key', 'assignment_expression': 'left',
+                 'public_field_definition': 'name', 'field_definition': 'property'}
+
+
+class SyntaxMetrics(NamedTuple):
+    """What one parse of a file yields."""
+    functions: List[Tuple[str, int, int, int]]  # (name, start_line, end_line, complexity)
+    operators: Counter
+    operands: Counter
+    has_errors: bool
+
+
+def available() -> bool:
+    """Check whether the tree-sitter bindings are installed."""
+    return tree_sitter is not None
+
+
+def _load_language(language: str):
+    """Load a grammar from its own wheel, then from tree-sitter-languages."""
+    module_name, function_name, bundled_name = GRAMMARS[language]
+    try:
+        module = importlib.import_module(module_name)
+        return tree_sitter.Language(getattr(module, function_name)())
+    except (ImportError, AttributeError, TypeError, ValueError):
+        pass
+    try:
+        from tree_sitter_languages import get_language
+        return get_language(bundled_name)
+    except Exception:  # not installed, or built for other tree-sitter bindings
+        return None
+
+
+def _make_parser(ts_language):
+    try:
+        return tree_sitter.Parser(ts_language)
+    except TypeError:  # bindings before 0.22
+        parser = tree_sitter.Parser()
+        parser.set_language(ts_language)
+        return parser
+
+
+@lru_cache(maxsize=None)
+def get_backend(language: str) -> Optional['TreeSitterBackend']:
+    """
+    Return the backend for an analyzer language code, built once per process.
+
+    Returns None when tree-sitter or the language's grammar is not installed.
+    """
+    if tree_sitter is None or language not in GRAMMARS:
+        return None
+    ts_language = _load_language(language)
+    if ts_language is None:
+        logger.warning(f"No tree-sitter grammar installed for '{language}' "
+                       f"(pip install {GRAMMARS[language][0].replace('_', '-')}), using the regex engine")
+        return None
+    return TreeSitterBackend(language, _make_parser(ts_language))
+
+
+class TreeSitterBackend:
+    """
+    Function spans, McCabe complexity and Halstead counts from one syntax tree.
+
+    Functions start at 1 and gain one per branch, loop, non-default case,
+    catch/except handler, conditional expression and short-circuit operator.
+    Lambdas and closures count towards their enclosing function; methods and
+    nested functions are separate entries with qualified names (Class.method).
+
+    Halstead operands are the named leaves (identifiers, numbers, ...) and
+    whole string literals; operators are the keywords and operator tokens.
+    Comments and bracket/separator punctuation are not counted.
+    """
+
+    def __init__(self, language: str, parser):
+        self.language = language
+        self.parser = parser
+        self.rules = RULES[language]
+
+    def analyze(self, source: bytes, functions: bool = True, halstead: bool = True) -> SyntaxMetrics:
+        """Parse source once and walk the tree for the requested metrics."""
+        tree = self.parser.parse(source)
+        rules = self.rules
+        found: List[Tuple[str, int, int, int]] = []
+        operators: Counter = Counter()
+        operands: Counter = Counter()
+        # Open functions as [name, start_line, end_line, complexity, depth]; scopes as (name, depth)
+        frames: List[list] = []
+        scopes: List[Tuple[str, int]] = []
+
+        cursor = tree.walk()
+        depth = 0
+        opaque = None  # depth of the comment or string whose tokens are not counted one by one
+        while True:
+            node = cursor.node
+            node_type = node.type
+            descend = True
+            count = halstead and opaque is None
+
+            if node.is_named:
+                if functions:
+                    if node_type in rules.functions:
+                        scopes.append((self._function_name(node, source), depth))
+                        frames.append(['.'.join(name for name, _ in scopes), node.start_point[0] + 1,
+                                       node.end_point[0] + 1, 1, depth])
+                    elif node_type in rules.scopes:
+                        scopes.append((self._node_text(node.child_by_field_name('name')
+                                                       or node.child_by_field_name('type'), source)
+                                       or '<anonymous>', depth))
+                    elif frames and (node_type in rules.decisions or self._adds_path(node, node_type)):
+                        frames[-1][3] += 1
+
+                if count:
+                    if 'comment' in node_type or 'string' in node_type or node_type in ATOMIC_OPERANDS:
+                        if 'comment' not in node_type:
+                            operands[source[node.start_byte:node.end_byte]] += 1
+                        # Function spans and decisions inside (template substitutions) still count
+                        opaque = depth
+                        descend = functions
+                    elif node.child_count == 0 and node.end_byte > node.start_byte:
+                        operands[source[node.start_byte:node.end_byte]] += 1
+            elif count and node_type not in SEPARATORS and node.end_byte > node.start_byte:
+                operators[node_type] += 1
+
+            if descend and cursor.goto_first_child():
+                depth += 1
+                continue
+
+            # Leave finished nodes until one has a next sibling
+            while True:
+                while frames and frames[-1][4] >= depth:
+                    name, start_line, end_line, complexity, _ = frames.pop()
+                    found.append((name, start_line, end_line, complexity))
+                while scopes and scopes[-1][1] >= depth:
+                    scopes.pop()
+                if opaque is not None and opaque >= depth:
+                    opaque = None
+                if cursor.goto_next_sibling():
+                    break
+                if not cursor.goto_parent():
+                    found.sort(key=lambda func: func[1])
+                    return SyntaxMetrics(found, self._decoded(operators), self._decoded(operands),
+                                         tree.root_node.has_error)
+                depth -= 1
+
+    def _adds_path(self, node, node_type: str) -> bool:
+        if node_type in self.rules.cases:
+            return node.child_count > 0 and node.children[0].type != 'default'
+        if node_type in self.rules.logical:
+            operator = node.child_by_field_name('operator')
+            return operator is not None and operator.type in _SHORT_CIRCUIT
+        return False
+
+    @staticmethod
+    def _node_text(node, source: bytes) -> Optional[str]:
+        if node is None:
+            return None
+        return source[node.start_byte:node.end_byte].decode('utf-8', errors='replace')
+
+    def _function_name(self, node, source: bytes) -> str:
+        name = node.child_by_field_name('name')
+        if name is None:
+            # C/C++: the name sits inside (pointer/reference) function declarators
+            declarator = node.child_by_field_name('declarator')
+            while declarator is not None and declarator.child_by_field_name('declarator') is not None:
+                declarator = declarator.child_by_field_name('declarator')
+            name = declarator
+        if name is None and node.parent is not None:
+            # JavaScript: const name = () => {...}, {name: function () {...}}, obj.name = function ...
+            field = _NAME_HOLDERS.get(node.parent.type)
+            name = node.parent.child_by_field_name(field) if field else None
+        return self._node_text(name, source) or '<anonymous>'
+
+    @staticmethod
+    def _decoded(counts: Counter) -> Counter:
+        decoded: Counter = Counter()
+        for token, count in counts.items():
+            decoded[token.decode('utf-8', errors='replace') if isinstance(token, bytes) else token] += count
+        return decoded